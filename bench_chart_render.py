@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Chart render benchmark: matplotlib classic (artist per candle), matplotlib fast
+(collections + template) and the numpy raster backend.
+
+Usage:
+    python bench_chart_render.py [renders]
+"""
+
+import math
+import random
+import sys
+import time
+from functools import partial
+
+from loguru import logger
+
+from pumpbot.core import chart_generator
+
+
+def _synthetic_series(n: int = 150, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    opens, highs, lows, closes, volumes = [], [], [], [], []
+    price = 100.0
+    for i in range(n):
+        o = price
+        c = o * (1 + rng.uniform(-0.01, 0.01) + 0.002 * math.sin(i / 9))
+        opens.append(o)
+        closes.append(c)
+        highs.append(max(o, c) * (1 + rng.uniform(0, 0.004)))
+        lows.append(min(o, c) * (1 - rng.uniform(0, 0.004)))
+        volumes.append(rng.uniform(500, 1500))
+        price = c
+    return dict(opens=opens, highs=highs, lows=lows, closes=closes, volumes=volumes)
+
+
+def _ema(series, period):
+    k = 2 / (period + 1)
+    out = [series[0]]
+    for v in series[1:]:
+        out.append(v * k + out[-1] * (1 - k))
+    return out
+
+
+def bench(render, renders: int, data: dict) -> tuple:
+    wall = []
+    cpu_start = time.process_time()
+    for i in range(renders):
+        entry = data["closes"][-1]
+        t0 = time.perf_counter()
+        render(
+            symbol=f"BENCH{i}",
+            ema20=_ema(data["closes"], 20),
+            ema50=_ema(data["closes"], 50),
+            entry_price=entry,
+            tp1=entry * 1.02,
+            tp2=entry * 1.035,
+            sl=entry * 0.985,
+            signal_side="LONG",
+            **data,
+        )
+        wall.append((time.perf_counter() - t0) * 1000)
+    cpu = (time.process_time() - cpu_start) * 1000 / renders
+    wall.sort()
+    return sum(wall) / len(wall), wall[len(wall) // 2], wall[int(len(wall) * 0.95) - 1], cpu
+
+
+def main() -> None:
+    renders = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    logger.remove()
+    data = _synthetic_series()
+    mpl = chart_generator.get_backend("matplotlib")
+    variants = {
+        "classic": (mpl, False),
+        "fast": (mpl, True),
+        "raster": (chart_generator.get_backend("raster"), None),
+    }
+    results = {}
+    for name, (backend, fast) in variants.items():
+        if backend is None:
+            continue
+        if fast is not None:
+            backend.fast = fast
+        render = partial(chart_generator.render_chart_png, backend=backend.name)
+        bench(render, 2, data)  # warm-up (imports, font cache, template build)
+        results[name] = bench(render, renders, data)
+        mean_ms, p50, p95, cpu = results[name]
+        print(f"{name:8s} renders={renders} mean={mean_ms:7.1f}ms p50={p50:7.1f}ms p95={p95:7.1f}ms cpu={cpu:7.1f}ms")
+    for name in ("fast", "raster"):
+        if "classic" in results and results.get(name, (0,))[0]:
+            print(f"speedup {name} vs classic (mean wall): {results['classic'][0] / results[name][0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
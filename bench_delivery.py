@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Broadcast load test against the local mock Bot API (mock_bot_api.py).
+
+Drives the real delivery path (send_vip_signal, notify_all or the outbox
+dispatcher) to thousands of synthetic chats and reports throughput, retries
+and the per-chat delivery latency (time from broadcast start until the
+chat's message was accepted), p50/p95/p99.
+
+Usage:
+    python bench_delivery.py [--chats 2000] [--mode signal|notify|outbox]
+                             [--latency-ms 40] [--flood-rate 0.01] [--error-rate 0.01]
+    python bench_delivery.py --url http://127.0.0.1:8081   # already running mock server
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+from loguru import logger
+from telegram.ext import ApplicationBuilder
+
+import mock_bot_api
+from pumpbot.core import database
+from pumpbot.telebot import delivery
+from pumpbot.telebot.notifier import send_vip_signal
+
+BOT_TOKEN = "123456:MOCK"
+
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def _payload(chart_bytes: int) -> dict:
+    return {
+        "symbol": "BENCHUSDT",
+        "side": "LONG",
+        "leverage": 10,
+        "timeframe": "15m",
+        "strategy": "load-test",
+        "entry": [1.2345, 1.2301],
+        "tp_levels": [1.2600, 1.2850],
+        "sl": 1.2100,
+        "rsi": 61.2,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        # Random bytes of a typical chart size; the mock server does not decode images
+        "chart_png": os.urandom(chart_bytes) if chart_bytes else None,
+    }
+
+
+async def _wait_ready(base: str, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                if (await client.get(f"{base}/stats")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"mock Bot API at {base} did not start")
+            await asyncio.sleep(0.2)
+
+
+async def _run_outbox(app, chat_ids_csv: str, payload: dict) -> None:
+    from pumpbot.telebot.outbox import OutboxDispatcher, enqueue_vip_signal
+
+    await enqueue_vip_signal(chat_ids_csv, payload)
+    dispatcher = OutboxDispatcher(app)
+    while True:
+        await dispatcher.drain_once()
+        next_due = await asyncio.to_thread(database.outbox_next_due)
+        if next_due is None:
+            break
+        await asyncio.sleep(max(0.0, min(1.0, next_due - time.time())))
+    logger.info(f"Outbox final state: {database.outbox_stats()}")
+
+
+async def run(args, base: str) -> None:
+    await _wait_ready(base)
+    async with httpx.AsyncClient() as client:
+        await client.post(f"{base}/reset")
+
+    # Fresh engine per run; rates default to the TELEGRAM_* settings
+    delivery._engine = delivery.DeliveryEngine(
+        global_rate=args.global_rate, chat_rate=args.chat_rate, max_concurrency=args.concurrency
+    )
+    app = (
+        ApplicationBuilder()
+        .token(BOT_TOKEN)
+        .base_url(f"{base}/bot")
+        .base_file_url(f"{base}/file/bot")
+        .connection_pool_size(args.concurrency + 8)  # as in main.py: pool sized to the engine
+        .build()
+    )
+    await app.initialize()
+
+    chat_ids = [100_000 + i for i in range(args.chats)]
+    chat_ids_csv = ",".join(str(cid) for cid in chat_ids)
+    payload = _payload(args.chart_bytes)
+
+    started_wall, started = time.time(), time.perf_counter()
+    if args.mode == "signal":
+        await send_vip_signal(app, chat_ids_csv, payload)
+    elif args.mode == "notify":
+        from pumpbot.bot.handlers import notify_all
+
+        await notify_all(app, chat_ids_csv, "Load test notification")
+    else:
+        await _run_outbox(app, chat_ids_csv, payload)
+    elapsed = time.perf_counter() - started
+    await app.shutdown()
+
+    async with httpx.AsyncClient() as client:
+        stats = (await client.get(f"{base}/stats")).json()
+    first_delivery = {}
+    for chat_id, _method, _received, answered in stats["deliveries"]:
+        first_delivery.setdefault(chat_id, answered)
+    latencies = [first_delivery[cid] - started_wall for cid in chat_ids if cid in first_delivery]
+    service = [answered - received for _c, _m, received, answered in stats["deliveries"]]
+
+    print(f"mode={args.mode} chats={args.chats} global_rate={args.global_rate}/s concurrency={args.concurrency}")
+    print(f"server counters: {dict(sorted(stats['counters'].items()))}")
+    print(f"delivered {len(latencies)}/{args.chats} chats in {elapsed:.2f}s -> {len(latencies) / elapsed:.1f} chats/s")
+    if latencies:
+        print(
+            "delivery latency  p50={:.2f}s p95={:.2f}s p99={:.2f}s max={:.2f}s".format(
+                _percentile(latencies, 50), _percentile(latencies, 95), _percentile(latencies, 99), max(latencies)
+            )
+        )
+        print(
+            "request latency   p50={:.0f}ms p95={:.0f}ms p99={:.0f}ms".format(
+                *(1000 * _percentile(service, p) for p in (50, 95, 99))
+            )
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chats", type=int, default=2000)
+    parser.add_argument("--mode", choices=("signal", "notify", "outbox"), default="signal")
+    parser.add_argument("--url", help="use a mock server that is already running instead of starting one")
+    parser.add_argument("--global-rate", type=float, default=delivery.TELEGRAM_GLOBAL_RATE)
+    parser.add_argument("--chat-rate", type=float, default=delivery.TELEGRAM_CHAT_RATE)
+    parser.add_argument("--concurrency", type=int, default=delivery.TELEGRAM_MAX_CONCURRENCY)
+    parser.add_argument("--chart-bytes", type=int, default=60_000, help="0 sends text-only signals")
+    parser.add_argument("--log-level", default="ERROR")
+    mock_bot_api.add_arguments(parser)
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level=args.log_level)
+
+    # The outbox mode works on a scratch database, never on signals.db
+    tmp = tempfile.TemporaryDirectory()
+    database.DB_PATH = Path(tmp.name) / "bench_outbox.db"
+    database.init_db()
+
+    server = None
+    base = args.url
+    if not base:
+        # --global-rate/--chat-rate also set the limits the mock server enforces
+        config = mock_bot_api.config_from_args(args)
+        server = multiprocessing.get_context("spawn").Process(target=mock_bot_api.serve, args=(config,), daemon=True)
+        server.start()
+        base = f"http://{config.host}:{config.port}"
+    try:
+        asyncio.run(run(args, base.rstrip("/")))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.join(5)
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
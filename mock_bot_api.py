@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Telegram Bot API, for load tests of the delivery path.
+
+Implements the methods the bot uses (getMe, sendMessage, sendPhoto,
+editMessageText, editMessageCaption, setMyCommands, getUpdates,
+createChatInviteLink, ...) at /bot<token>/<method>, with injectable faults:
+  - latency: base + exponential jitter per request
+  - flood control: Telegram-like limits (global and per chat) answered with
+    429 + retry_after, plus optional random 429s
+  - errors: random 5xx, and a fixed share of "blocked" chats answered with 403
+GET /stats returns request counters and per-chat delivery timestamps;
+POST /reset clears them.
+
+Usage:
+    pip install -r requirements-dev.txt
+    python mock_bot_api.py [--port 8081] [--latency-ms 40] [--flood-rate 0.01]
+    TELEGRAM_BASE_URL=http://127.0.0.1:8081/bot python -m pumpbot.main
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+import zlib
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from aiohttp import web
+from loguru import logger
+
+MESSAGE_METHODS = {"sendMessage", "sendPhoto"}
+EDIT_METHODS = {"editMessageText", "editMessageCaption"}
+
+
+@dataclass
+class MockConfig:
+    host: str = "127.0.0.1"
+    port: int = 8081
+    latency_ms: float = 40.0  # fixed part of every response
+    jitter_ms: float = 20.0  # mean of the exponential extra delay
+    enforce_limits: bool = True  # answer 429 when Telegram's rate limits are exceeded
+    global_rate: float = 30.0
+    chat_rate: float = 1.0
+    group_rate_per_min: float = 20.0
+    limit_slack: float = 1.2  # tolerance on the limits above, for client/server clock jitter
+    flood_rate: float = 0.0  # share of requests answered with a random 429
+    retry_after: int = 1
+    error_rate: float = 0.0  # share of requests answered with a 5xx
+    blocked_rate: float = 0.0  # share of chats that "blocked the bot" (403)
+    seed: int = 1
+
+
+class _Bucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate, self.capacity = rate, capacity
+        self.tokens, self.updated = capacity, time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class MockBotApi:
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.reset()
+
+    def reset(self) -> None:
+        cfg = self.config
+        self.counters: Counter = Counter()
+        self.deliveries: List[list] = []  # [chat_id, method, received_at, answered_at]
+        self.message_id = 0
+        self.file_seq = 0
+        self.global_bucket = _Bucket(cfg.global_rate * cfg.limit_slack, cfg.global_rate * cfg.limit_slack)
+        self.chat_buckets: Dict[int, _Bucket] = {}
+
+    # ---------------- helpers ----------------
+    def _blocked(self, chat_id: int) -> bool:
+        share = self.config.blocked_rate
+        return share > 0 and (zlib.crc32(str(chat_id).encode()) % 10_000) < share * 10_000
+
+    def _within_limits(self, chat_id: int) -> bool:
+        cfg = self.config
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            rate = cfg.group_rate_per_min / 60.0 if chat_id < 0 else cfg.chat_rate
+            bucket = _Bucket(rate * cfg.limit_slack, 1.0)
+            self.chat_buckets[chat_id] = bucket
+        return bucket.take() and self.global_bucket.take()
+
+    @staticmethod
+    def _ok(result) -> web.Response:
+        return web.json_response({"ok": True, "result": result})
+
+    @staticmethod
+    def _fail(status: int, description: str, parameters: Optional[dict] = None) -> web.Response:
+        body = {"ok": False, "error_code": status, "description": description}
+        if parameters:
+            body["parameters"] = parameters
+        return web.json_response(body, status=status)
+
+    def _message(self, chat_id: int, params: dict, photo: bool) -> dict:
+        self.message_id += 1
+        chat_type = "private" if chat_id > 0 else "channel"
+        message = {"message_id": self.message_id, "date": int(time.time()), "chat": {"id": chat_id, "type": chat_type}}
+        if photo:
+            raw = params.get("photo")
+            if isinstance(raw, str) and raw:
+                file_id = raw
+            else:
+                self.file_seq += 1
+                file_id = f"mock-photo-{self.file_seq}"
+            message["photo"] = [{"file_id": file_id, "file_unique_id": file_id[-16:], "width": 1280, "height": 720}]
+            if params.get("caption"):
+                message["caption"] = params["caption"]
+        else:
+            message["text"] = params.get("text", "")
+        return message
+
+    async def _params(self, request: web.Request) -> dict:
+        if request.content_type == "application/json":
+            return await request.json()
+        params = {}
+        for key, value in (await request.post()).items():
+            params[key] = value if isinstance(value, str) else "<upload>"
+        if params.get("photo") == "<upload>":
+            params["photo"] = None
+        return params
+
+    # ---------------- handlers ----------------
+    def _fault(self, method: str, chat_id: int) -> Optional[web.Response]:
+        """Injected failure for a send/edit request, decided when it arrives."""
+        cfg = self.config
+        if cfg.error_rate and self.rng.random() < cfg.error_rate:
+            self.counters[f"{method}:500"] += 1
+            return self._fail(500, "Internal Server Error")
+        if self._blocked(chat_id):
+            self.counters[f"{method}:403"] += 1
+            return self._fail(403, "Forbidden: bot was blocked by the user")
+        limited = cfg.enforce_limits and not self._within_limits(chat_id)
+        if limited or (cfg.flood_rate and self.rng.random() < cfg.flood_rate):
+            self.counters[f"{method}:429"] += 1
+            return self._fail(429, f"Too Many Requests: retry after {cfg.retry_after}", {"retry_after": cfg.retry_after})
+        return None
+
+    # ---------------- handlers ----------------
+    async def handle(self, request: web.Request) -> web.Response:
+        received = time.time()
+        method = request.match_info["method"]
+        params = await self._params(request)
+        cfg = self.config
+        try:
+            chat_id = int(params.get("chat_id", 0) or 0)
+        except ValueError:
+            chat_id = 0
+        fault = self._fault(method, chat_id) if method in MESSAGE_METHODS or method in EDIT_METHODS else None
+
+        delay = cfg.latency_ms + (self.rng.expovariate(1.0 / cfg.jitter_ms) if cfg.jitter_ms > 0 else 0.0)
+        if method == "getUpdates":
+            # Long polling: hold the request for (part of) its timeout, no updates
+            delay = max(delay, min(float(params.get("timeout", 0) or 0), 2.0) * 1000)
+        await asyncio.sleep(delay / 1000)
+        if fault is not None:
+            return fault
+
+        self.counters[f"{method}:200"] += 1
+        if method == "getMe":
+            return self._ok({"id": 1, "is_bot": True, "first_name": "Mock", "username": "mock_pump_bot"})
+        if method in MESSAGE_METHODS:
+            self.deliveries.append([chat_id, method, received, time.time()])
+            return self._ok(self._message(chat_id, params, photo=method == "sendPhoto"))
+        if method in EDIT_METHODS:
+            self.deliveries.append([chat_id, method, received, time.time()])
+            params.setdefault("text", params.get("caption", ""))
+            message = self._message(chat_id, params, photo=method == "editMessageCaption")
+            message["message_id"] = int(params.get("message_id", 0) or 0)
+            return self._ok(message)
+        if method == "getUpdates":
+            return self._ok([])
+        if method == "createChatInviteLink":
+            return self._ok(
+                {
+                    "invite_link": f"https://t.me/+mock{self.rng.getrandbits(48):012x}",
+                    "creator": {"id": 1, "is_bot": True, "first_name": "Mock"},
+                    "creates_join_request": False,
+                    "is_primary": False,
+                    "is_revoked": False,
+                    "name": params.get("name"),
+                }
+            )
+        if method == "getMyCommands":
+            return self._ok([])
+        # setMyCommands, deleteWebhook, setWebhook, close, ...
+        return self._ok(True)
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {"counters": dict(self.counters), "deliveries": self.deliveries, "config": asdict(self.config)}
+        )
+
+    async def reset_handler(self, request: web.Request) -> web.Response:
+        self.reset()
+        return web.json_response({"ok": True})
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=50 * 1024 * 1024)
+        app.router.add_route("*", "/bot{token}/{method}", self.handle)
+        app.router.add_get("/stats", self.stats)
+        app.router.add_post("/reset", self.reset_handler)
+        return app
+
+
+def serve(config: MockConfig) -> None:
+    """Run the mock server until interrupted (also used as a subprocess target)."""
+    logger.info(f"Mock Bot API on http://{config.host}:{config.port}/bot<token>/<method>")
+    web.run_app(MockBotApi(config).app(), host=config.host, port=config.port, print=None, access_log=None)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = MockConfig()
+    parser.add_argument("--host", default=defaults.host)
+    parser.add_argument("--port", type=int, default=defaults.port)
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms)
+    parser.add_argument("--no-limits", dest="enforce_limits", action="store_false", help="never answer 429 for rate")
+    parser.add_argument("--limit-slack", type=float, default=defaults.limit_slack)
+    parser.add_argument("--flood-rate", type=float, default=defaults.flood_rate)
+    parser.add_argument("--retry-after", type=int, default=defaults.retry_after)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--blocked-rate", type=float, default=defaults.blocked_rate)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    names = MockConfig.__dataclass_fields__
+    return MockConfig(**{k: v for k, v in vars(args).items() if k in names})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+    serve(config_from_args(args))
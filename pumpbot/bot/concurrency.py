@@ -0,0 +1,124 @@
+"""
+Command handling limits.
+
+Updates are processed concurrently (HANDLER_CONCURRENCY at a time), so one
+slow command no longer blocks other users. On top of that:
+  - rate_limit_commands: per-user token bucket for commands (group -1 handler);
+    the COMMAND_BUCKETS_MAX most recently active users keep a bucket
+  - heavy_command: at most one heavy command in flight per user and
+    HEAVY_COMMAND_SLOTS overall; the user gets a "busy" reply instead of queueing
+    (their own run in flight, or every slot taken by other users)
+  - run_heavy: runs CPU-bound work (pandas + matplotlib report) in a worker
+    process so it never stalls the event loop shared with the scanner
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial, wraps
+from typing import Awaitable, Callable, Optional, Set
+
+from loguru import logger
+from telegram import Update
+from telegram.ext import ApplicationHandlerStop, ContextTypes
+
+from pumpbot.telebot.delivery import TokenBucket
+
+HANDLER_CONCURRENCY = int(os.getenv("HANDLER_CONCURRENCY", "16"))
+COMMAND_RATE_PER_MIN = float(os.getenv("COMMAND_RATE_PER_MIN", "20"))
+COMMAND_BURST = float(os.getenv("COMMAND_BURST", "5"))
+COMMAND_BUCKETS_MAX = int(os.getenv("COMMAND_BUCKETS_MAX", "10000"))
+HEAVY_COMMAND_SLOTS = int(os.getenv("HEAVY_COMMAND_SLOTS", "2"))
+HEAVY_WORKERS = int(os.getenv("HEAVY_WORKERS", "1"))
+
+RATE_LIMIT_MESSAGE = "Too many commands, please wait a few seconds."
+BUSY_MESSAGE = "This command is already running, please wait for the result."
+SERVER_BUSY_MESSAGE = "The server is busy with other requests, please try again shortly."
+
+# user id -> command bucket; order is least -> most recently active
+_user_buckets: "OrderedDict[int, TokenBucket]" = OrderedDict()
+_heavy_inflight: Set[int] = set()
+_heavy_slots: Optional[asyncio.Semaphore] = None
+_executor: Optional[Executor] = None
+
+
+async def rate_limit_commands(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Group -1 handler: drop commands from users above COMMAND_RATE_PER_MIN."""
+    message = update.effective_message
+    user = update.effective_user
+    if not user or not message or not (message.text or "").startswith("/"):
+        return
+    bucket = _user_buckets.get(user.id)
+    if bucket is None:
+        bucket = TokenBucket(COMMAND_RATE_PER_MIN / 60.0, capacity=COMMAND_BURST)
+        _user_buckets[user.id] = bucket
+        while len(_user_buckets) > max(1, COMMAND_BUCKETS_MAX):
+            _user_buckets.popitem(last=False)
+    else:
+        _user_buckets.move_to_end(user.id)
+    if bucket.try_acquire():
+        return
+    logger.warning(f"Command rate limit hit by user {user.id}: {message.text.split()[0]}")
+    try:
+        await message.reply_text(RATE_LIMIT_MESSAGE)
+    except Exception as exc:
+        logger.debug(f"Rate limit notice failed for user {user.id}: {exc}")
+    raise ApplicationHandlerStop
+
+
+def heavy_command(func: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+    """Limit a slow command to one run per user and HEAVY_COMMAND_SLOTS runs overall."""
+
+    @wraps(func)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
+        global _heavy_slots
+        user_id = update.effective_user.id if update.effective_user else 0
+        if _heavy_slots is None:
+            _heavy_slots = asyncio.Semaphore(max(1, HEAVY_COMMAND_SLOTS))
+        if user_id in _heavy_inflight or _heavy_slots.locked():
+            if update.effective_message:
+                busy = BUSY_MESSAGE if user_id in _heavy_inflight else SERVER_BUSY_MESSAGE
+                await update.effective_message.reply_text(busy)
+            return
+        _heavy_inflight.add(user_id)
+        try:
+            async with _heavy_slots:
+                return await func(update, context, *args, **kwargs)
+        finally:
+            _heavy_inflight.discard(user_id)
+
+    return wrapper
+
+
+def _create_executor() -> Executor:
+    try:
+        return ProcessPoolExecutor(max_workers=max(1, HEAVY_WORKERS), mp_context=multiprocessing.get_context("spawn"))
+    except Exception as exc:
+        logger.warning(f"Heavy command process pool unavailable, using a thread: {exc}")
+        return ThreadPoolExecutor(max_workers=1)
+
+
+async def run_heavy(fn: Callable, *args, **kwargs):
+    """Run a picklable CPU-bound function in the heavy worker pool."""
+    global _executor
+    if _executor is None:
+        _executor = _create_executor()
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_executor, partial(fn, *args, **kwargs))
+    except BrokenProcessPool:
+        logger.error("Heavy command worker died; restarting pool")
+        _executor = _create_executor()
+        return await loop.run_in_executor(_executor, partial(fn, *args, **kwargs))
+
+
+def shutdown_heavy_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import os
 from datetime import datetime, timezone
 from typing import Optional, Sequence
@@ -9,12 +10,17 @@ from telegram import Update
 from telegram.constants import ParseMode
 from telegram.ext import ContextTypes
 
+from pumpbot.bot.concurrency import heavy_command, run_heavy
 from pumpbot.core.daily_report import generate_daily_report
-from pumpbot.core.database import get_open_trades, last_signals, pnl_summary, recent_trades
+from pumpbot.core import db_async, result_cache
 from pumpbot.telebot.auth import PAYWALL_MESSAGE, contact_keyboard, is_vip, vip_required
+from pumpbot.telebot.channels import CHANNEL_INVITE_TTL_HOURS, create_invite_link, signal_channel
+from pumpbot.telebot.delivery import get_delivery_engine
 from pumpbot.telebot.notifier import format_daily_report_caption, send_vip_signal
 from pumpbot.telebot.user_settings import get_horizon_name, get_risk_name, get_user_settings, update_user_settings
 
+HEALTH_TIMEOUT_SECONDS = float(os.getenv("HEALTH_TIMEOUT_SECONDS", "10"))
+
 BOT_COMMANDS = (
     ("start", "Start the bot"),
     ("help", "Show command menu"),
@@ -30,6 +36,7 @@ BOT_COMMANDS = (
     ("setrisk", "Set risk: low|medium|high"),
     ("profile", "Show active settings"),
     ("id", "Show your user/chat IDs"),
+    ("channel", "Get your signal channel invite"),
 )
 
 
@@ -67,6 +74,7 @@ def _build_help_text(is_admin: bool) -> str:
         "/status - Recent signals",
         "/symbols - Tracked symbols",
         "/report - Daily report now",
+        "/channel - Signal channel invite link",
         "",
         "<b>Performance</b>",
         "/pnl - PnL summary",
@@ -172,23 +180,26 @@ async def cmd_id(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await message.reply_text("\n".join(lines), parse_mode=ParseMode.HTML)
 
 
-@vip_required
-async def cmd_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    message = update.effective_message
-    if not message:
-        return
-    rows = last_signals(limit=5)
+async def _status_text() -> str:
+    rows = await db_async.last_signals(limit=5)
     if not rows:
-        await message.reply_text("No signals recorded yet.", parse_mode=ParseMode.HTML)
-        return
-
+        return "No signals recorded yet."
     lines = ["<b>Recent signals</b>"]
     for sym, price, vol, score, ts in rows:
         score_txt = f"{float(score):.2f}" if score is not None else "-"
         price_txt = f"{float(price):.4f}" if price is not None else "-"
         vol_txt = f"{float(vol):.2f}" if vol is not None else "-"
         lines.append(f"- {sym}: score {score_txt} | price {price_txt} | volume {vol_txt} | {ts}")
-    await message.reply_text("\n".join(lines), parse_mode=ParseMode.HTML)
+    return "\n".join(lines)
+
+
+@vip_required
+async def cmd_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    message = update.effective_message
+    if not message:
+        return
+    text = await result_cache.cached("status", (result_cache.TOPIC_SIGNALS,), _status_text)
+    await message.reply_text(text, parse_mode=ParseMode.HTML)
 
 
 @vip_required
@@ -209,39 +220,45 @@ async def cmd_symbols(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
 
 
-@vip_required
-async def cmd_pnl(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    message = update.effective_message
-    if not message:
-        return
-    s = pnl_summary()
-    opens = get_open_trades()
-    txt = (
+async def _pnl_text() -> str:
+    s, opens = await asyncio.gather(db_async.pnl_summary(), db_async.get_open_trades())
+    return (
         "<b>PnL Summary</b>\n"
         f"Closed trades: {s['closed']}\n"
         f"Wins/Losses: {s['wins']}/{s['losses']} (Winrate {s['winrate']:.1f}%)\n"
         f"Total PnL: ${s['pnl_usd']:.2f}\n"
         f"Open positions: {len(opens)}"
     )
-    await message.reply_text(txt, parse_mode=ParseMode.HTML)
 
 
 @vip_required
-async def cmd_trades(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def cmd_pnl(update: Update, context: ContextTypes.DEFAULT_TYPE):
     message = update.effective_message
     if not message:
         return
-    rows = recent_trades(limit=10)
-    if not rows:
-        await message.reply_text("No trades logged yet.", parse_mode=ParseMode.HTML)
-        return
+    txt = await result_cache.cached("pnl", (result_cache.TOPIC_TRADES,), _pnl_text)
+    await message.reply_text(txt, parse_mode=ParseMode.HTML)
 
+
+async def _trades_text() -> str:
+    rows = await db_async.recent_trades(limit=10)
+    if not rows:
+        return "No trades logged yet."
     lines = ["<b>Recent trades</b>"]
     for sym, side, entry, tp1, tp2, sl, status, opened_at, closed_at, pnl_usd, pnl_pct in rows:
         tail = f" | PnL ${pnl_usd:.2f} ({pnl_pct:.2f}%)" if closed_at else ""
         closed_info = f" -> {closed_at}" if closed_at else ""
         lines.append(f"- {sym} {side} @ {entry} [{status}] {opened_at}{closed_info}{tail}")
-    await message.reply_text("\n".join(lines), parse_mode=ParseMode.HTML)
+    return "\n".join(lines)
+
+
+@vip_required
+async def cmd_trades(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    message = update.effective_message
+    if not message:
+        return
+    text = await result_cache.cached("trades", (result_cache.TOPIC_TRADES,), _trades_text)
+    await message.reply_text(text, parse_mode=ParseMode.HTML)
 
 
 @vip_required
@@ -273,12 +290,18 @@ async def cmd_config(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 @vip_required
+@heavy_command
 async def cmd_report(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    summary_text, chart = generate_daily_report()
     chat_id = update.effective_chat.id if update.effective_chat else None
     if not chat_id:
         logger.warning("Report command missing chat_id.")
         return
+    try:
+        # pandas + matplotlib: keep it off the event loop shared with the scanner
+        summary_text, chart = await run_heavy(generate_daily_report)
+    except Exception as exc:
+        logger.error(f"Report generation failed: {exc}")
+        return
 
     caption = format_daily_report_caption(summary_text) if summary_text else None
     try:
@@ -363,6 +386,7 @@ async def cmd_testsignal(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 @vip_required
+@heavy_command
 async def cmd_health(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id if update.effective_chat else None
     client = context.application.bot_data.get("binance_client")
@@ -372,17 +396,20 @@ async def cmd_health(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not client:
         lines.append("Binance client missing")
     else:
-        try:
-            server_time = await client.get_server_time()
+        server_time, klines = await asyncio.gather(
+            asyncio.wait_for(client.get_server_time(), HEALTH_TIMEOUT_SECONDS),
+            asyncio.wait_for(client.get_klines(symbol=symbol, interval="15m", limit=50), HEALTH_TIMEOUT_SECONDS),
+            return_exceptions=True,
+        )
+        if isinstance(server_time, BaseException):
+            lines.append(f"Binance server time error: {server_time!r}")
+        else:
             ts = datetime.fromtimestamp(server_time["serverTime"] / 1000, tz=timezone.utc)
             lines.append(f"Binance OK | Server Time: {ts.strftime('%Y-%m-%d %H:%M:%S UTC')}")
-        except Exception as exc:
-            lines.append(f"Binance server time error: {exc}")
-        try:
-            klines = await client.get_klines(symbol=symbol, interval="15m", limit=50)
+        if isinstance(klines, BaseException):
+            lines.append(f"Kline fetch error ({symbol}): {klines!r}")
+        else:
             lines.append(f"{symbol} 15m candles fetched: {len(klines)}")
-        except Exception as exc:
-            lines.append(f"Kline fetch error ({symbol}): {exc}")
     if chat_id:
         await context.bot.send_message(chat_id=chat_id, text="\n".join(lines), parse_mode=ParseMode.HTML)
 
@@ -409,14 +436,22 @@ async def notify_all(app, chat_ids_csv: str, text_or_payload):
         p = None
         msg_text = str(text_or_payload)
 
-    for cid in chat_ids:
+    chart_bytes = None
+    if isinstance(p, dict) and p.get("chart"):
         try:
-            await app.bot.send_message(chat_id=cid, text=msg_text, parse_mode=ParseMode.HTML)
-            if isinstance(p, dict) and p.get("chart"):
-                with open(p["chart"], "rb") as f:
-                    await app.bot.send_photo(chat_id=cid, photo=f)
-        except Exception as exc:
-            logger.error(f"Message send failed {cid}: {exc}")
+            with open(p["chart"], "rb") as f:
+                chart_bytes = f.read()
+        except OSError as exc:
+            logger.warning(f"Notification chart could not be read: {exc}")
+
+    engine = get_delivery_engine()
+
+    async def _send(cid: int):
+        await engine.send(cid, lambda: app.bot.send_message(chat_id=cid, text=msg_text, parse_mode=ParseMode.HTML))
+        if chart_bytes:
+            await engine.send(cid, lambda: app.bot.send_photo(chat_id=cid, photo=chart_bytes))
+
+    await engine.fan_out(chat_ids, _send, label="Notification")
 
 
 @vip_required
@@ -531,15 +566,30 @@ async def cmd_setrisk(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 @vip_required
-async def cmd_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Show user's profile and settings"""
+async def cmd_channel(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Send a VIP user a personal, single-use invite link to the signal channel."""
+    message = update.effective_message
     user = update.effective_user
-    chat = update.effective_chat
-
-    if not user or not chat:
+    if not message or not user:
+        return
+    if signal_channel() is None:
+        await message.reply_text("Signals are delivered by direct message; no channel is configured.")
         return
+    try:
+        url = await create_invite_link(context.bot, user.id)
+    except Exception as exc:
+        logger.error(f"/channel invite link failed for user {user.id}: {exc}")
+        await message.reply_text("Invite link could not be created. Please contact the admin.")
+        return
+    text = (
+        "<b>Signal channel access</b>\n"
+        f"{url}\n"
+        f"<i>Single-use link, valid for {CHANNEL_INVITE_TTL_HOURS:g}h.</i>"
+    )
+    await message.reply_text(text, parse_mode=ParseMode.HTML, disable_web_page_preview=True)
 
-    control_id = _get_control_user_id(context)
+
+async def _profile_text(control_id: int) -> str:
     settings = get_user_settings(control_id)
     horizon = settings.get("horizon", "medium")
     risk = settings.get("risk", "medium")
@@ -563,7 +613,7 @@ async def cmd_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
     }
     intensity, reliability = signal_intensity.get((horizon, risk), ("?", "?"))
 
-    msg = (
+    return (
         "<b>User Profile</b>\n"
         f"Horizon: <b>{horizon_name}</b>\n"
         f"Risk: <b>{risk_name}</b>\n"
@@ -575,6 +625,21 @@ async def cmd_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "/sethorizon <short|medium|long>\n"
         "/setrisk <low|medium|high>"
     )
+
+
+@vip_required
+async def cmd_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show user's profile and settings"""
+    user = update.effective_user
+    chat = update.effective_chat
+
+    if not user or not chat:
+        return
+
+    control_id = _get_control_user_id(context)
+    msg = await result_cache.cached(
+        ("profile", control_id), (result_cache.TOPIC_SETTINGS,), lambda: _profile_text(control_id)
+    )
     if not _is_control_user(context, user.id):
         msg += "\n\n<i>Only the bot owner can change these settings.</i>"
 
@@ -1,16 +1,17 @@
 from __future__ import annotations
 
 import math
-from dataclasses import dataclass
-from datetime import datetime, timezone
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
 from statistics import mean
-from typing import List, Literal, Optional, Sequence, Tuple
+from typing import Dict, List, Literal, Optional, Sequence, Tuple
 
 from binance import AsyncClient
 from loguru import logger
 
-from pumpbot.core.chart_generator import generate_chart
-from pumpbot.core.state import hours_since_last_signal, record_signal
+from pumpbot.core.chart_generator import LOOKBACK as CHART_LOOKBACK, ChartData
+from pumpbot.core.decision_cache import GATE_ATR, kline_close_time, record_rejection
+from pumpbot.core.state import hours_since_last_signal, last_signal_time, record_signal
 from pumpbot.core.signal_engine import SignalComponents, compute_score, passes_quality_gate
 
 Side = Literal["LONG", "SHORT"]
@@ -28,6 +29,7 @@ class SignalPayload:
     strategy: str
     created_at: datetime
     chart_path: Optional[str] = None
+    chart_data: Optional[ChartData] = None  # candles retained for the deferred chart stage
     # optional context
     rsi: Optional[float] = None
     atr_pct: Optional[float] = None
@@ -37,6 +39,7 @@ class SignalPayload:
     swing_low: Optional[float] = None
     trend_label: Optional[str] = None
     score: Optional[float] = None  # Dynamic score from signal_engine
+    components: Optional[Dict[str, float]] = None  # SignalComponents behind the score
 
 
 # --- math helpers (lightweight, no heavy deps) ---
@@ -141,21 +144,23 @@ async def _fetch_klines(client: AsyncClient, symbol: str, interval: str, limit:
         return None
 
 
-def _extract_lists(raw: list) -> tuple[List[float], List[float], List[float], List[float]]:
+def _extract_lists(raw: list) -> tuple[List[float], List[float], List[float], List[float], List[float]]:
+    opens: List[float] = []
     closes: List[float] = []
     highs: List[float] = []
     lows: List[float] = []
     volumes: List[float] = []
     for row in raw:
         try:
-            opens, high, low, close, vol = float(row[1]), float(row[2]), float(row[3]), float(row[4]), float(row[5])
+            open_, high, low, close, vol = float(row[1]), float(row[2]), float(row[3]), float(row[4]), float(row[5])
         except (ValueError, TypeError, IndexError):
             continue
+        opens.append(open_)
         closes.append(close)
         highs.append(high)
         lows.append(low)
         volumes.append(vol)
-    return closes, highs, lows, volumes
+    return closes, highs, lows, volumes, opens
 
 
 def _format_trend_label(trend: str, htf: str) -> str:
@@ -183,8 +188,8 @@ async def analyze_symbol_midterm(
     if not base_raw or not htf_raw:
         return None, None
 
-    base_close, base_high, base_low, base_vol = _extract_lists(base_raw)
-    htf_close, htf_high, htf_low, htf_vol = _extract_lists(htf_raw)
+    base_close, base_high, base_low, base_vol, base_open = _extract_lists(base_raw)
+    htf_close, htf_high, htf_low, htf_vol, _htf_open = _extract_lists(htf_raw)
 
     if len(base_close) < 60 or len(htf_close) < 60:
         logger.debug(f"{symbol} insufficient data base={len(base_close)} htf={len(htf_close)}")
@@ -236,6 +241,14 @@ async def analyze_symbol_midterm(
     atr_max_factor = 2.0 if adaptive else 1.8
     if atr_now < atr_min_factor * atr_mean or atr_now > atr_max_factor * atr_mean:
         logger.debug(f"{symbol} ATR filter fail (now {atr_now:.6f}, mean {atr_mean:.6f}) adaptive={adaptive}")
+        if atr_now > atr_max_factor * atr_mean:
+            # The forming candle's range only widens, so "ATR too high" holds until it closes,
+            # unless the wider adaptive band kicks in first
+            valid_until = kline_close_time(base_raw)
+            last = last_signal_time(symbol)
+            if not adaptive and last is not None and valid_until is not None:
+                valid_until = min(valid_until, last + timedelta(hours=4))
+            record_rejection(symbol, base_tf, htf_tf, GATE_ATR, valid_until)
         return None, base_close[-1]
 
     vol_ma = rolling_mean(base_vol, 20)
@@ -340,31 +353,24 @@ async def analyze_symbol_midterm(
 
     risk_reward = abs((tp1 - entry_mid) / risk) if risk != 0 else None
     
-    # Generate chart BEFORE creating payload
-    chart_path = None
-    try:
-        chart_path = generate_chart(
-            symbol=symbol,
-            closes=base_close,
-            highs=base_high,
-            lows=base_low,
-            opens=[row[1] for row in base_raw],
-            volumes=base_vol,
-            ema20=ema20,
-            ema50=ema50,
-            entry_price=entry_mid,
-            tp1=tp1,
-            tp2=tp2,
-            sl=sl,
-            signal_side=side,
-        )
-        if chart_path:
-            logger.success(f"{symbol} chart generated: {chart_path}")
-        else:
-            logger.warning(f"{symbol} chart generation returned None")
-    except Exception as exc:
-        logger.error(f"{symbol} chart generation error: {exc}", exc_info=True)
-    
+    # Keep only the candles the chart shows; rendering happens after the emit decision
+    keep = CHART_LOOKBACK
+    chart_data = ChartData(
+        symbol=symbol,
+        opens=base_open[-keep:],
+        highs=base_high[-keep:],
+        lows=base_low[-keep:],
+        closes=base_close[-keep:],
+        volumes=base_vol[-keep:],
+        ema20=ema20[-keep:],
+        ema50=ema50[-keep:],
+        entry_price=entry_mid,
+        tp1=tp1,
+        tp2=tp2,
+        sl=sl,
+        signal_side=side,
+    )
+
     payload = SignalPayload(
         symbol=symbol,
         side=side,
@@ -375,7 +381,7 @@ async def analyze_symbol_midterm(
         leverage=leverage,
         strategy=strategy,
         created_at=datetime.now(timezone.utc),
-        chart_path=chart_path,
+        chart_data=chart_data,
         rsi=base_rsi,
         atr_pct=(atr_now / close_now) if close_now else None,
         volume_spike_ratio=vol_ratio,
@@ -384,6 +390,7 @@ async def analyze_symbol_midterm(
         swing_low=swing_low,
         trend_label=_format_trend_label(trend, htf_tf),
         score=score,  # Add dynamic score
+        components=asdict(components),
     )
 
     # adaptive reset
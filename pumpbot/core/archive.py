@@ -0,0 +1,118 @@
+"""
+Monthly archival of closed trades and old signals.
+
+Rows older than ARCHIVE_AFTER_DAYS move out of the live database into one
+SQLite file per month under ARCHIVE_DIR (signals by ts_utc, closed trades by
+close time). The move runs on the database writer thread through
+database.write_exclusive(), so it is serialized with every other write: each
+month is ATTACHed to the writer connection, copied and deleted in one
+transaction, then detached. The live file keeps only recent and open rows,
+so hot queries and backups stay small; database.query_recent() and
+pnl_summary() read the archives transparently, and the daily aggregates are
+left untouched.
+
+The main database is in WAL mode, so the copy and the delete are not atomic
+across files: after a crash in between, the next run re-copies with INSERT OR
+IGNORE (ids are unique across partitions) and finishes the delete.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from loguru import logger
+
+from pumpbot.core import database
+from pumpbot.core.db_async import run_db
+from pumpbot.core.migrations import SIGNALS_TABLE, TRADES_TABLE
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))  # 0 disables archival
+ARCHIVE_INTERVAL_SECONDS = int(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+
+ARCHIVE_SCHEMA = [
+    SIGNALS_TABLE,
+    TRADES_TABLE,
+    "CREATE INDEX IF NOT EXISTS idx_signals_ts ON signals(ts_utc)",
+]
+
+# Trades fully filled at TP1 have no closed_at; their last update is the close
+TRADE_CLOSED_TS = "COALESCE(closed_at, last_update, opened_at)"
+
+# table -> (WHERE clause selecting archivable rows before the cutoff, partition month expression)
+_TABLES = {
+    "signals": ("ts_utc < ?", "substr(ts_utc, 1, 7)"),
+    "trades": (f"status='CLOSED' AND {TRADE_CLOSED_TS} < ?", f"substr({TRADE_CLOSED_TS}, 1, 7)"),
+}
+
+
+def _ensure_partition(month: str) -> None:
+    path = database.archive_path(month)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with closing(sqlite3.connect(path, isolation_level=None)) as con:
+        for statement in ARCHIVE_SCHEMA:
+            con.execute(statement)
+
+
+def _columns(con: sqlite3.Connection, table: str) -> str:
+    return ", ".join(row[1] for row in con.execute(f"PRAGMA main.table_info({table})"))
+
+
+def archive_old_rows(now: Optional[datetime] = None, after_days: int = ARCHIVE_AFTER_DAYS) -> Dict[str, int]:
+    """Move rows older than after_days into their monthly archives; returns moved rows per table."""
+    moved = {table: 0 for table in _TABLES}
+    if after_days <= 0 or not database.DB_PATH.exists():
+        return moved
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=after_days)
+    # signals.ts_utc is ISO-8601, trades use "YYYY-MM-DD HH:MM:SS"
+    cutoffs = {"signals": cutoff.isoformat(), "trades": cutoff.strftime("%Y-%m-%d %H:%M:%S")}
+
+    def move(con: sqlite3.Connection) -> None:
+        months = set()
+        for table, (where, month_expr) in _TABLES.items():
+            rows = con.execute(f"SELECT DISTINCT {month_expr} FROM {table} WHERE {where}", (cutoffs[table],))
+            months.update(row[0] for row in rows if row[0])
+
+        for month in sorted(months):
+            _ensure_partition(month)
+            con.execute("ATTACH DATABASE ? AS arc", (str(database.archive_path(month)),))
+            try:
+                con.execute("BEGIN IMMEDIATE")
+                for table, (where, month_expr) in _TABLES.items():
+                    columns = _columns(con, table)
+                    params = (cutoffs[table], month)
+                    condition = f"{where} AND {month_expr} = ?"
+                    con.execute(
+                        f"INSERT OR IGNORE INTO arc.{table} ({columns}) SELECT {columns} FROM main.{table} WHERE {condition}",
+                        params,
+                    )
+                    moved[table] += con.execute(f"DELETE FROM main.{table} WHERE {condition}", params).rowcount
+                con.execute("COMMIT")
+            except Exception:
+                if con.in_transaction:
+                    con.execute("ROLLBACK")
+                raise
+            finally:
+                con.execute("DETACH DATABASE arc")
+
+    database.write_exclusive(move)
+
+    if any(moved.values()):
+        logger.info(f"Archived {moved['signals']} signal(s) and {moved['trades']} trade(s) older than {after_days}d")
+    return moved
+
+
+async def run_archiver(interval_seconds: int = ARCHIVE_INTERVAL_SECONDS) -> None:
+    """Background task: archive old rows periodically."""
+    if ARCHIVE_AFTER_DAYS <= 0:
+        return
+    while True:
+        try:
+            await run_db(archive_old_rows)
+        except Exception as exc:
+            logger.warning(f"Archival failed: {exc}")
+        await asyncio.sleep(max(60, interval_seconds))
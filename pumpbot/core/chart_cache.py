@@ -0,0 +1,155 @@
+"""
+Bounded on-disk chart cache.
+
+Signal charts are delivered from memory; the copy under ./charts is optional and
+kept within a size and age budget. Least recently used files are evicted first,
+and a background janitor enforces the budget on long-running hosts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple
+
+from loguru import logger
+
+from pumpbot.core.chart_generator import CHARTS_DIR
+
+CHART_CACHE_ENABLED = os.getenv("CHART_CACHE_ENABLED", "1") == "1"
+CHART_CACHE_MAX_MB = float(os.getenv("CHART_CACHE_MAX_MB", "100"))
+CHART_CACHE_MAX_AGE_HOURS = float(os.getenv("CHART_CACHE_MAX_AGE_HOURS", "72"))
+CHART_CACHE_JANITOR_SECONDS = int(os.getenv("CHART_CACHE_JANITOR_SECONDS", "600"))
+
+
+class ChartCache:
+    def __init__(
+        self,
+        directory: Path = CHARTS_DIR,
+        max_bytes: int = int(CHART_CACHE_MAX_MB * 1024 * 1024),
+        max_age_seconds: float = CHART_CACHE_MAX_AGE_HOURS * 3600,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        # path -> (size, stored_at); order is least -> most recently used
+        self._index: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._total = 0
+        self._loaded = False
+        self._lock = threading.RLock()  # put() and the janitor run in worker threads
+
+    def _load(self) -> None:
+        """Index charts left by previous runs, oldest first."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.directory.exists():
+            return
+        entries = []
+        for path in self.directory.glob("chart_*.png"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, str(path), st.st_size))
+        for mtime, path, size in sorted(entries):
+            self._index[path] = (size, mtime)
+            self._total += size
+
+    def put(self, symbol: str, png: bytes) -> Optional[str]:
+        """Store a chart and return its path (None if the write failed or it was evicted at once)."""
+        with self._lock:
+            self._load()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        path = self.directory / f"chart_{symbol}_{timestamp}.png"
+        tmp = path.with_suffix(".tmp")
+        try:
+            tmp.write_bytes(png)
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.warning(f"Chart cache write failed for {symbol}: {exc}")
+            return None
+        key = str(path)
+        with self._lock:
+            self._index[key] = (len(png), time.time())
+            self._total += len(png)
+            self.evict()
+            return key if key in self._index else None
+
+    def get(self, path: str) -> Optional[bytes]:
+        """Read a cached chart and mark it as recently used."""
+        with self._lock:
+            self._load()
+            if path not in self._index:
+                return None
+            try:
+                data = Path(path).read_bytes()
+            except OSError:
+                self._forget(path)
+                return None
+            self._index.move_to_end(path)
+            return data
+
+    def _forget(self, path: str) -> None:
+        size, _ = self._index.pop(path, (0, 0.0))
+        self._total -= size
+
+    def _remove(self, path: str) -> None:
+        self._forget(path)
+        try:
+            Path(path).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            logger.warning(f"Chart cache could not delete {path}: {exc}")
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Drop expired charts, then least recently used ones until under the size budget."""
+        now = now if now is not None else time.time()
+        removed = 0
+        with self._lock:
+            self._load()
+            if self.max_age_seconds > 0:
+                for path, (_, stored_at) in list(self._index.items()):
+                    if now - stored_at > self.max_age_seconds:
+                        self._remove(path)
+                        removed += 1
+            while self._index and self._total > self.max_bytes:
+                path = next(iter(self._index))
+                self._remove(path)
+                removed += 1
+        if removed:
+            logger.debug(f"Chart cache evicted {removed} file(s); {len(self._index)} kept ({self._total / 1024:.0f} KiB)")
+        return removed
+
+    async def run_janitor(self, interval_seconds: int = CHART_CACHE_JANITOR_SECONDS) -> None:
+        """Background task: enforce the size/age budget periodically."""
+        while True:
+            try:
+                await asyncio.to_thread(self.evict)
+            except Exception as exc:
+                logger.warning(f"Chart cache janitor failed: {exc}")
+            await asyncio.sleep(max(30, interval_seconds))
+
+
+_cache: Optional[ChartCache] = None
+
+
+def get_chart_cache() -> ChartCache:
+    global _cache
+    if _cache is None:
+        _cache = ChartCache()
+    return _cache
+
+
+async def store_chart(symbol: str, png: bytes) -> Optional[str]:
+    """Keep an optional on-disk copy of a delivered chart."""
+    if not CHART_CACHE_ENABLED:
+        return None
+    return await asyncio.to_thread(get_chart_cache().put, symbol, png)
@@ -1,37 +1,113 @@
 """
-OHLC chart generator using matplotlib.
-Stores charts in ./charts directory with timestamp.
+OHLC chart generator with pluggable render backends.
+render_chart_png returns PNG bytes; pumpbot.core.chart_cache keeps the bounded
+on-disk copies under ./charts.
+
+Backends (CHART_BACKEND):
+  - matplotlib (default): full chart with axes, labels and legend
+    (see pumpbot.core.chart_matplotlib).
+  - raster: minimal numpy renderer that draws candles, EMAs, volume bars and
+    entry/TP/SL lines straight into a pixel buffer (see pumpbot.core.chart_raster).
+Backend modules are imported on first use, so a raster-only deployment never
+imports matplotlib for signal charts.
 """
 
 from __future__ import annotations
 
+import importlib
 import os
-from datetime import datetime
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from loguru import logger
 
-try:
-    import matplotlib
-    matplotlib.use('Agg')  # Non-GUI backend
-    import matplotlib.pyplot as plt
-    import matplotlib.patches as mpatches
-    from matplotlib.patches import Rectangle
-except ImportError:
-    logger.error("matplotlib not installed. Install with: pip install matplotlib")
-    plt = None
+CHARTS_DIR = Path("charts")
+CHART_BACKEND = os.getenv("CHART_BACKEND", "matplotlib").strip().lower()
+LOOKBACK = 50
+
+UP_COLOR = '#00aa00'
+DOWN_COLOR = '#ff0000'
+UP_VOLUME_COLOR = '#00aa0055'
+DOWN_VOLUME_COLOR = '#ff000055'
+EMA20_COLOR = '#0000ff'
+EMA50_COLOR = '#ffa500'
+TP1_COLOR = '#0088ff'
+TP2_COLOR = '#00ccff'
+SL_COLOR = '#ff6600'
+CANDLE_WIDTH = 0.6
+WICK_WIDTH = 0.1
+VOLUME_WIDTH = 0.8
 
+_BACKEND_MODULES = {
+    "matplotlib": "pumpbot.core.chart_matplotlib",
+    "raster": "pumpbot.core.chart_raster",
+}
+_backends: Dict[str, "ChartBackend"] = {}
 
-CHARTS_DIR = Path("charts")
 
+@dataclass
+class ChartData:
+    """Candle data and levels for one chart (also retained for deferred rendering)."""
 
-def ensure_charts_dir() -> None:
-    """Create ./charts directory if it doesn't exist."""
-    CHARTS_DIR.mkdir(exist_ok=True)
+    symbol: str
+    opens: List[float]
+    highs: List[float]
+    lows: List[float]
+    closes: List[float]
+    volumes: Optional[List[float]] = None
+    ema20: Optional[List[float]] = None
+    ema50: Optional[List[float]] = None
+    entry_price: Optional[float] = None
+    tp1: Optional[float] = None
+    tp2: Optional[float] = None
+    sl: Optional[float] = None
+    signal_side: Optional[str] = None
 
 
-def generate_chart(
+class ChartBackend(ABC):
+    """
+    Render engine interface.
+
+    render_png receives a validated ChartData window (floats, at most LOOKBACK
+    candles, volumes always set) and returns PNG bytes.
+    """
+
+    name = "base"
+
+    def warm(self) -> None:
+        """Optional hook to pay import/setup costs before the first render."""
+
+    @abstractmethod
+    def render_png(self, data: ChartData) -> bytes:
+        """Render the chart window to PNG bytes."""
+
+
+def get_backend(name: Optional[str] = None) -> Optional[ChartBackend]:
+    """Return the configured backend instance (imported on first use)."""
+    name = (name or CHART_BACKEND).lower()
+    if name not in _BACKEND_MODULES:
+        logger.warning(f"Unknown chart backend {name!r}; using matplotlib")
+        name = "matplotlib"
+    backend = _backends.get(name)
+    if backend is None:
+        try:
+            backend = importlib.import_module(_BACKEND_MODULES[name]).BACKEND
+        except ImportError as exc:
+            logger.error(f"Chart backend {name} unavailable: {exc}")
+            return None
+        _backends[name] = backend
+    return backend
+
+
+def warm_backend(name: Optional[str] = None) -> None:
+    backend = get_backend(name)
+    if backend is not None:
+        backend.warm()
+
+
+def render_chart_png(
     symbol: str,
     closes: List[float],
     highs: List[float],
@@ -45,10 +121,11 @@ def generate_chart(
     tp2: Optional[float] = None,
     sl: Optional[float] = None,
     signal_side: Optional[str] = None,  # "LONG" or "SHORT"
-) -> Optional[str]:
+    backend: Optional[str] = None,
+) -> Optional[bytes]:
     """
     Generate OHLC candle chart with optional EMAs and signal levels.
-    
+
     Args:
         symbol: Trading pair (e.g., "BTCUSDT")
         closes: List of closing prices
@@ -63,25 +140,24 @@ def generate_chart(
         tp2: Second take-profit level
         sl: Stop-loss level
         signal_side: "LONG" or "SHORT" to color entry accordingly
-    
+        backend: Render backend name (defaults to CHART_BACKEND)
+
     Returns:
-        Path to saved chart file, or None if generation failed
+        PNG bytes, or None if generation failed
     """
-    if plt is None:
-        logger.error("matplotlib not available for chart generation")
+    engine = get_backend(backend)
+    if engine is None:
         return None
-    
+
     if not closes or not highs or not lows or not opens:
         logger.warning(f"{symbol}: Cannot generate chart - missing OHLC data")
         return None
-    
+
     if len(closes) != len(highs) or len(closes) != len(lows) or len(closes) != len(opens):
         logger.warning(f"{symbol}: OHLC length mismatch")
         return None
-    
+
     try:
-        ensure_charts_dir()
-        
         # Convert all inputs to float to avoid string comparison errors
         try:
             closes = [float(x) for x in closes]
@@ -97,86 +173,48 @@ def generate_chart(
         except (ValueError, TypeError) as cast_exc:
             logger.warning(f"{symbol}: Could not convert data to float: {cast_exc}")
             return None
-        
+
         # Use last 50 candles for visibility
-        lookback = min(50, len(closes))
-        x = list(range(lookback))
-        closes_vis = closes[-lookback:]
-        highs_vis = highs[-lookback:]
-        lows_vis = lows[-lookback:]
-        opens_vis = opens[-lookback:]
-        
-        ema20_vis = ema20[-lookback:] if ema20 and len(ema20) >= lookback else None
-        ema50_vis = ema50[-lookback:] if ema50 and len(ema50) >= lookback else None
-        
-        # Create figure with subplots
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), gridspec_kw={'height_ratios': [3, 1]})
-        fig.suptitle(f'{symbol} OHLC Chart', fontsize=14, fontweight='bold')
-        
-        # --- Price chart ---
-        candle_width = 0.6
-        wick_width = 0.1
-        
-        for i in x:
-            o, h, low, c = opens_vis[i], highs_vis[i], lows_vis[i], closes_vis[i]
-            color = '#00aa00' if c >= o else '#ff0000'  # Green for up, red for down
-            
-            # Wick (high-low line)
-            ax1.plot([i, i], [low, h], color=color, linewidth=wick_width)
-            
-            # Body (open-close rectangle)
-            body_height = abs(c - o)
-            body_bottom = min(o, c)
-            ax1.add_patch(Rectangle((i - candle_width/2, body_bottom), candle_width, body_height,
-                                    facecolor=color, edgecolor=color, linewidth=0.5))
-        
-        # EMAs
-        if ema20_vis:
-            ax1.plot(x, ema20_vis, label='EMA20', color='blue', linewidth=1.5, alpha=0.7)
-        if ema50_vis:
-            ax1.plot(x, ema50_vis, label='EMA50', color='orange', linewidth=1.5, alpha=0.7)
-        
-        # Signal levels
-        if entry_price is not None:
-            entry_color = '#00aa00' if signal_side == 'LONG' else '#ff0000'
-            entry_label = f'Entry ({entry_price:.4f})'
-            ax1.axhline(y=entry_price, color=entry_color, linestyle='--', linewidth=1.5, label=entry_label, alpha=0.8)
-        
-        if tp1 is not None:
-            ax1.axhline(y=tp1, color='#0088ff', linestyle='--', linewidth=1, label=f'TP1 ({tp1:.4f})', alpha=0.6)
-        
-        if tp2 is not None:
-            ax1.axhline(y=tp2, color='#00ccff', linestyle='--', linewidth=1, label=f'TP2 ({tp2:.4f})', alpha=0.6)
-        
-        if sl is not None:
-            ax1.axhline(y=sl, color='#ff6600', linestyle='--', linewidth=1, label=f'SL ({sl:.4f})', alpha=0.6)
-        
-        ax1.set_ylabel('Price (USDT)', fontsize=10)
-        ax1.legend(loc='upper left', fontsize=8)
-        ax1.grid(True, alpha=0.3)
-        ax1.set_xlim(left=0, right=len(x)-1)
-        
-        # --- Volume chart ---
-        volumes_vis = volumes[-lookback:] if volumes else [0] * lookback
-        vol_colors = ['#00aa0055' if closes_vis[i] >= opens_vis[i] else '#ff000055' for i in range(len(closes_vis))]
-        ax2.bar(x, volumes_vis, color=vol_colors, width=0.8)
-        ax2.set_ylabel('Volume', fontsize=10)
-        ax2.grid(True, alpha=0.3)
-        ax2.set_xlim(left=0, right=len(x)-1)
-        
-        plt.tight_layout()
-        
-        # Save with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"chart_{symbol}_{timestamp}.png"
-        filepath = CHARTS_DIR / filename
-        
-        plt.savefig(filepath, dpi=100, bbox_inches='tight')
-        plt.close(fig)
-        
-        logger.info(f"Chart saved: {filepath}")
-        return str(filepath)
-        
+        lookback = min(LOOKBACK, len(closes))
+        window = ChartData(
+            symbol=symbol,
+            opens=opens[-lookback:],
+            highs=highs[-lookback:],
+            lows=lows[-lookback:],
+            closes=closes[-lookback:],
+            volumes=volumes[-lookback:] if volumes else [0.0] * lookback,
+            ema20=ema20[-lookback:] if ema20 and len(ema20) >= lookback else None,
+            ema50=ema50[-lookback:] if ema50 and len(ema50) >= lookback else None,
+            entry_price=entry_price,
+            tp1=tp1,
+            tp2=tp2,
+            sl=sl,
+            signal_side=signal_side,
+        )
+        return engine.render_png(window)
+
     except Exception as exc:
         logger.error(f"Chart generation failed for {symbol}: {exc}")
         return None
+
+
+def level_specs(data: ChartData) -> list:
+    """(value, color, linewidth, label, alpha) for each signal level line."""
+    entry_price, tp1, tp2, sl = data.entry_price, data.tp1, data.tp2, data.sl
+    entry_color = UP_COLOR if data.signal_side == 'LONG' else DOWN_COLOR
+    return [
+        (entry_price, entry_color, 1.5, f'Entry ({entry_price:.4f})' if entry_price is not None else '', 0.8),
+        (tp1, TP1_COLOR, 1.0, f'TP1 ({tp1:.4f})' if tp1 is not None else '', 0.6),
+        (tp2, TP2_COLOR, 1.0, f'TP2 ({tp2:.4f})' if tp2 is not None else '', 0.6),
+        (sl, SL_COLOR, 1.0, f'SL ({sl:.4f})' if sl is not None else '', 0.6),
+    ]
+
+
+def price_range(data: ChartData) -> Tuple[float, float]:
+    """Price axis limits covering candles and level lines with a 5% margin."""
+    y_lo, y_hi = min(data.lows), max(data.highs)
+    for value, *_ in level_specs(data):
+        if value is not None:
+            y_lo, y_hi = min(y_lo, value), max(y_hi, value)
+    pad = (y_hi - y_lo) * 0.05 or abs(y_hi) * 0.01 or 1.0
+    return y_lo - pad, y_hi + pad
@@ -0,0 +1,211 @@
+"""
+matplotlib chart backend.
+
+Two render paths share the same layout:
+  - fast (default): candles drawn as one LineCollection (wicks) and one
+    PolyCollection (bodies) on a pre-laid-out figure template that is reused
+    between renders; only data and level lines are updated.
+  - classic: a fresh figure with one artist per candle (CHART_FAST_PATH=0).
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import threading
+from typing import BinaryIO
+
+import matplotlib
+
+matplotlib.use('Agg')  # Non-GUI backend
+import matplotlib.pyplot as plt  # noqa: E402
+from matplotlib.collections import LineCollection, PolyCollection  # noqa: E402
+from matplotlib.patches import Rectangle  # noqa: E402
+
+from pumpbot.core.chart_generator import (  # noqa: E402
+    CANDLE_WIDTH,
+    DOWN_COLOR,
+    DOWN_VOLUME_COLOR,
+    EMA20_COLOR,
+    EMA50_COLOR,
+    UP_COLOR,
+    UP_VOLUME_COLOR,
+    VOLUME_WIDTH,
+    WICK_WIDTH,
+    ChartBackend,
+    ChartData,
+    level_specs,
+    price_range,
+)
+
+CHART_FAST_PATH = os.getenv("CHART_FAST_PATH", "1") == "1"
+
+
+def _render_classic(target: BinaryIO, data: ChartData) -> None:
+    opens_vis, highs_vis, lows_vis, closes_vis = data.opens, data.highs, data.lows, data.closes
+    x = list(range(len(closes_vis)))
+
+    # Create figure with subplots
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), gridspec_kw={'height_ratios': [3, 1]})
+    fig.suptitle(f'{data.symbol} OHLC Chart', fontsize=14, fontweight='bold')
+
+    # --- Price chart ---
+    for i in x:
+        o, h, low, c = opens_vis[i], highs_vis[i], lows_vis[i], closes_vis[i]
+        color = UP_COLOR if c >= o else DOWN_COLOR  # Green for up, red for down
+
+        # Wick (high-low line)
+        ax1.plot([i, i], [low, h], color=color, linewidth=WICK_WIDTH)
+
+        # Body (open-close rectangle)
+        body_height = abs(c - o)
+        body_bottom = min(o, c)
+        ax1.add_patch(Rectangle((i - CANDLE_WIDTH/2, body_bottom), CANDLE_WIDTH, body_height,
+                                facecolor=color, edgecolor=color, linewidth=0.5))
+
+    # EMAs
+    if data.ema20:
+        ax1.plot(x, data.ema20, label='EMA20', color=EMA20_COLOR, linewidth=1.5, alpha=0.7)
+    if data.ema50:
+        ax1.plot(x, data.ema50, label='EMA50', color=EMA50_COLOR, linewidth=1.5, alpha=0.7)
+
+    # Signal levels
+    for value, color, width, label, alpha in level_specs(data):
+        if value is not None:
+            ax1.axhline(y=value, color=color, linestyle='--', linewidth=width, label=label, alpha=alpha)
+
+    ax1.set_ylabel('Price (USDT)', fontsize=10)
+    ax1.legend(loc='upper left', fontsize=8)
+    ax1.grid(True, alpha=0.3)
+    ax1.set_xlim(left=0, right=len(x)-1)
+
+    # --- Volume chart ---
+    vol_colors = [UP_VOLUME_COLOR if closes_vis[i] >= opens_vis[i] else DOWN_VOLUME_COLOR for i in x]
+    ax2.bar(x, data.volumes, color=vol_colors, width=VOLUME_WIDTH)
+    ax2.set_ylabel('Volume', fontsize=10)
+    ax2.grid(True, alpha=0.3)
+    ax2.set_xlim(left=0, right=len(x)-1)
+
+    plt.tight_layout()
+    plt.savefig(target, format='png', dpi=100, bbox_inches='tight')
+    plt.close(fig)
+
+
+class _FigureTemplate:
+    """
+    Pre-laid-out chart figure whose artists are updated in place.
+
+    One template per thread (and therefore per chart worker process); the
+    layout is computed once, so renders skip tight_layout and the bbox pass.
+    """
+
+    def __init__(self):
+        self.fig, (self.ax1, self.ax2) = plt.subplots(
+            2, 1, figsize=(12, 8), gridspec_kw={'height_ratios': [3, 1]}
+        )
+        self.title = self.fig.suptitle('', fontsize=14, fontweight='bold')
+
+        self.wicks = LineCollection([], linewidths=WICK_WIDTH)
+        self.bodies = PolyCollection([], linewidths=0.5)
+        self.ax1.add_collection(self.wicks)
+        self.ax1.add_collection(self.bodies)
+        (self.ema20_line,) = self.ax1.plot([], [], label='EMA20', color=EMA20_COLOR, linewidth=1.5, alpha=0.7)
+        (self.ema50_line,) = self.ax1.plot([], [], label='EMA50', color=EMA50_COLOR, linewidth=1.5, alpha=0.7)
+        self.level_lines = [
+            self.ax1.axhline(y=0.0, linestyle='--', visible=False) for _ in range(4)
+        ]
+        self.ax1.set_ylabel('Price (USDT)', fontsize=10)
+        self.ax1.grid(True, alpha=0.3)
+
+        self.volume_bars = PolyCollection([], linewidths=0)
+        self.ax2.add_collection(self.volume_bars)
+        self.ax2.set_ylabel('Volume', fontsize=10)
+        self.ax2.grid(True, alpha=0.3)
+
+        self.fig.tight_layout(rect=(0, 0, 1, 0.96))
+        # Freeze the layout: a persistent layout engine would force an extra draw per savefig
+        self.fig.set_layout_engine("none")
+
+    def render(self, target: BinaryIO, data: ChartData) -> None:
+        opens_vis, highs_vis, lows_vis, closes_vis = data.opens, data.highs, data.lows, data.closes
+        n = len(closes_vis)
+        half = CANDLE_WIDTH / 2
+        vol_half = VOLUME_WIDTH / 2
+        colors = [UP_COLOR if closes_vis[i] >= opens_vis[i] else DOWN_COLOR for i in range(n)]
+        vol_colors = [UP_VOLUME_COLOR if closes_vis[i] >= opens_vis[i] else DOWN_VOLUME_COLOR for i in range(n)]
+
+        self.title.set_text(f'{data.symbol} OHLC Chart')
+
+        self.wicks.set_segments([[(i, lows_vis[i]), (i, highs_vis[i])] for i in range(n)])
+        self.wicks.set_colors(colors)
+        body_verts = []
+        for i in range(n):
+            lo, hi = min(opens_vis[i], closes_vis[i]), max(opens_vis[i], closes_vis[i])
+            body_verts.append([(i - half, lo), (i - half, hi), (i + half, hi), (i + half, lo)])
+        self.bodies.set_verts(body_verts)
+        self.bodies.set_facecolors(colors)
+        self.bodies.set_edgecolors(colors)
+
+        x = list(range(n))
+        handles = []
+        for line, values in ((self.ema20_line, data.ema20), (self.ema50_line, data.ema50)):
+            line.set_visible(bool(values))
+            line.set_data(x, values or [])
+            if values:
+                handles.append(line)
+
+        for line, (value, color, width, label, alpha) in zip(self.level_lines, level_specs(data)):
+            line.set_visible(value is not None)
+            if value is None:
+                continue
+            line.set_ydata([value, value])
+            line.set_color(color)
+            line.set_linewidth(width)
+            line.set_alpha(alpha)
+            line.set_label(label)
+            handles.append(line)
+
+        self.ax1.set_ylim(*price_range(data))
+        self.ax1.set_xlim(left=0, right=max(n - 1, 1))
+        self.ax1.legend(handles=handles, loc='upper left', fontsize=8)
+
+        volumes_vis = data.volumes
+        self.volume_bars.set_verts(
+            [[(i - vol_half, 0.0), (i - vol_half, v), (i + vol_half, v), (i + vol_half, 0.0)] for i, v in enumerate(volumes_vis)]
+        )
+        self.volume_bars.set_facecolors(vol_colors)
+        self.ax2.set_ylim(0, (max(volumes_vis) if volumes_vis else 0) * 1.05 or 1.0)
+        self.ax2.set_xlim(left=0, right=max(n - 1, 1))
+
+        self.fig.savefig(target, format='png', dpi=100, pil_kwargs={"compress_level": 1})
+
+
+class MatplotlibBackend(ChartBackend):
+    name = "matplotlib"
+
+    def __init__(self, fast: bool = CHART_FAST_PATH):
+        self.fast = fast
+        self._templates = threading.local()
+
+    def _template(self) -> _FigureTemplate:
+        template = getattr(self._templates, "figure", None)
+        if template is None:
+            template = _FigureTemplate()
+            self._templates.figure = template
+        return template
+
+    def warm(self) -> None:
+        """Build this thread's figure template ahead of the first render."""
+        if self.fast:
+            self._template()
+
+    def render_png(self, data: ChartData, fast: bool | None = None) -> bytes:
+        buf = io.BytesIO()
+        if self.fast if fast is None else fast:
+            self._template().render(buf, data)
+        else:
+            _render_classic(buf, data)
+        return buf.getvalue()
+
+
+BACKEND = MatplotlibBackend()
@@ -0,0 +1,187 @@
+"""
+Minimal raster chart backend.
+
+Draws candles, EMA lines, volume bars and entry/TP/SL lines straight into a
+numpy RGB buffer and encodes it as a PNG with zlib. No axes text or legend:
+the signal caption already carries the levels. Renders take milliseconds and
+need only numpy.
+"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from pumpbot.core.chart_generator import (
+    CANDLE_WIDTH,
+    DOWN_COLOR,
+    DOWN_VOLUME_COLOR,
+    EMA20_COLOR,
+    EMA50_COLOR,
+    UP_COLOR,
+    UP_VOLUME_COLOR,
+    VOLUME_WIDTH,
+    ChartBackend,
+    ChartData,
+    level_specs,
+    price_range,
+)
+
+WIDTH = 1200
+HEIGHT = 800
+MARGIN_LEFT = 60
+MARGIN_RIGHT = 20
+MARGIN_TOP = 40
+MARGIN_BOTTOM = 30
+PANEL_GAP = 20
+PRICE_PANEL_RATIO = 0.75  # same 3:1 split as the matplotlib layout
+
+BACKGROUND = (255, 255, 255)
+GRID_COLOR = (230, 230, 230)
+FRAME_COLOR = (0, 0, 0)
+PNG_COMPRESS_LEVEL = 6
+
+
+def _rgb(color: str) -> Tuple[int, int, int]:
+    """'#rrggbb' or '#rrggbbaa' -> RGB, alpha blended over the white background."""
+    value = color.lstrip('#')
+    r, g, b = (int(value[i:i + 2], 16) for i in (0, 2, 4))
+    if len(value) == 8:
+        alpha = int(value[6:8], 16) / 255.0
+        r, g, b = (round(c * alpha + bg * (1 - alpha)) for c, bg in zip((r, g, b), BACKGROUND))
+    return r, g, b
+
+
+def encode_png(img: np.ndarray, level: int = PNG_COMPRESS_LEVEL) -> bytes:
+    """Encode an RGB uint8 array as PNG (color type 2, 'Up' filter on every row)."""
+    height, width, _ = img.shape
+    rows = img.reshape(height, width * 3)
+    filtered = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    filtered[:, 0] = 2  # Up filter: byte minus the byte above
+    filtered[0, 1:] = rows[0]
+    filtered[1:, 1:] = rows[1:] - rows[:-1]  # uint8 arithmetic wraps mod 256 as PNG expects
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(filtered.tobytes(), level))
+        + chunk(b"IEND", b"")
+    )
+
+
+class _Canvas:
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.img = np.full((height, width, 3), BACKGROUND, dtype=np.uint8)
+
+    def rect(self, x0: float, x1: float, y0: float, y1: float, color: Tuple[int, int, int]) -> None:
+        xa, xb = sorted((int(round(x0)), int(round(x1))))
+        ya, yb = sorted((int(round(y0)), int(round(y1))))
+        xa, xb = max(xa, 0), min(xb, self.width - 1)
+        ya, yb = max(ya, 0), min(yb, self.height - 1)
+        if xa <= xb and ya <= yb:
+            self.img[ya:yb + 1, xa:xb + 1] = color
+
+    def frame(self, x0: int, x1: int, y0: int, y1: int, color: Tuple[int, int, int]) -> None:
+        self.rect(x0, x1, y0, y0, color)
+        self.rect(x0, x1, y1, y1, color)
+        self.rect(x0, x0, y0, y1, color)
+        self.rect(x1, x1, y0, y1, color)
+
+    def dashed_hline(self, x0: int, x1: int, y: float, color, thickness: int = 1, dash: int = 8, gap: int = 5) -> None:
+        top = int(round(y)) - thickness // 2
+        for start in range(x0, x1 + 1, dash + gap):
+            self.rect(start, min(start + dash - 1, x1), top, top + thickness - 1, color)
+
+    def polyline(self, xs: Sequence[float], ys: Sequence[float], color, thickness: int = 2) -> None:
+        if len(xs) < 2:
+            return
+        px, py = [], []
+        for (xa, ya), (xb, yb) in zip(zip(xs, ys), zip(xs[1:], ys[1:])):
+            steps = int(max(abs(xb - xa), abs(yb - ya))) + 1
+            px.append(np.linspace(xa, xb, steps))
+            py.append(np.linspace(ya, yb, steps))
+        x = np.rint(np.concatenate(px)).astype(int)
+        y = np.rint(np.concatenate(py)).astype(int)
+        for dx in range(thickness):
+            for dy in range(thickness):
+                xx = np.clip(x + dx - thickness // 2, 0, self.width - 1)
+                yy = np.clip(y + dy - thickness // 2, 0, self.height - 1)
+                self.img[yy, xx] = color
+
+
+class RasterBackend(ChartBackend):
+    name = "raster"
+
+    def __init__(self, width: int = WIDTH, height: int = HEIGHT):
+        self.width = width
+        self.height = height
+
+    def render_png(self, data: ChartData) -> bytes:
+        canvas = _Canvas(self.width, self.height)
+        n = len(data.closes)
+        left, right = MARGIN_LEFT, self.width - MARGIN_RIGHT
+        inner_h = self.height - MARGIN_TOP - MARGIN_BOTTOM - PANEL_GAP
+        price_top = MARGIN_TOP
+        price_bottom = price_top + int(inner_h * PRICE_PANEL_RATIO)
+        vol_top = price_bottom + PANEL_GAP
+        vol_bottom = self.height - MARGIN_BOTTOM
+        slot = (right - left) / max(n, 1)
+
+        y_lo, y_hi = price_range(data)
+        price_span = (y_hi - y_lo) or 1.0
+
+        def x_of(i: float) -> float:
+            return left + (i + 0.5) * slot
+
+        def y_of(price: float) -> float:
+            return price_top + (y_hi - price) / price_span * (price_bottom - price_top)
+
+        for k in range(1, 5):
+            canvas.rect(left, right, price_top + k * (price_bottom - price_top) / 5, price_top + k * (price_bottom - price_top) / 5, GRID_COLOR)
+            canvas.rect(left, right, vol_top + k * (vol_bottom - vol_top) / 5, vol_top + k * (vol_bottom - vol_top) / 5, GRID_COLOR)
+
+        # Volume bars
+        vol_max = max(data.volumes) if data.volumes else 0.0
+        up_vol, down_vol = _rgb(UP_VOLUME_COLOR), _rgb(DOWN_VOLUME_COLOR)
+        half_bar = max(slot * VOLUME_WIDTH / 2, 0.5)
+        for i, v in enumerate(data.volumes or []):
+            if vol_max <= 0 or v <= 0:
+                continue
+            color = up_vol if data.closes[i] >= data.opens[i] else down_vol
+            top = vol_bottom - v / (vol_max * 1.05) * (vol_bottom - vol_top)
+            canvas.rect(x_of(i) - half_bar, x_of(i) + half_bar - 1, top, vol_bottom, color)
+
+        # Candles: 1px wick plus body
+        up, down = _rgb(UP_COLOR), _rgb(DOWN_COLOR)
+        half_body = max(slot * CANDLE_WIDTH / 2, 1.0)
+        for i in range(n):
+            o, h, low, c = data.opens[i], data.highs[i], data.lows[i], data.closes[i]
+            color = up if c >= o else down
+            cx = x_of(i)
+            canvas.rect(cx, cx, y_of(h), y_of(low), color)
+            canvas.rect(cx - half_body, cx + half_body - 1, y_of(max(o, c)), y_of(min(o, c)), color)
+
+        xs = [x_of(i) for i in range(n)]
+        for values, color in ((data.ema20, EMA20_COLOR), (data.ema50, EMA50_COLOR)):
+            if values:
+                canvas.polyline(xs, [y_of(v) for v in values], _rgb(color), thickness=2)
+
+        for value, color, width, _label, _alpha in level_specs(data):
+            if value is not None:
+                canvas.dashed_hline(left, right, y_of(value), _rgb(color), thickness=2 if width > 1 else 1)
+
+        canvas.frame(left, right, price_top, price_bottom, FRAME_COLOR)
+        canvas.frame(left, right, vol_top, vol_bottom, FRAME_COLOR)
+        return encode_png(canvas.img)
+
+
+BACKEND = RasterBackend()
@@ -0,0 +1,183 @@
+"""
+Asynchronous chart rendering service.
+
+Chart jobs go into a bounded asyncio queue and are rendered by a pool of worker
+processes that import the chart backend once at startup, so a render never blocks the
+event loop that runs the scanner and the Telegram handlers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from pumpbot.core.chart_generator import ChartData
+
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", "2"))
+CHART_QUEUE_SIZE = int(os.getenv("CHART_QUEUE_SIZE", "16"))
+CHART_RENDER_TIMEOUT = float(os.getenv("CHART_RENDER_TIMEOUT", "20"))
+
+
+def _init_worker() -> None:
+    """Import the configured chart backend and warm it so jobs only pay for rendering."""
+    from pumpbot.core.chart_generator import warm_backend
+
+    warm_backend()
+
+
+def _render_job(chart_kwargs: Dict[str, Any]) -> Optional[bytes]:
+    from pumpbot.core.chart_generator import render_chart_png
+
+    return render_chart_png(**chart_kwargs)
+
+
+class ChartService:
+    """
+    Bounded chart job queue backed by worker processes.
+
+    submit() returns an asyncio future; render() awaits it with a timeout and
+    cancels the job if the caller gives up before a worker picks it up.
+    """
+
+    def __init__(
+        self,
+        workers: int = CHART_WORKERS,
+        queue_size: int = CHART_QUEUE_SIZE,
+        timeout: float = CHART_RENDER_TIMEOUT,
+    ):
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.timeout = timeout
+        self._pool: Optional[Executor] = None
+        self._queue: Optional[asyncio.Queue[Tuple[Dict[str, Any], asyncio.Future]]] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def _create_pool(self) -> Executor:
+        try:
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        except Exception as exc:
+            # matplotlib is not thread-safe: without processes, every render runs on one thread
+            logger.warning(f"Chart process pool unavailable, rendering in a single thread: {exc}")
+            return ThreadPoolExecutor(max_workers=1, thread_name_prefix="chart-render", initializer=_init_worker)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._pool = self._create_pool()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Chart service started | workers={self.workers} queue={self.queue_size}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, fut = self._queue.get_nowait()
+                fut.cancel()
+        self._queue = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        logger.info("Chart service stopped")
+
+    def submit(self, **chart_kwargs) -> asyncio.Future:
+        """Queue a render job. Raises asyncio.QueueFull when the queue is saturated."""
+        if not self.running:
+            self.start()
+        fut = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((chart_kwargs, fut))
+        return fut
+
+    async def render(self, timeout: Optional[float] = None, **chart_kwargs) -> Optional[bytes]:
+        """Render a chart off the event loop; returns PNG bytes or None."""
+        symbol = chart_kwargs.get("symbol", "?")
+        try:
+            fut = self.submit(**chart_kwargs)
+        except asyncio.QueueFull:
+            logger.warning(f"{symbol}: chart queue full ({self.queue_size}), render dropped")
+            return None
+        try:
+            return await asyncio.wait_for(fut, timeout if timeout is not None else self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{symbol}: chart render timed out")
+            return None
+
+    def _restart_pool(self, broken: Optional[Executor], exc: BaseException) -> None:
+        """Replace a broken pool once, even when several workers see it fail."""
+        if broken is not self._pool:
+            return
+        logger.error(f"Chart worker pool broken, restarting: {exc}")
+        if broken is not None:
+            broken.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._create_pool()
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            chart_kwargs, fut = await self._queue.get()
+            try:
+                if fut.cancelled():
+                    continue
+                pool = self._pool
+                try:
+                    result = await loop.run_in_executor(pool, _render_job, chart_kwargs)
+                except BrokenProcessPool as exc:
+                    self._restart_pool(pool, exc)
+                    if not fut.done():
+                        fut.set_exception(exc)
+                    continue
+                except Exception as exc:
+                    if not fut.done():
+                        fut.set_exception(exc)
+                    continue
+                if not fut.done():
+                    fut.set_result(result)
+            finally:
+                self._queue.task_done()
+
+
+_service: Optional[ChartService] = None
+
+
+def get_chart_service() -> ChartService:
+    global _service
+    if _service is None:
+        _service = ChartService()
+    return _service
+
+
+async def render_signal_chart(chart_data: ChartData) -> Optional[bytes]:
+    """Chart stage of the signal pipeline: render PNG bytes for an accepted signal."""
+    symbol = chart_data.symbol
+    try:
+        png = await get_chart_service().render(**asdict(chart_data))
+    except Exception as exc:
+        logger.error(f"{symbol} chart generation error: {exc}", exc_info=True)
+        return None
+    if png:
+        logger.success(f"{symbol} chart generated ({len(png) / 1024:.0f} KiB)")
+    else:
+        logger.warning(f"{symbol} chart generation returned None")
+    return png
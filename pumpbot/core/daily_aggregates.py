@@ -0,0 +1,153 @@
+"""
+Materialized per-day report figures.
+
+daily_aggregates holds one row per local calendar day (signal count, score
+sum/max, up/down trend counts, closed trades, wins/losses, PnL) and
+daily_buckets the histograms (score buckets, PnL per hour). database.py
+updates them inside the same write transaction as save_signal() and
+trade_close_all(), so the daily report reads one day's figures instead of
+rebuilding them from raw signals and trades.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+SCORE_BUCKET_WIDTH = 5.0
+
+METRIC_SCORE = "score"  # bucket = floor(score / SCORE_BUCKET_WIDTH), value = signal count
+METRIC_PNL_HOUR = "pnl_hour"  # bucket = local hour of the close, value = PnL USD
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS daily_aggregates (
+        day TEXT PRIMARY KEY,
+        signals INTEGER NOT NULL DEFAULT 0,
+        score_count INTEGER NOT NULL DEFAULT 0,
+        score_sum REAL NOT NULL DEFAULT 0,
+        score_max REAL,
+        up_count INTEGER NOT NULL DEFAULT 0,
+        down_count INTEGER NOT NULL DEFAULT 0,
+        closed INTEGER NOT NULL DEFAULT 0,
+        wins INTEGER NOT NULL DEFAULT 0,
+        losses INTEGER NOT NULL DEFAULT 0,
+        pnl_usd REAL NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS daily_buckets (
+        day TEXT NOT NULL,
+        metric TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        value REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, metric, bucket)
+    ) WITHOUT ROWID
+    """,
+]
+
+_SIGNAL_SQL = """
+    INSERT INTO daily_aggregates (day, signals, score_count, score_sum, score_max, up_count, down_count)
+    VALUES (?, 1, ?, ?, ?, ?, ?)
+    ON CONFLICT(day) DO UPDATE SET
+        signals = signals + 1,
+        score_count = score_count + excluded.score_count,
+        score_sum = score_sum + excluded.score_sum,
+        score_max = CASE WHEN score_max IS NULL OR excluded.score_max > score_max
+                         THEN COALESCE(excluded.score_max, score_max) ELSE score_max END,
+        up_count = up_count + excluded.up_count,
+        down_count = down_count + excluded.down_count
+"""
+_CLOSE_SQL = """
+    INSERT INTO daily_aggregates (day, closed, wins, losses, pnl_usd) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(day) DO UPDATE SET
+        closed = closed + excluded.closed,
+        wins = wins + excluded.wins,
+        losses = losses + excluded.losses,
+        pnl_usd = pnl_usd + excluded.pnl_usd
+"""
+_BUCKET_SQL = """
+    INSERT INTO daily_buckets (day, metric, bucket, value) VALUES (?, ?, ?, ?)
+    ON CONFLICT(day, metric, bucket) DO UPDATE SET value = value + excluded.value
+"""
+
+
+def _local(ts) -> datetime:
+    """Local time of a stored timestamp (ISO with offset, or naive UTC as the simulator writes)."""
+    try:
+        dt = datetime.fromisoformat(str(ts))
+    except (TypeError, ValueError):
+        dt = datetime.now(timezone.utc)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone()
+
+
+def record_signal(con: sqlite3.Connection, ts_utc, score: Optional[float], trend: Optional[str] = None) -> None:
+    day = _local(ts_utc).date().isoformat()
+    label = (trend or "").lower()
+    has_score = score is not None
+    con.execute(
+        _SIGNAL_SQL,
+        (day, int(has_score), float(score) if has_score else 0.0, score, int("up" in label), int("down" in label)),
+    )
+    if has_score:
+        con.execute(_BUCKET_SQL, (day, METRIC_SCORE, int(float(score) // SCORE_BUCKET_WIDTH), 1))
+
+
+def record_close(con: sqlite3.Connection, closed_at, pnl_usd: float, trades: int = 1) -> None:
+    """Account trades closed at closed_at, each with pnl_usd."""
+    local = _local(closed_at)
+    day = local.date().isoformat()
+    pnl = float(pnl_usd or 0.0)
+    win = pnl > 0
+    con.execute(_CLOSE_SQL, (day, trades, trades if win else 0, 0 if win else trades, pnl * trades))
+    con.execute(_BUCKET_SQL, (day, METRIC_PNL_HOUR, local.hour, pnl * trades))
+
+
+_BACKFILL_SIGNALS_SQL = "SELECT ts_utc, score FROM signals"
+_BACKFILL_CLOSES_SQL = "SELECT closed_at, pnl_usd FROM trades WHERE status='CLOSED' AND closed_at IS NOT NULL"
+
+
+def backfill(con: sqlite3.Connection) -> None:
+    """
+    Build the tables from the signals and closed trades already stored, in the
+    live DB and every monthly archive (trend labels were not kept).
+    """
+    from pumpbot.core import database  # database imports this module
+
+    signals = con.execute(_BACKFILL_SIGNALS_SQL).fetchall() + database.query_archives(_BACKFILL_SIGNALS_SQL)
+    for ts_utc, score in signals:
+        record_signal(con, ts_utc, score)
+    closes = con.execute(_BACKFILL_CLOSES_SQL).fetchall() + database.query_archives(_BACKFILL_CLOSES_SQL)
+    for closed_at, pnl_usd in closes:
+        record_close(con, closed_at, pnl_usd)
+
+
+def read_day(con: sqlite3.Connection, day: str) -> Dict:
+    """Figures for day (local 'YYYY-MM-DD'); all zero when nothing happened."""
+    row = con.execute(
+        "SELECT signals, score_count, score_sum, score_max, up_count, down_count, closed, wins, losses, pnl_usd"
+        " FROM daily_aggregates WHERE day=?",
+        (day,),
+    ).fetchone()
+    signals, score_count, score_sum, score_max, up, down, closed, wins, losses, pnl = row or (0,) * 10
+    buckets: Dict[str, Dict[int, float]] = {METRIC_SCORE: {}, METRIC_PNL_HOUR: {}}
+    for metric, bucket, value in con.execute("SELECT metric, bucket, value FROM daily_buckets WHERE day=?", (day,)):
+        buckets.setdefault(metric, {})[bucket] = value
+    return {
+        "day": day,
+        "signals": signals,
+        "score_avg": (score_sum / score_count) if score_count else None,
+        "score_max": score_max if score_count else None,
+        "up": up,
+        "down": down,
+        "closed": closed,
+        "wins": wins,
+        "losses": losses,
+        "winrate": (wins / closed * 100.0) if closed else 0.0,
+        "pnl_usd": pnl or 0.0,
+        "score_hist": {b * SCORE_BUCKET_WIDTH: int(n) for b, n in sorted(buckets[METRIC_SCORE].items())},
+        "pnl_by_hour": dict(sorted(buckets[METRIC_PNL_HOUR].items())),
+    }
@@ -1,58 +1,322 @@
 # pumpbot/core/database.py
+"""
+SQLite access layer.
+
+Connections are long-lived: one writer connection owned by a dedicated thread
+and a small pool of reader connections (WAL lets readers run alongside the
+writer). Writes are queued to the writer thread, which commits everything
+queued at that moment (up to DB_WRITE_BATCH operations) in one transaction;
+each operation runs in its own savepoint, so a failing one is rolled back
+alone. Write calls block until their transaction has committed, so a read
+issued afterwards sees the change. Work that must manage its own
+transaction (archival ATTACHes another database, which SQLite forbids inside
+one) is queued with write_exclusive() and runs on the writer thread between
+batches.
+
+Closed trades and old signals are moved to per-month archive databases under
+ARCHIVE_DIR (see archive.py); query_recent() and pnl_summary() read the
+archives too, so callers see the full history.
+"""
+import os
+import queue
 import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import closing, contextmanager
 from pathlib import Path
 
 from loguru import logger
 
+from pumpbot.core import daily_aggregates, result_cache
+from pumpbot.core.migrations import apply_migrations
+
 DB_PATH = Path("signals.db")
+DB_READERS = int(os.getenv("DB_READERS", "4"))
+DB_WRITE_BATCH = int(os.getenv("DB_WRITE_BATCH", "256"))
+ARCHIVE_DIR = Path(os.getenv("ARCHIVE_DIR", "archive"))
 
 
-def _conn():
-    # WAL mode improves concurrency
-    con = sqlite3.connect(DB_PATH, isolation_level=None)
+def _connect(path, read_only=False):
+    con = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=30)
     con.execute("PRAGMA journal_mode=WAL;")
     con.execute("PRAGMA synchronous=NORMAL;")
+    if read_only:
+        con.execute("PRAGMA query_only=ON;")
     return con
 
 
+class _Writer(threading.Thread):
+    """Owns the writer connection and commits queued operations in batches."""
+
+    def __init__(self, path):
+        super().__init__(name="sqlite-writer", daemon=True)
+        self.path = path
+        self._queue = queue.Queue()
+
+    def submit(self, fn, exclusive=False):
+        future = Future()
+        self._queue.put((fn, future, exclusive))
+        return future
+
+    def stop(self):
+        self._queue.put(None)
+        self.join(timeout=10)
+
+    def run(self):
+        con = _connect(self.path)
+        try:
+            carry = None  # exclusive operation that ended the previous batch
+            while True:
+                item = carry if carry is not None else self._queue.get()
+                carry = None
+                if item is None:
+                    break
+                if item[2]:
+                    self._run_exclusive(con, item)
+                    continue
+                batch = [item]
+                stopping = False
+                while len(batch) < DB_WRITE_BATCH:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    if item[2]:
+                        carry = item
+                        break
+                    batch.append(item)
+                self._commit(con, batch)
+                if stopping:
+                    break
+        finally:
+            con.close()
+
+    @staticmethod
+    def _run_exclusive(con, item):
+        fn, future, _exclusive = item
+        try:
+            result = fn(con)
+        except Exception as exc:
+            if con.in_transaction:
+                con.execute("ROLLBACK")
+            future.set_exception(exc)
+            return
+        future.set_result(result)
+
+    @staticmethod
+    def _commit(con, batch):
+        outcomes = []
+        try:
+            con.execute("BEGIN IMMEDIATE")
+            for fn, future, _exclusive in batch:
+                con.execute("SAVEPOINT op")
+                try:
+                    outcomes.append((future, fn(con), None))
+                    con.execute("RELEASE op")
+                except Exception as exc:
+                    con.execute("ROLLBACK TO op")
+                    con.execute("RELEASE op")
+                    outcomes.append((future, None, exc))
+            con.execute("COMMIT")
+        except Exception as exc:
+            if con.in_transaction:
+                con.execute("ROLLBACK")
+            logger.error(f"SQLite write batch of {len(batch)} failed: {exc}")
+            for _fn, future, _exclusive in batch:
+                future.set_exception(exc)
+            return
+        for future, result, exc in outcomes:
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+
+
+class _ReaderPool:
+    def __init__(self, path, size):
+        self.path = path
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max(1, size))
+        self._all = []
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            try:
+                con = self._idle.get_nowait()
+            except queue.Empty:
+                con = _connect(self.path, read_only=True)
+                self._all.append(con)
+            try:
+                yield con
+            finally:
+                self._idle.put(con)
+
+    def close(self):
+        for con in self._all:
+            con.close()
+        self._all.clear()
+
+
+_lock = threading.Lock()
+_writer = None
+_readers = None
+
+
+def _ensure_open():
+    """Writer thread and reader pool for the current DB_PATH (reopened if DB_PATH changed)."""
+    global _writer, _readers
+    with _lock:
+        if _writer is not None and (_writer.path != DB_PATH or not _writer.is_alive()):
+            _close_locked()
+        if _writer is None:
+            _writer = _Writer(DB_PATH)
+            _writer.start()
+            _readers = _ReaderPool(DB_PATH, DB_READERS)
+        return _writer, _readers
+
+
+def _close_locked():
+    global _writer, _readers
+    if _writer is not None and _writer.is_alive():
+        _writer.stop()
+    if _readers is not None:
+        _readers.close()
+    _writer = _readers = None
+
+
+def close_db():
+    """Stop the writer thread and close all connections (shutdown)."""
+    with _lock:
+        _close_locked()
+
+
+@contextmanager
+def read_connection():
+    """Borrow a pooled read-only connection."""
+    _writer_thread, readers = _ensure_open()
+    with readers.connection() as con:
+        yield con
+
+
+def write_transaction(fn):
+    """Run fn(con) on the writer thread inside a batched transaction; returns its result."""
+    writer, _readers_pool = _ensure_open()
+    return writer.submit(fn).result()
+
+
+def write_exclusive(fn):
+    """Run fn(con) on the writer thread with no transaction open (fn manages its own); returns its result."""
+    writer, _readers_pool = _ensure_open()
+    return writer.submit(fn, exclusive=True).result()
+
+
+def _execute(sql, params=()):
+    """Single write statement; returns the affected row count."""
+    return write_transaction(lambda con: con.execute(sql, params).rowcount)
+
+
+def _query(sql, params=()):
+    with read_connection() as con:
+        return con.execute(sql, params).fetchall()
+
+
+def _query_one(sql, params=()):
+    with read_connection() as con:
+        return con.execute(sql, params).fetchone()
+
+
+# --- Archive partitions (one SQLite file per month, written by archive.py) ---
+
+
+def archive_path(month):
+    """Archive database for month ('YYYY-MM')."""
+    return ARCHIVE_DIR / f"{DB_PATH.stem}-{month}.db"
+
+
+def archive_months():
+    """Months that have an archive database, oldest first."""
+    prefix = f"{DB_PATH.stem}-"
+    return sorted(path.stem[len(prefix):] for path in ARCHIVE_DIR.glob(f"{prefix}????-??.db"))
+
+
+def query_archives(sql, params=(), months=None):
+    """Rows of sql from each archive month (default: all, oldest first), opened read-only."""
+    rows = []
+    for month in archive_months() if months is None else months:
+        uri = archive_path(month).resolve().as_uri() + "?mode=ro"
+        with closing(sqlite3.connect(uri, uri=True)) as con:
+            rows.extend(con.execute(sql, params).fetchall())
+    return rows
+
+
+def query_recent(sql, params, limit, id_index=None):
+    """
+    Newest-first query ending in LIMIT ?, over the live DB and the archives.
+
+    Without id_index, archive months are read newest first until limit rows
+    are collected; that is exact for tables archived in id order (signals).
+    Trades are archived by close time, so a live trade can be older than an
+    archived one: pass id_index (the position of the id column) and every
+    partition is read and the merged rows are sorted by id, newest first.
+    """
+    rows = _query(sql, (*params, limit))
+    if id_index is not None:
+        rows += query_archives(sql, (*params, limit))
+        return sorted(rows, key=lambda row: row[id_index], reverse=True)[:limit]
+    for month in reversed(archive_months()):
+        if len(rows) >= limit:
+            break
+        rows.extend(query_archives(sql, (*params, limit - len(rows)), months=[month]))
+    return rows
+
+
+# Hot trade queries (index usage is checked by test_query_plans.py)
+OPEN_TRADES_SQL = """
+    SELECT id, symbol, side, entry, size, qty, tp1, tp2, sl,
+           filled_tp1_qty, status, opened_at, last_price
+    FROM trades WHERE status IN ('OPEN','PARTIAL')
+"""
+TRADE_PARTIAL_SQL = """
+    UPDATE trades
+    SET filled_tp1_qty = filled_tp1_qty + ?,
+        status = CASE WHEN filled_tp1_qty + ? >= qty THEN 'CLOSED' ELSE 'PARTIAL' END,
+        last_price=?, last_update=?
+    WHERE symbol=? AND status IN ('OPEN','PARTIAL')
+"""
+TRADE_CLOSE_SQL = """
+    UPDATE trades
+    SET status='CLOSED', closed_at=?, last_price=?, last_update=?, pnl_usd=?, pnl_pct=?
+    WHERE symbol=? AND status IN ('OPEN','PARTIAL')
+"""
+
+
 def init_db():
-    with _conn() as con:
-        con.executescript(
-            """
-        CREATE TABLE IF NOT EXISTS signals (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            symbol TEXT, price REAL, volume REAL, score REAL,
-            rsi REAL, macd REAL, macd_sig REAL,
-            volume_spike REAL, ts_utc TEXT
-        );
-        CREATE TABLE IF NOT EXISTS trades (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            symbol TEXT NOT NULL,
-            side TEXT NOT NULL,
-            entry REAL NOT NULL, size REAL NOT NULL, qty REAL NOT NULL,
-            tp1 REAL NOT NULL, tp2 REAL NOT NULL, sl REAL NOT NULL,
-            filled_tp1_qty REAL DEFAULT 0,
-            status TEXT NOT NULL,
-            opened_at TEXT NOT NULL, closed_at TEXT,
-            pnl_usd REAL DEFAULT 0, pnl_pct REAL DEFAULT 0,
-            last_price REAL, last_update TEXT
-        );
-        """
-        )
-    logger.debug("SQLite tables ready (WAL): signals + trades")
+    """Create or upgrade the schema (pending migrations run at startup)."""
+    with closing(_connect(DB_PATH)) as con:
+        version = apply_migrations(con)
+        con.execute("PRAGMA optimize")
+    logger.debug(f"SQLite schema ready (WAL), version {version}")
+
+
+SIGNAL_INSERT_SQL = """
+    INSERT INTO signals
+    (symbol, price, volume, score, rsi, macd, macd_sig, volume_spike, ts_utc)
+    VALUES (?,?,?,?,?,?,?,?,?)
+"""
 
 
-def save_signal(symbol, price, volume, score, rsi, macd, macd_sig, volume_spike, ts_utc):
+def save_signal(symbol, price, volume, score, rsi, macd, macd_sig, volume_spike, ts_utc, trend=None):
+    def write(con):
+        con.execute(SIGNAL_INSERT_SQL, (symbol, price, volume, score, rsi, macd, macd_sig, volume_spike, ts_utc))
+        daily_aggregates.record_signal(con, ts_utc, score, trend)
+
     try:
-        with _conn() as con:
-            con.execute(
-                """
-                INSERT INTO signals
-                (symbol, price, volume, score, rsi, macd, macd_sig, volume_spike, ts_utc)
-                VALUES (?,?,?,?,?,?,?,?,?)
-            """,
-                (symbol, price, volume, score, rsi, macd, macd_sig, volume_spike, ts_utc),
-            )
+        write_transaction(write)
+        result_cache.bump(result_cache.TOPIC_SIGNALS)
         score_txt = f"{float(score):.2f}" if score is not None else "-"
         logger.info(f"Signal saved: {symbol} | score={score_txt}")
     except Exception:
@@ -60,99 +324,107 @@ def save_signal(symbol, price, volume, score, rsi, macd, macd_sig, volume_spike,
 
 
 def last_signals(limit=5):
-    with _conn() as con:
-        cur = con.execute(
-            """
-            SELECT symbol, price, volume, score, ts_utc
-            FROM signals ORDER BY id DESC LIMIT ?
-        """,
-            (limit,),
-        )
-        return cur.fetchall()
+    return query_recent(
+        """
+        SELECT symbol, price, volume, score, ts_utc
+        FROM signals ORDER BY id DESC LIMIT ?
+    """,
+        (),
+        limit,
+    )
 
 
 def trade_open(symbol, side, entry, size, qty, tp1, tp2, sl, opened_at):
+    """Insert an OPEN trade; returns its id (None if the insert failed)."""
+    params = (symbol, side, entry, size, qty, tp1, tp2, sl, opened_at, entry, opened_at)
     try:
-        with _conn() as con:
-            con.execute(
+        trade_id = write_transaction(
+            lambda con: con.execute(
                 """
                 INSERT INTO trades
                 (symbol, side, entry, size, qty, tp1, tp2, sl, status, opened_at, last_price, last_update)
                 VALUES (?,?,?,?,?,?,?,?, 'OPEN', ?, ?, ?)
             """,
-                (symbol, side, entry, size, qty, tp1, tp2, sl, opened_at, entry, opened_at),
-            )
+                params,
+            ).lastrowid
+        )
     except Exception:
         logger.exception("Trade open error:")
+        return None
+    result_cache.bump(result_cache.TOPIC_TRADES)
+    return trade_id
 
 
 def trade_mark_partial(symbol, qty_delta, last_price, now_ts):
     try:
-        with _conn() as con:
-            con.execute(
-                """
-                UPDATE trades
-                SET filled_tp1_qty = filled_tp1_qty + ?,
-                    status = CASE WHEN filled_tp1_qty + ? >= qty THEN 'CLOSED' ELSE 'PARTIAL' END,
-                    last_price=?, last_update=?
-                WHERE symbol=? AND status IN ('OPEN','PARTIAL')
-            """,
-                (qty_delta, qty_delta, last_price, now_ts, symbol),
-            )
+        _execute(TRADE_PARTIAL_SQL, (qty_delta, qty_delta, last_price, now_ts, symbol))
+        result_cache.bump(result_cache.TOPIC_TRADES)
     except Exception:
         logger.exception("Trade partial error:")
 
 
 def trade_close_all(symbol, last_price, now_ts, realized_pnl_usd, realized_pnl_pct):
+    def write(con):
+        params = (now_ts, last_price, now_ts, realized_pnl_usd, realized_pnl_pct, symbol)
+        closed = con.execute(TRADE_CLOSE_SQL, params).rowcount
+        if closed:
+            daily_aggregates.record_close(con, now_ts, realized_pnl_usd, closed)
+
     try:
-        with _conn() as con:
-            con.execute(
-                """
-                UPDATE trades
-                SET status='CLOSED', closed_at=?, last_price=?, last_update=?, pnl_usd=?, pnl_pct=?
-                WHERE symbol=? AND status IN ('OPEN','PARTIAL')
-            """,
-                (now_ts, last_price, now_ts, realized_pnl_usd, realized_pnl_pct, symbol),
-            )
+        write_transaction(write)
+        result_cache.bump(result_cache.TOPIC_TRADES)
     except Exception:
         logger.exception("Trade close error:")
 
 
 def get_open_trades():
-    with _conn() as con:
-        return con.execute(
-            """
-            SELECT id, symbol, side, entry, size, qty, tp1, tp2, sl,
-                   filled_tp1_qty, status, opened_at, last_price
-            FROM trades WHERE status IN ('OPEN','PARTIAL')
-        """
-        ).fetchall()
+    return _query(OPEN_TRADES_SQL)
 
 
 def recent_trades(limit=10):
-    with _conn() as con:
-        return con.execute(
-            """
-            SELECT symbol, side, entry, tp1, tp2, sl, status,
-                   opened_at, closed_at, pnl_usd, pnl_pct
-            FROM trades ORDER BY id DESC LIMIT ?
-        """,
-            (limit,),
-        ).fetchall()
+    rows = query_recent(
+        """
+        SELECT id, symbol, side, entry, tp1, tp2, sl, status,
+               opened_at, closed_at, pnl_usd, pnl_pct
+        FROM trades ORDER BY id DESC LIMIT ?
+    """,
+        (),
+        limit,
+        id_index=0,
+    )
+    return [row[1:] for row in rows]
+
+
+PNL_TOTALS_SQL = """
+    SELECT COUNT(*),
+           COALESCE(SUM(CASE WHEN pnl_usd>0 THEN 1 ELSE 0 END),0),
+           COALESCE(SUM(CASE WHEN pnl_usd<=0 THEN 1 ELSE 0 END),0),
+           COALESCE(SUM(pnl_usd),0)
+    FROM trades WHERE status='CLOSED'
+"""
+
+# month -> ((mtime_ns, size), totals): archive files only change when archive.py appends
+_archive_totals = {}
+
+
+def _archived_pnl_totals():
+    totals = []
+    for month in archive_months():
+        stat = archive_path(month).stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = _archive_totals.get(month)
+        if cached is None or cached[0] != stamp:
+            cached = _archive_totals[month] = (stamp, query_archives(PNL_TOTALS_SQL, months=[month])[0])
+        totals.append(cached[1])
+    return totals
 
 
 def pnl_summary():
-    with _conn() as con:
-        row = con.execute(
-            """
-            SELECT COUNT(*),
-                   SUM(CASE WHEN pnl_usd>0 THEN 1 ELSE 0 END),
-                   SUM(CASE WHEN pnl_usd<=0 THEN 1 ELSE 0 END),
-                   COALESCE(SUM(pnl_usd),0)
-            FROM trades WHERE status='CLOSED'
-        """
-        ).fetchone()
-    n, w, l, p = row if row else (0, 0, 0, 0.0)
+    n = w = l = 0
+    p = 0.0
+    for row in [_query_one(PNL_TOTALS_SQL)] + _archived_pnl_totals():
+        if row:
+            n, w, l, p = n + row[0], w + row[1], l + row[2], p + row[3]
     return {
         "closed": n,
         "wins": w,
@@ -160,3 +432,148 @@ def pnl_summary():
         "winrate": (w / n * 100.0 if n else 0.0),
         "pnl_usd": p,
     }
+
+
+# --- Outbound message queue ---
+
+
+def outbox_enqueue(rows, media=None):
+    """
+    Insert outbox rows
+    (idem_key, chat_id, kind, body, media_key, priority, expires_at, next_attempt_at, created_at).
+    Rows whose idem_key already exists are ignored. Returns the number inserted.
+    """
+
+    def insert(con):
+        if media:
+            con.execute("INSERT OR IGNORE INTO outbox_media (media_key, data) VALUES (?, ?)", media)
+        return con.executemany(
+            """
+            INSERT OR IGNORE INTO outbox
+            (idem_key, chat_id, kind, body, media_key, priority, expires_at, next_attempt_at, created_at)
+            VALUES (?,?,?,?,?,?,?,?,?)
+        """,
+            rows,
+        ).rowcount
+
+    return write_transaction(insert)
+
+
+def outbox_expire(now):
+    """Mark pending rows past their deadline as EXPIRED; returns their (chat_id, body) rows."""
+
+    def expire(con):
+        where = "status='PENDING' AND expires_at IS NOT NULL AND expires_at < ?"
+        rows = con.execute(f"SELECT chat_id, body FROM outbox WHERE {where}", (now,)).fetchall()
+        if rows:
+            con.execute(f"UPDATE outbox SET status='EXPIRED' WHERE {where}", (now,))
+        return rows
+
+    return write_transaction(expire)
+
+
+def outbox_due(now, limit=100, max_priority=None):
+    """Due pending rows, most urgent lane first (lower priority value = more urgent)."""
+    return _query(
+        """
+        SELECT id, idem_key, chat_id, kind, body, media_key, attempts, priority, expires_at
+        FROM outbox
+        WHERE status='PENDING' AND next_attempt_at <= ? AND priority <= ?
+        ORDER BY priority, id LIMIT ?
+    """,
+        (now, max_priority if max_priority is not None else 1 << 30, limit),
+    )
+
+
+def outbox_next_due():
+    row = _query_one("SELECT MIN(next_attempt_at) FROM outbox WHERE status='PENDING'")
+    return row[0] if row else None
+
+
+def outbox_media(media_key):
+    row = _query_one("SELECT data FROM outbox_media WHERE media_key=?", (media_key,))
+    return row[0] if row else None
+
+
+def outbox_mark_sent(row_id, sent_at):
+    _execute("UPDATE outbox SET status='SENT', sent_at=?, last_error=NULL WHERE id=?", (sent_at, row_id))
+
+
+def outbox_mark_retry(row_id, attempts, next_attempt_at, error):
+    _execute(
+        "UPDATE outbox SET attempts=?, next_attempt_at=?, last_error=? WHERE id=?",
+        (attempts, next_attempt_at, error, row_id),
+    )
+
+
+def outbox_mark_dead(row_id, attempts, error):
+    _execute("UPDATE outbox SET status='DEAD', attempts=?, last_error=? WHERE id=?", (attempts, error, row_id))
+
+
+def outbox_mark_expired(row_id):
+    _execute("UPDATE outbox SET status='EXPIRED' WHERE id=?", (row_id,))
+
+
+def outbox_purge(sent_before):
+    """Delete delivered/expired rows older than sent_before and media no longer referenced by pending rows."""
+
+    def purge(con):
+        con.execute("DELETE FROM outbox WHERE status='SENT' AND sent_at < ?", (sent_before,))
+        con.execute("DELETE FROM outbox WHERE status='EXPIRED' AND created_at < ?", (sent_before,))
+        con.execute(
+            """
+            DELETE FROM outbox_media WHERE media_key NOT IN
+            (SELECT media_key FROM outbox WHERE status='PENDING' AND media_key IS NOT NULL)
+        """
+        )
+
+    write_transaction(purge)
+
+
+def outbox_stats():
+    return dict(_query("SELECT status, COUNT(*) FROM outbox GROUP BY status"))
+
+
+# --- Delivered signal messages (for in-place lifecycle edits) ---
+
+
+def signal_message_save(signal_key, symbol, chat_id, message_id, is_photo, body, created_at):
+    _execute(
+        """
+        INSERT OR REPLACE INTO signal_messages
+        (signal_key, symbol, chat_id, message_id, is_photo, body, created_at)
+        VALUES (?,?,?,?,?,?,?)
+    """,
+        (signal_key, symbol, chat_id, message_id, int(bool(is_photo)), body, created_at),
+    )
+
+
+def signal_messages_latest(symbol):
+    """Delivered copies (one per chat) of the most recent signal for symbol."""
+    return _query(
+        """
+        SELECT signal_key, chat_id, message_id, is_photo, body, status_lines
+        FROM signal_messages
+        WHERE signal_key = (SELECT signal_key FROM signal_messages WHERE symbol=? ORDER BY id DESC LIMIT 1)
+    """,
+        (symbol,),
+    )
+
+
+def signal_messages_set_status(signal_key, status_lines):
+    _execute("UPDATE signal_messages SET status_lines=? WHERE signal_key=?", (status_lines, signal_key))
+
+
+def signal_messages_delete(signal_key):
+    _execute("DELETE FROM signal_messages WHERE signal_key=?", (signal_key,))
+
+
+def signal_messages_gc(created_before):
+    """Drop mappings for signals whose trade never reported a close."""
+    return _execute("DELETE FROM signal_messages WHERE created_at < ?", (created_before,))
+
+
+def daily_summary(day):
+    """Report figures for a local calendar day ('YYYY-MM-DD') from the daily aggregates."""
+    with read_connection() as con:
+        return daily_aggregates.read_day(con, day)
@@ -0,0 +1,73 @@
+"""
+Async facade over pumpbot.core.database for coroutines.
+
+The sqlite3 calls run on a small dedicated thread pool (DB_ASYNC_THREADS), so
+lock waits, WAL checkpoints and disk I/O never block the event loop, and DB
+work does not queue behind other users of the default executor. Writes still
+end up on the single writer thread and are batched there.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional
+
+from pumpbot.core import database
+
+DB_ASYNC_THREADS = int(os.getenv("DB_ASYNC_THREADS", "8"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=max(1, DB_ASYNC_THREADS), thread_name_prefix="db")
+    return _executor
+
+
+async def run_db(fn: Callable, *args, **kwargs):
+    """Run a blocking database function off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(_pool(), partial(fn, *args, **kwargs))
+
+
+async def save_signal(**kwargs) -> None:
+    await run_db(database.save_signal, **kwargs)
+
+
+async def last_signals(limit: int = 5):
+    return await run_db(database.last_signals, limit)
+
+
+async def trade_open(**kwargs) -> Optional[int]:
+    return await run_db(database.trade_open, **kwargs)
+
+
+async def trade_mark_partial(symbol, qty_delta, last_price, now_ts) -> None:
+    await run_db(database.trade_mark_partial, symbol, qty_delta, last_price, now_ts)
+
+
+async def trade_close_all(symbol, **kwargs) -> None:
+    await run_db(database.trade_close_all, symbol, **kwargs)
+
+
+async def get_open_trades():
+    return await run_db(database.get_open_trades)
+
+
+async def recent_trades(limit: int = 10):
+    return await run_db(database.recent_trades, limit)
+
+
+async def pnl_summary() -> dict:
+    return await run_db(database.pnl_summary)
+
+
+def shutdown_db_threads() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
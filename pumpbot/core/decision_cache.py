@@ -0,0 +1,70 @@
+"""
+Per-candle negative decision cache.
+
+The gates in analyze_symbol_midterm read the forming candle, so a rejection is
+only cached when it cannot flip before that candle closes: "ATR too high" (the
+candle's range only widens). The HTF trend, low-ATR and volume rejections can
+change with the next tick and are re-evaluated on every scan. The scanner checks
+this cache before fetching klines for a symbol.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+DECISION_CACHE_ENABLED = os.getenv("DECISION_CACHE_ENABLED", "1") == "1"
+
+GATE_ATR = "atr"
+
+
+@dataclass
+class CachedRejection:
+    gate: str
+    valid_until: datetime
+
+
+_rejections: Dict[Tuple[str, str, str], CachedRejection] = {}
+
+
+def kline_close_time(raw: list) -> Optional[datetime]:
+    """Close time (UTC) of the last kline in a raw Binance kline list."""
+    if not raw:
+        return None
+    try:
+        return datetime.fromtimestamp(int(raw[-1][6]) / 1000, tz=timezone.utc)
+    except (ValueError, TypeError, IndexError):
+        return None
+
+
+def record_rejection(symbol: str, base_tf: str, htf_tf: str, gate: str, valid_until: Optional[datetime]) -> None:
+    if not DECISION_CACHE_ENABLED or valid_until is None:
+        return
+    _rejections[(symbol, base_tf, htf_tf)] = CachedRejection(gate=gate, valid_until=valid_until)
+
+
+def cached_rejection(
+    symbol: str, base_tf: str, htf_tf: str, now: Optional[datetime] = None
+) -> Optional[CachedRejection]:
+    """Return the cached rejection for the symbol if its candle has not closed yet."""
+    if not DECISION_CACHE_ENABLED:
+        return None
+    key = (symbol, base_tf, htf_tf)
+    entry = _rejections.get(key)
+    if entry is None:
+        return None
+    now = now or datetime.now(timezone.utc)
+    if now >= entry.valid_until:
+        _rejections.pop(key, None)
+        return None
+    return entry
+
+
+def clear_rejections(symbol: Optional[str] = None) -> None:
+    if symbol is None:
+        _rejections.clear()
+        return
+    for key in [k for k in _rejections if k[0] == symbol]:
+        _rejections.pop(key, None)
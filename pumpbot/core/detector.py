@@ -3,11 +3,12 @@ from __future__ import annotations
 import asyncio
 import os
 from datetime import datetime, timedelta, timezone
-from typing import Callable, Dict, Iterable, Optional
+from typing import Awaitable, Callable, Dict, Iterable, Optional
 
 from loguru import logger
 
 from pumpbot.core.analyzer import SignalPayload, analyze_symbol_midterm
+from pumpbot.core.decision_cache import cached_rejection
 from pumpbot.core.state import last_signal_time
 from pumpbot.telebot.user_settings import get_user_settings
 from pumpbot.core.presets import load_for as load_preset
@@ -39,6 +40,8 @@ async def scan_symbols(
     on_alert: Callable,
     on_tick: Optional[Callable[[str, float], None]] = None,
     user_id: Optional[int] = None,
+    needs_tick: Optional[Callable[[str], bool]] = None,
+    on_prices: Optional[Callable[[Dict[str, float]], Awaitable[None]]] = None,
 ):
     """
     Mid-term scanner: leverages analyze_symbol_midterm for each symbol.
@@ -51,6 +54,10 @@ async def scan_symbols(
         on_alert: Callback function for signals
         on_tick: Optional callback to advance simulator with latest price
         user_id: Optional user ID for user-specific settings (defaults to None for default preset)
+        needs_tick: Optional predicate; symbols it accepts bypass the negative decision cache
+            so on_tick keeps receiving prices (e.g. symbols with open simulated trades)
+        on_prices: Optional callback receiving {symbol: last_price} once per scan cycle
+            (batch alternative to on_tick)
     """
     if user_id is None:
         # Default user for backward compatibility
@@ -66,9 +73,11 @@ async def scan_symbols(
     last_profile = None
     preset = None
 
-    async def process(sym: str):
+    async def process(sym: str, prices: Dict[str, float]):
         async with semaphore:
-            await _process_symbol(client, sym, base_tf, htf_tf, on_alert, preset, on_tick)
+            await _process_symbol(
+                client, sym, base_tf, htf_tf, on_alert, preset, on_tick, needs_tick, prices, profile="/".join(last_profile)
+            )
 
     while True:
         user_settings = get_user_settings(user_id)
@@ -83,11 +92,17 @@ async def scan_symbols(
                 f"base_tf={base_tf} htf_tf={htf_tf}"
             )
         loop_start = datetime.now(timezone.utc)
-        tasks = [asyncio.create_task(process(sym)) for sym in symbols_list]
+        prices: Dict[str, float] = {}
+        tasks = [asyncio.create_task(process(sym, prices)) for sym in symbols_list]
         results = await asyncio.gather(*tasks, return_exceptions=True)
         for sym, res in zip(symbols_list, results, strict=False):
             if isinstance(res, Exception):
                 logger.error(f"{sym} scan task failed: {res}")
+        if on_prices and prices:
+            try:
+                await on_prices(prices)
+            except Exception as exc:
+                logger.error(f"on_prices failed for {len(prices)} symbols: {exc}")
         elapsed = (datetime.now(timezone.utc) - loop_start).total_seconds()
         sleep_for = max(0.0, period_seconds - elapsed)
         logger.debug(f"Scan finished in {elapsed:.2f}s; sleeping {sleep_for:.2f}s")
@@ -103,8 +118,11 @@ async def _process_symbol(
     on_alert: Callable,
     preset,
     on_tick: Optional[Callable[[str, float], None]],
+    needs_tick: Optional[Callable[[str], bool]] = None,
+    prices: Optional[Dict[str, float]] = None,
+    profile: Optional[str] = None,
 ):
-    """Process a single symbol with user-specific preset."""
+    """Process a single symbol with user-specific preset; records its last price in prices."""
     last_ts = last_signal_time(symbol)
     # Use cooldown from preset instead of hardcoded SYMBOL_INTERVAL_MINUTES
     cooldown_minutes = preset.cooldown_minutes
@@ -114,6 +132,11 @@ async def _process_symbol(
         logger.debug(f"{symbol} skipped due to per-symbol cooldown ({remaining}).")
         return
 
+    rejection = cached_rejection(symbol, base_tf, htf_tf)
+    if rejection and not (needs_tick and needs_tick(symbol)):
+        logger.debug(f"{symbol} skipped: cached {rejection.gate} rejection valid until {rejection.valid_until:%H:%M} UTC.")
+        return
+
     logger.info(f"Scanning symbol: {symbol} @{base_tf}")
     sig: Optional[SignalPayload]
     sig, last_price = await analyze_symbol_midterm(
@@ -125,6 +148,8 @@ async def _process_symbol(
         strategy=STRATEGY_NAME,
         preset=preset,  # Pass user-specific preset
     )
+    if prices is not None and last_price is not None:
+        prices[symbol] = float(last_price)
     if on_tick and last_price is not None:
         try:
             await on_tick(symbol, float(last_price))
@@ -134,11 +159,6 @@ async def _process_symbol(
         logger.debug(f"{symbol} no midterm signal.")
         return
 
-    # Mandatory: chart must exist for signal delivery
-    if not sig.chart_path:
-        logger.error(f"{symbol} signal blocked: chart generation failed")
-        return
-
     payload = {
         "symbol": sig.symbol,
         "side": sig.side,
@@ -158,6 +178,8 @@ async def _process_symbol(
         "swing_high": sig.swing_high,
         "swing_low": sig.swing_low,
         "score": round(sig.score, 1) if sig.score is not None else None,  # Include dynamic score
+        "components": sig.components,
+        "preset": profile,  # "horizon/risk"
     }
 
     mid_price = sum(sig.entry) / len(sig.entry) if sig.entry else 0.0
@@ -170,6 +192,7 @@ async def _process_symbol(
         "candle_pattern_ok": True,
         "stop_distance": abs(mid_price - payload["sl"]) if payload["entry"] else 0.0,
         "spread": 0.0,
+        "chart_data": sig.chart_data,  # rendered by on_alert once the signal is accepted
     }
 
     if on_alert:
@@ -0,0 +1,167 @@
+"""
+Versioned SQLite schema migrations.
+
+Each migration has a version number and a list of steps (SQL statements or
+callables taking the connection). apply_migrations() runs the ones newer than
+the recorded schema_version, each in its own transaction, and records them.
+Add new migrations at the end of MIGRATIONS; never edit an applied one.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timezone
+from typing import Callable, List, Sequence, Tuple, Union
+
+from loguru import logger
+
+from pumpbot.core import daily_aggregates
+
+Step = Union[str, Callable[[sqlite3.Connection], None]]
+
+
+def _ensure_columns(con: sqlite3.Connection, table: str, columns: dict) -> None:
+    existing = {row[1] for row in con.execute(f"PRAGMA table_info({table})")}
+    for name, ddl in columns.items():
+        if name not in existing:
+            con.execute(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+
+
+# Table definitions shared with the monthly archive databases (archive.py)
+SIGNALS_TABLE = """
+    CREATE TABLE IF NOT EXISTS signals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        symbol TEXT, price REAL, volume REAL, score REAL,
+        rsi REAL, macd REAL, macd_sig REAL,
+        volume_spike REAL, ts_utc TEXT
+    )
+"""
+TRADES_TABLE = """
+    CREATE TABLE IF NOT EXISTS trades (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        symbol TEXT NOT NULL,
+        side TEXT NOT NULL,
+        entry REAL NOT NULL, size REAL NOT NULL, qty REAL NOT NULL,
+        tp1 REAL NOT NULL, tp2 REAL NOT NULL, sl REAL NOT NULL,
+        filled_tp1_qty REAL DEFAULT 0,
+        status TEXT NOT NULL,
+        opened_at TEXT NOT NULL, closed_at TEXT,
+        pnl_usd REAL DEFAULT 0, pnl_pct REAL DEFAULT 0,
+        last_price REAL, last_update TEXT
+    )
+"""
+
+# Version 1 is the schema that init_db() created before migrations existed; every
+# statement is idempotent so databases from older releases are adopted as-is.
+BASELINE: List[Step] = [
+    SIGNALS_TABLE,
+    TRADES_TABLE,
+    """
+    CREATE TABLE IF NOT EXISTS outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        idem_key TEXT NOT NULL UNIQUE,
+        chat_id INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        body TEXT NOT NULL,
+        media_key TEXT,
+        priority INTEGER NOT NULL DEFAULT 1,
+        expires_at REAL,
+        status TEXT NOT NULL DEFAULT 'PENDING',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL NOT NULL,
+        last_error TEXT,
+        created_at TEXT NOT NULL,
+        sent_at TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS outbox_media (
+        media_key TEXT PRIMARY KEY,
+        data BLOB NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS signal_messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        signal_key TEXT NOT NULL,
+        symbol TEXT NOT NULL,
+        chat_id INTEGER NOT NULL,
+        message_id INTEGER NOT NULL,
+        is_photo INTEGER NOT NULL DEFAULT 0,
+        body TEXT NOT NULL,
+        status_lines TEXT NOT NULL DEFAULT '[]',
+        created_at TEXT NOT NULL,
+        UNIQUE(signal_key, chat_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_signal_messages_symbol ON signal_messages(symbol, id)",
+    # outbox tables created before priority lanes existed
+    lambda con: _ensure_columns(con, "outbox", {"priority": "INTEGER NOT NULL DEFAULT 1", "expires_at": "REAL"}),
+    "CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox(status, priority, next_attempt_at)",
+]
+
+MIGRATIONS: Sequence[Tuple[int, str, List[Step]]] = [
+    (1, "baseline schema", BASELINE),
+    (
+        2,
+        "signals and trades indexes",
+        [
+            # Open/partial trades are a handful of rows: partial indexes keep the
+            # per-scan lookups (get_open_trades, per-symbol updates) independent of history size
+            "CREATE INDEX IF NOT EXISTS idx_trades_open_status ON trades(status) WHERE status IN ('OPEN','PARTIAL')",
+            "CREATE INDEX IF NOT EXISTS idx_trades_open_symbol ON trades(symbol) WHERE status IN ('OPEN','PARTIAL')",
+            # Closed trades, newest first (win-rate, pnl)
+            "CREATE INDEX IF NOT EXISTS idx_trades_closed_id ON trades(id) WHERE status='CLOSED'",
+            # Report date ranges
+            "CREATE INDEX IF NOT EXISTS idx_trades_opened_at ON trades(opened_at)",
+            "CREATE INDEX IF NOT EXISTS idx_trades_closed_at ON trades(closed_at) WHERE closed_at IS NOT NULL",
+            "CREATE INDEX IF NOT EXISTS idx_signals_ts ON signals(ts_utc)",
+            "CREATE INDEX IF NOT EXISTS idx_signals_symbol_ts ON signals(symbol, ts_utc)",
+        ],
+    ),
+    (3, "daily aggregates", [*daily_aggregates.SCHEMA, daily_aggregates.backfill]),
+    (
+        4,
+        "drop report date-range indexes",
+        [
+            # The daily report reads daily_aggregates; no query filters trades by these columns anymore
+            "DROP INDEX IF EXISTS idx_trades_opened_at",
+            "DROP INDEX IF EXISTS idx_trades_closed_at",
+        ],
+    ),
+]
+
+
+def schema_version(con: sqlite3.Connection) -> int:
+    con.execute(
+        "CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY, name TEXT NOT NULL, applied_at TEXT NOT NULL)"
+    )
+    row = con.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def apply_migrations(con: sqlite3.Connection) -> int:
+    """Run pending migrations on an autocommit connection; returns the resulting schema version."""
+    current = schema_version(con)
+    for version, name, steps in MIGRATIONS:
+        if version <= current:
+            continue
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            for step in steps:
+                if callable(step):
+                    step(con)
+                else:
+                    con.execute(step)
+            con.execute(
+                "INSERT INTO schema_version (version, name, applied_at) VALUES (?,?,?)",
+                (version, name, datetime.now(timezone.utc).isoformat()),
+            )
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            logger.exception(f"Schema migration {version} ({name}) failed")
+            raise
+        logger.info(f"Schema migration {version} applied: {name}")
+        current = version
+    return current
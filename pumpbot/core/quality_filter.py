@@ -1,15 +1,13 @@
 from __future__ import annotations
 
 import os
-import sqlite3
-from pathlib import Path
 from typing import Dict
 
 from loguru import logger
 
+from pumpbot.core import database
 from pumpbot.core.debugger import debug_filter_reject
-
-DB_PATH = Path("signals.db")
+from pumpbot.core.win_rate import RECENT_CLOSED_SQL, get_win_rate_tracker
 
 # Tunable thresholds (relaxed further for balance)
 MIN_RISK_REWARD = float(os.getenv("MIN_RISK_REWARD", "1.2"))
@@ -25,17 +23,15 @@ VOLUME_SPIKE_THRESHOLD = float(os.getenv("VOLUME_SPIKE_THRESHOLD", "1.2"))  # Re
 def get_recent_success_rate(limit: int = 30) -> float:
     """
     Calculates win rate of last 'limit' closed trades.
+    Tracked windows (WIN_RATE_WINDOWS) are answered from memory; others query SQLite.
     """
-    if not DB_PATH.exists():
+    tracker = get_win_rate_tracker()
+    if limit in tracker.windows:
+        return tracker.rate(limit)
+    if not database.DB_PATH.exists():
         return 0.0
     try:
-        con = sqlite3.connect(DB_PATH)
-        cur = con.execute(
-            "SELECT pnl_usd FROM trades WHERE status='CLOSED' ORDER BY id DESC LIMIT ?",
-            (limit,),
-        )
-        rows = [r[0] for r in cur.fetchall() if r and r[0] is not None]
-        con.close()
+        rows = [r[2] for r in database.query_recent(RECENT_CLOSED_SQL, (), limit, id_index=0) if r and r[2] is not None]
         if not rows:
             return 0.0
         wins = sum(1 for r in rows if r > 0)
@@ -0,0 +1,83 @@
+"""
+Write-invalidated cache for read-only command results.
+
+Each data source has a version counter (TOPIC_SIGNALS, TOPIC_TRADES,
+TOPIC_SETTINGS) that its write paths bump after committing. A cached result
+remembers the versions it was computed from and is served until any of them
+changes, so repeated /status, /pnl, /trades and /profile calls between writes
+do no DB or file work. Concurrent misses for the same key share one
+computation.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Sequence, Tuple
+
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "1") == "1"
+
+TOPIC_SIGNALS = "signals"
+TOPIC_TRADES = "trades"
+TOPIC_SETTINGS = "settings"
+
+_versions: Dict[str, int] = {}
+_versions_lock = threading.Lock()  # bumped from DB executor threads
+_results: Dict[Hashable, Tuple[Tuple[int, ...], Any]] = {}
+_inflight: Dict[Hashable, Tuple[Tuple[int, ...], "asyncio.Future"]] = {}
+
+
+def bump(*topics: str) -> None:
+    """Invalidate every result computed from any of topics."""
+    with _versions_lock:
+        for topic in topics:
+            _versions[topic] = _versions.get(topic, 0) + 1
+
+
+def versions(topics: Sequence[str]) -> Tuple[int, ...]:
+    return tuple(_versions.get(topic, 0) for topic in topics)
+
+
+async def cached(key: Hashable, topics: Sequence[str], compute: Callable[[], Awaitable[Any]]) -> Any:
+    """Result of compute() for key, recomputed only after a write to one of topics."""
+    if not RESULT_CACHE_ENABLED:
+        return await compute()
+    # Versions are taken before computing: a write that lands meanwhile outdates the entry
+    current = versions(topics)
+    entry = _results.get(key)
+    if entry is not None and entry[0] == current:
+        return entry[1]
+
+    while True:
+        pending = _inflight.get(key)
+        if pending is None or pending[0] != current:
+            break
+        try:
+            return await asyncio.shield(pending[1])
+        except asyncio.CancelledError:
+            if not pending[1].cancelled():
+                raise  # this caller was cancelled
+            # The caller computing it was cancelled: take over, or join whoever already did
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = (current, future)
+    try:
+        value = await compute()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as exc:
+        future.set_exception(exc)
+        future.exception()  # mark retrieved; waiters still re-raise it
+        raise
+    finally:
+        if _inflight.get(key, (None, None))[1] is future:
+            del _inflight[key]
+    _results[key] = (current, value)
+    future.set_result(value)
+    return value
+
+
+def clear() -> None:
+    _results.clear()
@@ -0,0 +1,149 @@
+"""
+Append-only structured signal log.
+
+Every emitted signal is kept as one JSON line with all payload fields (side,
+entry range, every TP, score components, preset, enqueue status) in a file
+per UTC day: SIGNAL_LOG_DIR/signals-YYYY-MM-DD.jsonl. The outbox appends one
+delivery record per chat once a copy is sent, dead-lettered or expired; it
+carries the signal's ref (its outbox message key). append() only buffers; a
+background task writes the buffer every SIGNAL_LOG_FLUSH_SECONDS through a
+file handle kept open for the current day.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, IO, List, Optional
+
+from loguru import logger
+
+SIGNAL_LOG_DIR = Path(os.getenv("SIGNAL_LOG_DIR", "signal_log"))
+SIGNAL_LOG_FLUSH_SECONDS = float(os.getenv("SIGNAL_LOG_FLUSH_SECONDS", "2"))
+
+# Large or transient payload entries that do not belong in the log
+_SKIP_FIELDS = {"chart_png", "chart_data"}
+
+
+def _json_safe(value):
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _json_safe(v) for k, v in value.items()}
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        return None
+    return str(value)
+
+
+def signal_record(payload: Dict, delivery: Optional[Dict] = None, ref: Optional[str] = None) -> Dict:
+    """Log record for an emitted signal: payload fields plus ts (UTC ISO), entry_mid, ref and enqueue status."""
+    record = {k: _json_safe(v) for k, v in payload.items() if k not in _SKIP_FIELDS}
+    record["ts"] = record.get("created_at") or datetime.now(timezone.utc).isoformat()
+    record["ref"] = ref
+    entry = payload.get("entry")
+    if isinstance(entry, (list, tuple)) and entry:
+        record["entry_mid"] = sum(float(x) for x in entry) / len(entry)
+    elif entry is not None:
+        record["entry_mid"] = float(entry)
+    record["delivery"] = delivery or {}
+    return record
+
+
+def delivery_record(ref: str, symbol: str, chat_id: int, status: str, **details) -> Dict:
+    """Log record for the final outcome (sent, dead, expired) of one chat's copy of signal ref."""
+    return {
+        "ts": datetime.now(timezone.utc).isoformat(),
+        "event": "delivery",
+        "ref": ref,
+        "symbol": symbol,
+        "chat_id": chat_id,
+        "status": status,
+        **{k: _json_safe(v) for k, v in details.items()},
+    }
+
+
+def _day_of(ts: str) -> str:
+    try:
+        return datetime.fromisoformat(ts).astimezone(timezone.utc).date().isoformat()
+    except (TypeError, ValueError):
+        return datetime.now(timezone.utc).date().isoformat()
+
+
+class SignalLog:
+    def __init__(self, directory: Path = SIGNAL_LOG_DIR):
+        self.directory = Path(directory)
+        self._pending: List[Dict] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._day: Optional[str] = None
+        self._handle: Optional[IO[str]] = None
+
+    def path_for(self, day: str) -> Path:
+        return self.directory / f"signals-{day}.jsonl"
+
+    def append(self, record: Dict) -> None:
+        """Buffer one record (written on the next flush)."""
+        with self._lock:
+            self._pending.append(record)
+
+    def _file(self, day: str) -> IO[str]:
+        if day != self._day:
+            if self._handle is not None:
+                self._handle.close()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._handle = open(self.path_for(day), "a", encoding="utf-8")
+            self._day = day
+        return self._handle
+
+    def flush(self) -> int:
+        """Write buffered records to their day files; returns how many were written."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+        with self._write_lock:
+            for record in pending:
+                try:
+                    line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+                except (TypeError, ValueError) as exc:
+                    logger.warning(f"Signal log record skipped ({record.get('symbol')}): {exc}")
+                    continue
+                self._file(_day_of(record.get("ts"))).write(line + "\n")
+            if self._handle is not None:
+                self._handle.flush()
+        return len(pending)
+
+    def close(self) -> None:
+        self.flush()
+        with self._write_lock:
+            if self._handle is not None:
+                self._handle.close()
+            self._handle = None
+            self._day = None
+
+    async def run_flusher(self, interval_seconds: float = SIGNAL_LOG_FLUSH_SECONDS) -> None:
+        """Background task: flush the buffer periodically."""
+        while True:
+            await asyncio.sleep(max(0.1, interval_seconds))
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as exc:
+                logger.warning(f"Signal log flush failed: {exc}")
+
+
+_log: Optional[SignalLog] = None
+
+
+def get_signal_log() -> SignalLog:
+    global _log
+    if _log is None:
+        _log = SignalLog()
+    return _log
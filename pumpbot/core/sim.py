@@ -3,16 +3,13 @@ from __future__ import annotations
 import os
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Callable, Optional, Tuple
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
 
 from loguru import logger
 
-from pumpbot.core.database import (
-    get_open_trades,
-    trade_close_all,
-    trade_mark_partial,
-    trade_open,
-)
+from pumpbot.core.trade_book import OpenTrade, TradeBook
+from pumpbot.core.trigger_index import DOWN, UP, TriggerIndex
+from pumpbot.core.win_rate import WinRateTracker, get_win_rate_tracker
 
 
 def _env_float(name: str, default: float) -> float:
@@ -56,20 +53,64 @@ class SimEngine:
       - Position size (qty) = (equity * risk%) / stop_distance
       - TP1 closes qty * tp1_ratio_qty; optional BE after TP1
       - Fees applied per leg
-      - Writes trades to SQLite
+      - Open trades live in an in-memory book (written through to SQLite)
+      - TP1/TP2/SL levels sit in a per-symbol trigger index, so a tick only
+        visits the trades whose levels it crossed
+      - Every close is reported to the rolling win-rate tracker
     """
 
-    def __init__(self, notifier: Optional[Callable[[str], None]] = None):
+    def __init__(
+        self,
+        notifier: Optional[Callable[..., Awaitable[None]]] = None,
+        book: Optional[TradeBook] = None,
+        win_rate: Optional[WinRateTracker] = None,
+    ):
         self.cfg = SimConfig.from_env()
         self._notify = notifier
+        if book is None:
+            book = TradeBook()
+            book.load()
+        self.book = book
+        self.win_rate = win_rate if win_rate is not None else get_win_rate_tracker()
+        self._triggers: Dict[str, TriggerIndex] = {}
+        for trade in self.book:
+            self._index_trade(trade)
 
     # -------- Helpers --------
     def _fee(self, notional_usd: float) -> float:
         return (self.cfg.fee_bps / 10_000.0) * float(notional_usd)
 
-    async def _notify_if(self, text: str) -> None:
+    async def _notify_if(self, text: str, event: str = "INFO", symbol: Optional[str] = None) -> None:
+        """event: OPEN, TP1, TP2 or SL; notifiers use it (and symbol) to batch or edit updates."""
         if self.cfg.notify and self._notify:
-            await self._notify(text)
+            await self._notify(text, event=event, symbol=symbol)
+
+    def _tp1_pending(self, t: OpenTrade) -> bool:
+        return t.filled_tp1_qty < t.qty * self.cfg.tp1_ratio_qty
+
+    @staticmethod
+    def _levels(t: OpenTrade):
+        """(kind, level, direction) of each trigger of t; SHORT targets are below entry."""
+        target, stop = (UP, DOWN) if t.side == "LONG" else (DOWN, UP)
+        return (("TP1", t.tp1, target), ("TP2", t.tp2, target), ("SL", t.sl, stop))
+
+    def _index_trade(self, t: OpenTrade) -> None:
+        if t.side not in ("LONG", "SHORT"):
+            return
+        index = self._triggers.setdefault(t.symbol, TriggerIndex())
+        for kind, level, direction in self._levels(t):
+            if kind != "TP1" or self._tp1_pending(t):
+                index.add((t.id, kind), level, direction)
+
+    def _unindex_trade(self, t: OpenTrade, kinds=("TP1", "TP2", "SL")) -> None:
+        index = self._triggers.get(t.symbol)
+        if index is None:
+            return
+        for kind, level, direction in self._levels(t):
+            if kind in kinds:
+                index.discard((t.id, kind), level, direction)
+        if not len(index):
+            del self._triggers[t.symbol]
 
     @staticmethod
     def _extract_entry_price(payload: dict) -> float:
@@ -90,6 +131,9 @@ class SimEngine:
             return float(levels[0]), float(levels[1])
         return float(payload.get("tp1")), float(payload.get("tp2"))
 
+    def has_open_position(self, symbol: str) -> bool:
+        return self.book.has_symbol(symbol)
+
     # -------- Events --------
     async def on_signal_open(self, payload: dict):
         """
@@ -115,7 +159,7 @@ class SimEngine:
         size_usd = qty * entry
         now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
 
-        trade_open(
+        trade = await self.book.open(
             symbol=symbol,
             side=side,
             entry=entry,
@@ -126,127 +170,63 @@ class SimEngine:
             sl=sl,
             opened_at=now,
         )
+        if trade is not None:
+            self._index_trade(trade)
 
         txt = (
             f"{side} OPEN {symbol}\n"
             f"Entry:{entry:.4f} SL:{sl:.4f} TP1:{tp1:.4f} TP2:{tp2:.4f}"
         )
         logger.info(txt)
-        await self._notify_if(txt)
+        await self._notify_if(txt, event="OPEN", symbol=symbol)
+
+    async def on_ticks(self, prices: Dict[str, float]) -> None:
+        """Advance open trades for a whole scan cycle ({symbol: last_price}) in one pass."""
+        for symbol in self.book.symbols():
+            price = prices.get(symbol)
+            if price is not None:
+                await self.on_tick(symbol, price)
 
     async def on_tick(self, symbol: str, last_price: float):
         """
-        Advance open trades on every price tick.
+        Advance the open trades of symbol whose TP/SL levels the price crossed.
         """
-        for t in get_open_trades():
-            (
-                _id,
-                sym,
-                side,
-                entry,
-                size,
-                qty,
-                tp1,
-                tp2,
-                sl,
-                filled_tp1_qty,
-                status,
-                opened_at,
-                lastp,
-            ) = t
-
-            if sym != symbol:
-                continue
-
-            if side == "SHORT":
-                if last_price <= tp2:
-                    await self._final_close(
-                        sym,
-                        side,
-                        entry,
-                        qty,
-                        tp1,
-                        tp2,
-                        sl,
-                        filled_tp1_qty,
-                        exit_price=tp2,
-                        reason="TP2",
-                    )
-                    continue
-                if last_price >= sl:
-                    await self._final_close(
-                        sym,
-                        side,
-                        entry,
-                        qty,
-                        tp1,
-                        tp2,
-                        sl,
-                        filled_tp1_qty,
-                        exit_price=sl,
-                        reason="SL",
-                    )
-                    continue
-                need_partial = (last_price <= tp1) and (
-                    filled_tp1_qty < qty * self.cfg.tp1_ratio_qty
-                )
-                if need_partial:
-                    close_qty = qty * self.cfg.tp1_ratio_qty - filled_tp1_qty
-                    if close_qty > 0:
-                        realized = (entry - tp1) * close_qty
-                        realized -= self._fee(entry * close_qty) + self._fee(tp1 * close_qty)
-                        trade_mark_partial(
-                            sym,
-                            close_qty,
-                            last_price,
-                            datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-                        )
-                        await self._notify_if(f"TP1 HIT SHORT {sym} +${realized:.2f}")
+        index = self._triggers.get(symbol)
+        if index is None:
+            return
+        fired: Dict[int, Set[str]] = {}
+        for trade_id, kind in index.crossed(last_price):
+            fired.setdefault(trade_id, set()).add(kind)
+        for trade_id in sorted(fired):
+            t = self.book.get(trade_id)
+            if t is None:
+                continue  # closed earlier in this tick (closes apply per symbol)
+            kinds = fired[trade_id]
+            if "TP2" in kinds:
+                await self._final_close(t, exit_price=t.tp2, reason="TP2")
+            elif "SL" in kinds:
+                await self._final_close(t, exit_price=t.sl, reason="SL")
+            else:
+                await self._partial_tp1(t, last_price)
 
-            if side == "LONG":
-                if last_price >= tp2:
-                    await self._final_close(
-                        sym,
-                        side,
-                        entry,
-                        qty,
-                        tp1,
-                        tp2,
-                        sl,
-                        filled_tp1_qty,
-                        exit_price=tp2,
-                        reason="TP2",
-                    )
-                    continue
-                if last_price <= sl:
-                    await self._final_close(
-                        sym,
-                        side,
-                        entry,
-                        qty,
-                        tp1,
-                        tp2,
-                        sl,
-                        filled_tp1_qty,
-                        exit_price=sl,
-                        reason="SL",
-                    )
-                    continue
-                need_partial = (last_price >= tp1) and (
-                    filled_tp1_qty < qty * self.cfg.tp1_ratio_qty
-                )
-                if need_partial:
-                    close_qty = qty * self.cfg.tp1_ratio_qty - filled_tp1_qty
-                    if close_qty > 0:
-                        realized = (tp1 - entry) * close_qty
-                        realized -= self._fee(entry * close_qty) + self._fee(tp1 * close_qty)
-                        trade_mark_partial(
-                            sym,
-                            close_qty,
-                            last_price,
-                            datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-                        )
-                        await self._notify_if(f"TP1 HIT LONG {sym} +${realized:.2f}")
+    async def _partial_tp1(self, t: OpenTrade, last_price: float) -> None:
+        close_qty = t.qty * self.cfg.tp1_ratio_qty - t.filled_tp1_qty
+        if close_qty <= 0:
+            self._unindex_trade(t, kinds=("TP1",))
+            return
+        move = (t.tp1 - t.entry) if t.side == "LONG" else (t.entry - t.tp1)
+        realized = move * close_qty
+        realized -= self._fee(t.entry * close_qty) + self._fee(t.tp1 * close_qty)
+        trades = self.book.for_symbol(t.symbol)
+        filled = await self.book.mark_partial(t.symbol, close_qty, last_price, datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"))
+        filled_ids = {trade.id for trade in filled}
+        for trade in trades:
+            if trade.id in filled_ids:
+                self._unindex_trade(trade)
+                self.win_rate.record(trade.symbol, 0.0, trade.id)  # fully filled at TP1: stored with pnl_usd 0
+            elif not self._tp1_pending(trade):
+                self._unindex_trade(trade, kinds=("TP1",))
+        await self._notify_if(f"TP1 HIT {t.side} {t.symbol} +${realized:.2f}", event="TP1", symbol=t.symbol)
 
     # -------- Closing & total PnL --------
     def _compute_total_pnl(
@@ -291,43 +271,36 @@ class SimEngine:
 
         return float(pnl)
 
-    async def _final_close(
-        self,
-        symbol: str,
-        side: str,
-        entry: float,
-        qty: float,
-        tp1: float,
-        tp2: float,
-        sl: float,
-        filled_tp1_qty: float,
-        exit_price: float,
-        reason: str,
-    ):
+    async def _final_close(self, t: OpenTrade, exit_price: float, reason: str):
         """
         Close trade fully, compute PnL, and persist.
         """
         total_pnl = self._compute_total_pnl(
-            side=side,
-            entry=float(entry),
-            qty=float(qty),
-            tp1=float(tp1),
-            tp2=float(tp2),
-            sl=float(sl),
-            filled_tp1_qty=float(filled_tp1_qty),
+            side=t.side,
+            entry=float(t.entry),
+            qty=float(t.qty),
+            tp1=float(t.tp1),
+            tp2=float(t.tp2),
+            sl=float(t.sl),
+            filled_tp1_qty=float(t.filled_tp1_qty),
             final_exit_price=float(exit_price),
             reason=reason,
         )
-        size_usd = float(qty) * float(entry)
+        size_usd = float(t.qty) * float(t.entry)
         pnl_pct = (total_pnl / size_usd * 100.0) if size_usd else 0.0
 
         await self._notify_if(
-            f"{symbol} {reason} | Exit:{exit_price} | PnL ${total_pnl:.2f} ({pnl_pct:.2f}%)"
+            f"{t.symbol} {reason} | Exit:{exit_price} | PnL ${total_pnl:.2f} ({pnl_pct:.2f}%)",
+            event=reason,
+            symbol=t.symbol,
         )
-        trade_close_all(
-            symbol,
+        closed = await self.book.close_symbol(
+            t.symbol,
             last_price=float(exit_price),
             now_ts=datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
             realized_pnl_usd=total_pnl,
             realized_pnl_pct=pnl_pct,
         )
+        for trade in closed:
+            self._unindex_trade(trade)
+            self.win_rate.record(trade.symbol, total_pnl, trade.id)
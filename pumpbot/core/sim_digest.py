@@ -0,0 +1,81 @@
+"""
+Digest batching for simulator notifications.
+
+SimEngine events (OPEN, TP1, TP2, SL) are buffered for SIM_DIGEST_SECONDS and
+sent as one compact message per window instead of one message per event.
+Events listed in SIM_DIGEST_URGENT_EVENTS flush the buffer immediately, and a
+full buffer (SIM_DIGEST_MAX_EVENTS) flushes early.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import html
+import os
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Optional, Set
+
+from loguru import logger
+
+SIM_DIGEST_SECONDS = float(os.getenv("SIM_DIGEST_SECONDS", "30"))
+SIM_DIGEST_MAX_EVENTS = int(os.getenv("SIM_DIGEST_MAX_EVENTS", "20"))
+SIM_DIGEST_URGENT_EVENTS = {
+    e.strip().upper() for e in os.getenv("SIM_DIGEST_URGENT_EVENTS", "SL,TP2").split(",") if e.strip()
+}
+
+
+class SimDigest:
+    def __init__(
+        self,
+        send: Callable[[str], Awaitable[None]],
+        window_seconds: float = SIM_DIGEST_SECONDS,
+        max_events: int = SIM_DIGEST_MAX_EVENTS,
+        urgent_events: Optional[Set[str]] = None,
+    ):
+        self._send = send
+        self.window_seconds = window_seconds
+        self.max_events = max(1, max_events)
+        self.urgent_events = urgent_events if urgent_events is not None else SIM_DIGEST_URGENT_EVENTS
+        self._buffer: List[str] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def add(self, text: str, event: str = "INFO", symbol: Optional[str] = None) -> None:
+        """Buffer one simulator event; urgent events and full buffers flush right away."""
+        if self.window_seconds <= 0:
+            await self._send(text)
+            return
+        self._buffer.append(text)
+        if event.upper() in self.urgent_events or len(self._buffer) >= self.max_events:
+            await self.flush()
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.window_seconds)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Send everything buffered so far as one message."""
+        async with self._lock:
+            if self._timer is not None and self._timer is not asyncio.current_task():
+                self._timer.cancel()
+            self._timer = None
+            events, self._buffer = self._buffer, []
+            if not events:
+                return
+            try:
+                await self._send(format_digest(events))
+            except Exception as exc:
+                logger.error(f"Sim digest send failed ({len(events)} events): {exc}")
+
+
+def format_digest(events: List[str]) -> str:
+    if len(events) == 1:
+        return html.escape(events[0])
+    stamp = datetime.now(timezone.utc).strftime("%H:%M UTC")
+    lines = [f"<b>Simulator update</b> | {len(events)} events | {stamp}"]
+    for text in events:
+        lines.append("- " + html.escape(text.replace("\n", " | ")))
+    return "\n".join(lines)
@@ -4,7 +4,7 @@ import json
 import os
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
 from loguru import logger
 
@@ -12,6 +12,7 @@ from pumpbot.core.debugger import debug_throttle
 
 STATE_PATH = Path("signal_throttle.json")
 _last_seen: Dict[str, datetime] = {}
+_previous: Dict[str, Optional[datetime]] = {}  # state before the latest allow, for release_signal()
 DEFAULT_THROTTLE_MINUTES = int(os.getenv("THROTTLE_MINUTES", "5"))
 
 
@@ -52,7 +53,21 @@ def allow_signal(symbol: str, minutes: int | None = None) -> bool:
             debug_throttle(symbol, next_allowed.astimezone(timezone.utc).replace(tzinfo=None))
             return False
 
+    _previous[symbol] = last
     _last_seen[symbol] = now
     _persist_state()
     logger.debug(f"[THROTTLE] {symbol} allowed. Cooldown set to {minutes} min.")
     return True
+
+
+def release_signal(symbol: str) -> None:
+    """Give back the slot taken by the latest allow_signal(symbol) when that signal was never sent."""
+    if symbol not in _previous:
+        return
+    previous = _previous.pop(symbol)
+    if previous is None:
+        _last_seen.pop(symbol, None)
+    else:
+        _last_seen[symbol] = previous
+    _persist_state()
+    logger.debug(f"[THROTTLE] {symbol} slot released.")
@@ -0,0 +1,129 @@
+"""
+In-memory book of open simulated trades.
+
+The book is loaded from SQLite once (load()) and then kept as the source of
+truth for the simulator: lookups are by symbol and cost nothing per tick.
+Every change is written through to SQLite (off the event loop) with the
+same per-symbol semantics as the database functions, so a restart reloads
+the same state.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+from loguru import logger
+
+from pumpbot.core import db_async
+from pumpbot.core.database import get_open_trades
+
+
+@dataclass
+class OpenTrade:
+    id: int
+    symbol: str
+    side: str
+    entry: float
+    size: float
+    qty: float
+    tp1: float
+    tp2: float
+    sl: float
+    filled_tp1_qty: float
+    status: str
+    opened_at: str
+    last_price: Optional[float]
+
+    @classmethod
+    def from_row(cls, row) -> "OpenTrade":
+        """Row in get_open_trades() column order."""
+        return cls(*row)
+
+
+class TradeBook:
+    def __init__(self):
+        self._by_symbol: Dict[str, Dict[int, OpenTrade]] = {}
+        self._by_id: Dict[int, OpenTrade] = {}
+
+    def load(self) -> int:
+        """Replace the book with the open/partial trades stored in SQLite."""
+        self._by_symbol.clear()
+        self._by_id.clear()
+        for row in get_open_trades():
+            self._add(OpenTrade.from_row(row))
+        logger.debug(f"Trade book loaded: {len(self._by_id)} open trade(s)")
+        return len(self._by_id)
+
+    def _add(self, trade: OpenTrade) -> None:
+        self._by_symbol.setdefault(trade.symbol, {})[trade.id] = trade
+        self._by_id[trade.id] = trade
+
+    # -------- Reads --------
+    def has_symbol(self, symbol: str) -> bool:
+        return symbol in self._by_symbol
+
+    def for_symbol(self, symbol: str) -> List[OpenTrade]:
+        return list(self._by_symbol.get(symbol, {}).values())
+
+    def get(self, trade_id: int) -> Optional[OpenTrade]:
+        return self._by_id.get(trade_id)
+
+    def symbols(self) -> List[str]:
+        return list(self._by_symbol)
+
+    def __iter__(self) -> Iterator[OpenTrade]:
+        return iter(list(self._by_id.values()))
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    # -------- Write-through changes --------
+    async def open(self, symbol, side, entry, size, qty, tp1, tp2, sl, opened_at) -> Optional[OpenTrade]:
+        trade_id = await db_async.trade_open(
+            symbol=symbol, side=side, entry=entry, size=size, qty=qty, tp1=tp1, tp2=tp2, sl=sl, opened_at=opened_at
+        )
+        if trade_id is None:
+            return None
+        trade = OpenTrade(trade_id, symbol, side, entry, size, qty, tp1, tp2, sl, 0.0, "OPEN", opened_at, entry)
+        self._add(trade)
+        return trade
+
+    async def mark_partial(self, symbol: str, qty_delta: float, last_price: float, now_ts: str) -> List[OpenTrade]:
+        """Apply a TP1 fill to every open trade of symbol; returns trades that became fully filled (closed)."""
+        await db_async.trade_mark_partial(symbol, qty_delta, last_price, now_ts)
+        filled = []
+        for trade in self.for_symbol(symbol):
+            trade.filled_tp1_qty += qty_delta
+            trade.last_price = last_price
+            trade.status = "CLOSED" if trade.filled_tp1_qty >= trade.qty else "PARTIAL"
+            if trade.status == "CLOSED":
+                self._remove(trade)
+                filled.append(trade)
+        return filled
+
+    async def close_symbol(
+        self, symbol: str, last_price: float, now_ts: str, realized_pnl_usd: float, realized_pnl_pct: float
+    ) -> List[OpenTrade]:
+        """Close every open trade of symbol; returns the closed trades."""
+        await db_async.trade_close_all(
+            symbol,
+            last_price=last_price,
+            now_ts=now_ts,
+            realized_pnl_usd=realized_pnl_usd,
+            realized_pnl_pct=realized_pnl_pct,
+        )
+        closed = self.for_symbol(symbol)
+        for trade in closed:
+            trade.status = "CLOSED"
+            trade.last_price = last_price
+            self._remove(trade)
+        return closed
+
+    def _remove(self, trade: OpenTrade) -> None:
+        self._by_id.pop(trade.id, None)
+        trades = self._by_symbol.get(trade.symbol)
+        if trades is not None:
+            trades.pop(trade.id, None)
+            if not trades:
+                del self._by_symbol[trade.symbol]
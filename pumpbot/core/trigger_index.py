@@ -0,0 +1,60 @@
+"""
+Price-level trigger index.
+
+Keeps the TP/SL levels of one symbol in two sorted arrays: upward triggers
+fire once the price is at or above their level, downward triggers once it is
+at or below. crossed(price) finds the fired levels with one bisect per side,
+so a tick costs O(log n + hits) however many positions are open.
+"""
+
+from __future__ import annotations
+
+import math
+from bisect import bisect_left, bisect_right
+from typing import Hashable, List
+
+UP = 1
+DOWN = -1
+
+
+class TriggerIndex:
+    def __init__(self):
+        # Parallel arrays: levels sorted ascending, keys in the same order
+        self._up_levels: List[float] = []
+        self._up_keys: List[Hashable] = []
+        self._down_levels: List[float] = []
+        self._down_keys: List[Hashable] = []
+
+    def _side(self, direction: int):
+        if direction == UP:
+            return self._up_levels, self._up_keys
+        return self._down_levels, self._down_keys
+
+    def add(self, key: Hashable, level: float, direction: int) -> None:
+        level = float(level)
+        if not math.isfinite(level):
+            return
+        levels, keys = self._side(direction)
+        idx = bisect_right(levels, level)
+        levels.insert(idx, level)
+        keys.insert(idx, key)
+
+    def discard(self, key: Hashable, level: float, direction: int) -> bool:
+        """Remove key registered at level; False if it was not there."""
+        levels, keys = self._side(direction)
+        level = float(level)
+        for idx in range(bisect_left(levels, level), bisect_right(levels, level)):
+            if keys[idx] == key:
+                del levels[idx]
+                del keys[idx]
+                return True
+        return False
+
+    def crossed(self, price: float) -> List[Hashable]:
+        """Keys of every level the price has reached (triggers stay registered until discarded)."""
+        hits = self._up_keys[: bisect_right(self._up_levels, price)]
+        hits.extend(self._down_keys[bisect_left(self._down_levels, price):])
+        return hits
+
+    def __len__(self) -> int:
+        return len(self._up_keys) + len(self._down_keys)
@@ -0,0 +1,151 @@
+"""
+Rolling win-rate of closed simulator trades.
+
+The last closed trades are loaded from SQLite once; after that the simulator
+reports every close with record(), which updates each window's win count in
+O(1). Trades are ordered by id like the SQL query they replace (a trade that
+closes after a newer one is slotted in behind it). rate() is a dict lookup,
+so the alert path no longer queries SQLite.
+Windows are configured with WIN_RATE_WINDOWS (e.g. "30,100") and are kept
+both overall and per symbol.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import deque
+from typing import Deque, Dict, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from pumpbot.core import database
+
+DEFAULT_WINDOW = 30
+
+
+def _parse_windows(raw: str) -> Tuple[int, ...]:
+    windows = set()
+    for part in raw.split(","):
+        try:
+            value = int(part.strip())
+        except ValueError:
+            continue
+        if value > 0:
+            windows.add(value)
+    windows.add(DEFAULT_WINDOW)
+    return tuple(sorted(windows))
+
+
+WIN_RATE_WINDOWS = _parse_windows(os.getenv("WIN_RATE_WINDOWS", str(DEFAULT_WINDOW)))
+
+RECENT_CLOSED_SQL = "SELECT id, symbol, pnl_usd FROM trades WHERE status='CLOSED' ORDER BY id DESC LIMIT ?"
+RECENT_CLOSED_BY_SYMBOL_SQL = """
+    SELECT id, symbol, pnl_usd FROM (
+        SELECT symbol, pnl_usd, id,
+               ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY id DESC) AS rn
+        FROM trades WHERE status='CLOSED'
+    )
+    WHERE rn <= ? ORDER BY id
+"""
+
+
+class _Outcomes:
+    """Last max(windows) (trade_id, win) results, oldest first, with a running win count per window."""
+
+    def __init__(self, windows: Sequence[int]):
+        self.windows = windows
+        self._results: Deque[Tuple[Optional[int], bool]] = deque(maxlen=max(windows))
+        self._wins: Dict[int, int] = {w: 0 for w in windows}
+
+    def push(self, win: bool, trade_id: Optional[int] = None) -> None:
+        results = self._results
+        # Results newer than trade_id stay in front (usually none, so this is an append)
+        behind = 0
+        if trade_id is not None:
+            while behind < len(results) and (results[-1 - behind][0] or 0) > trade_id:
+                behind += 1
+        if behind == len(results) == results.maxlen:
+            return  # older than every tracked result
+        for w in self.windows:
+            if behind < w:
+                if len(results) >= w:
+                    self._wins[w] -= results[-w][1]  # result pushed out of this window
+                self._wins[w] += win
+        if len(results) == results.maxlen:
+            results.popleft()
+        results.insert(len(results) - behind, (trade_id, win))
+
+    def rate(self, window: int) -> float:
+        n = min(len(self._results), window)
+        return self._wins[window] / n * 100.0 if n else 0.0
+
+    def count(self, window: int) -> int:
+        return min(len(self._results), window)
+
+
+class WinRateTracker:
+    def __init__(self, windows: Sequence[int] = WIN_RATE_WINDOWS):
+        self.windows = tuple(sorted(set(windows)))
+        self._all = _Outcomes(self.windows)
+        self._by_symbol: Dict[str, _Outcomes] = {}
+
+    def load(self) -> int:
+        """Rebuild the windows from the closed trades stored in SQLite, archives included."""
+        self._all = _Outcomes(self.windows)
+        self._by_symbol = {}
+        if not database.DB_PATH.exists():
+            return 0
+        depth = max(self.windows)
+        try:
+            overall = database.query_recent(RECENT_CLOSED_SQL, (), depth, id_index=0)
+            per_symbol = database._query(RECENT_CLOSED_BY_SYMBOL_SQL, (depth,))
+            per_symbol += database.query_archives(RECENT_CLOSED_BY_SYMBOL_SQL, (depth,))
+        except Exception as exc:
+            logger.warning(f"Win-rate load failed: {exc}")
+            return 0
+        # Oldest first, so every push is an append
+        for trade_id, _symbol, pnl in sorted(overall):
+            if pnl is not None:
+                self._all.push(pnl > 0, trade_id)
+        for trade_id, symbol, pnl in sorted(per_symbol):
+            if pnl is not None:
+                self._symbol(symbol).push(pnl > 0, trade_id)
+        logger.debug(f"Win-rate windows {self.windows} loaded from {self._all.count(depth)} closed trade(s)")
+        return self._all.count(depth)
+
+    def _symbol(self, symbol: str) -> _Outcomes:
+        outcomes = self._by_symbol.get(symbol)
+        if outcomes is None:
+            outcomes = self._by_symbol[symbol] = _Outcomes(self.windows)
+        return outcomes
+
+    def record(self, symbol: str, pnl_usd: float, trade_id: Optional[int] = None) -> None:
+        """Account one closed trade (a win when pnl_usd > 0)."""
+        win = float(pnl_usd) > 0
+        self._all.push(win, trade_id)
+        self._symbol(symbol).push(win, trade_id)
+
+    def rate(self, window: int = DEFAULT_WINDOW, symbol: Optional[str] = None) -> float:
+        """Win rate (%) of the last window closed trades, overall or for one symbol; 0.0 with no history."""
+        if window not in self.windows:
+            raise ValueError(f"Window {window} not tracked (WIN_RATE_WINDOWS={self.windows})")
+        if symbol is None:
+            return self._all.rate(window)
+        outcomes = self._by_symbol.get(symbol)
+        return outcomes.rate(window) if outcomes else 0.0
+
+    def breakdown(self, window: int = DEFAULT_WINDOW) -> Dict[str, float]:
+        """{symbol: win rate %} over the last window trades of each symbol."""
+        return {symbol: outcomes.rate(window) for symbol, outcomes in self._by_symbol.items()}
+
+
+_tracker: Optional[WinRateTracker] = None
+
+
+def get_win_rate_tracker() -> WinRateTracker:
+    """Process-wide tracker, loaded from SQLite on first use."""
+    global _tracker
+    if _tracker is None:
+        _tracker = WinRateTracker()
+        _tracker.load()
+    return _tracker
@@ -1,19 +1,20 @@
 import asyncio
-import csv
 import os
 import signal
+import time
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
 from binance import AsyncClient
 from dotenv import load_dotenv
 from loguru import logger
-from telegram import BotCommand
-from telegram.constants import ParseMode
-from telegram.ext import ApplicationBuilder, CommandHandler
+from telegram import BotCommand, Update
+from telegram.ext import ApplicationBuilder, CommandHandler, TypeHandler
 
+from pumpbot.bot.concurrency import HANDLER_CONCURRENCY, rate_limit_commands, run_heavy, shutdown_heavy_pool
 from pumpbot.bot.handlers import (
     BOT_COMMANDS,
+    cmd_channel,
     cmd_config,
     cmd_help,
     cmd_health,
@@ -28,15 +29,34 @@ from pumpbot.bot.handlers import (
     cmd_symbols,
     cmd_testsignal,
     cmd_trades,
-    notify_all,
 )
+from pumpbot.core.archive import run_archiver
+from pumpbot.core.chart_cache import get_chart_cache, store_chart
+from pumpbot.core.chart_service import get_chart_service, render_signal_chart
 from pumpbot.core.daily_report import generate_daily_report
-from pumpbot.core.database import init_db, save_signal
+from pumpbot.core import db_async
+from pumpbot.core.database import close_db, init_db
 from pumpbot.core.detector import scan_symbols
 from pumpbot.core.quality_filter import get_recent_success_rate, should_emit_signal
+from pumpbot.core.signal_log import get_signal_log, signal_record
 from pumpbot.core.sim import SimEngine
-from pumpbot.core.throttle import allow_signal
-from pumpbot.telebot.notifier import format_daily_report_caption, send_vip_signal
+from pumpbot.core.sim_digest import SimDigest
+from pumpbot.core.throttle import allow_signal, release_signal
+from pumpbot.core.win_rate import get_win_rate_tracker
+from pumpbot.telebot.channels import SIGNAL_DELIVERY_MODE, broadcast_targets
+from pumpbot.telebot.delivery import TELEGRAM_MAX_CONCURRENCY
+from pumpbot.telebot.lifecycle import TradeLifecycleNotifier
+from pumpbot.telebot.notifier import format_daily_report_caption
+from pumpbot.telebot.outbox import (
+    OUTBOX_REPORT_TTL_SECONDS,
+    OUTBOX_SIM_TTL_SECONDS,
+    PRIORITY_REPORT,
+    PRIORITY_SIM,
+    OutboxDispatcher,
+    enqueue_message,
+    enqueue_vip_signal,
+    signal_message_key,
+)
 
 ALLOWED_INTERVALS = {"15m", "30m", "1h"}
 
@@ -160,35 +180,6 @@ def _normalize_timeframe(tf: str) -> str:
     return tf
 
 
-def _append_signal_csv(payload: dict) -> None:
-    """Persist minimal signal info to CSV for daily reports."""
-    csv_path = os.getenv("SIGNALS_DAILY_CSV", "signals_daily.csv")
-    entry_raw = payload.get("entry")
-    if isinstance(entry_raw, (list, tuple)) and entry_raw:
-        entry_mid = sum(float(x) for x in entry_raw) / len(entry_raw)
-    else:
-        try:
-            entry_mid = float(entry_raw) if entry_raw is not None else None
-        except Exception:
-            entry_mid = None
-    row = [
-        datetime.now(timezone.utc).isoformat(),
-        payload.get("symbol"),
-        entry_mid,
-        payload.get("score"),
-        payload.get("trend_label"),
-        (payload.get("tp_levels") or [None, None])[0],
-        (payload.get("tp_levels") or [None, None, None])[1],
-        payload.get("sl"),
-    ]
-    try:
-        with open(csv_path, "a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(row)
-    except Exception as exc:
-        logger.warning(f"Could not append to {csv_path}: {exc}")
-
-
 async def schedule_daily_report(app, chat_ids_csv: str, hour: int = 23, minute: int = 59):
     """Send a daily VIP report once per day."""
     while True:
@@ -199,27 +190,24 @@ async def schedule_daily_report(app, chat_ids_csv: str, hour: int = 23, minute:
         await asyncio.sleep((target - now).total_seconds())
 
         try:
-            summary_text, chart = generate_daily_report()
+            summary_text, chart = await run_heavy(generate_daily_report)
             caption = format_daily_report_caption(summary_text) if summary_text else None
-            for cid in _parse_chat_ids(chat_ids_csv):
+            chart_png = None
+            if chart and caption:
                 try:
-                    if chart and caption:
-                        with open(chart, "rb") as f:
-                            await app.bot.send_photo(
-                                chat_id=cid,
-                                photo=f,
-                                caption=caption,
-                                parse_mode=ParseMode.HTML,
-                            )
-                    elif caption:
-                        await app.bot.send_message(
-                            chat_id=cid,
-                            text=caption,
-                            parse_mode=ParseMode.HTML,
-                            disable_web_page_preview=True,
-                        )
-                except Exception as exc:
-                    logger.error(f"Daily report could not be sent to {cid}: {exc}")
+                    with open(chart, "rb") as f:
+                        chart_png = f.read()
+                except OSError as exc:
+                    logger.warning(f"Daily report chart could not be read: {exc}")
+            if caption:
+                await enqueue_message(
+                    chat_ids_csv,
+                    f"report:{target.date().isoformat()}",
+                    caption,
+                    priority=PRIORITY_REPORT,
+                    ttl_seconds=OUTBOX_REPORT_TTL_SECONDS,
+                    media=chart_png,
+                )
         except Exception as exc:
             logger.error(f"Daily report generation failed: {exc}")
 
@@ -228,8 +216,10 @@ async def main():
     load_dotenv()
     setup_logging()
     init_db()
+    get_win_rate_tracker()  # load the rolling win-rate windows once
 
     bot_token = os.getenv("BOT_TOKEN", "").strip()
+    bot_api_base_url = os.getenv("TELEGRAM_BASE_URL", "").strip()  # e.g. mock_bot_api.py for load tests
     chat_ids = os.getenv("TELEGRAM_CHAT_IDS", "").strip()
     api_key = os.getenv("BINANCE_API_KEY", "").strip()
     api_secret = os.getenv("BINANCE_API_SECRET", "").strip()
@@ -258,10 +248,25 @@ async def main():
         f"Config | timeframe={timeframe} scan_interval={scan_interval}s throttle={throttle_minutes}m symbols={len(symbols)}"
     )
 
-    app = ApplicationBuilder().token(bot_token).build()
+    # Updates are handled concurrently (bounded); heavy commands run in worker processes
+    # HTTP pool sized to what can be in flight (delivery engine + handlers); httpcore scans
+    # every pooled connection per request, so PTB's default of 256 costs throughput
+    builder = (
+        ApplicationBuilder()
+        .token(bot_token)
+        .concurrent_updates(HANDLER_CONCURRENCY)
+        .connection_pool_size(TELEGRAM_MAX_CONCURRENCY + HANDLER_CONCURRENCY)
+    )
+    if bot_api_base_url:
+        logger.warning(f"Using Bot API at {bot_api_base_url}")
+        builder = builder.base_url(bot_api_base_url)
+    app = builder.build()
+    app.add_handler(TypeHandler(Update, rate_limit_commands), group=-1)
     app.bot_data["symbols"] = symbols
     app.bot_data["binance_client"] = client
     control_user_id = _resolve_control_user_id(chat_ids)
+    broadcast_ids = broadcast_targets(chat_ids)
+    logger.info(f"Broadcast delivery mode={SIGNAL_DELIVERY_MODE} targets={len(_parse_chat_ids(broadcast_ids))}")
     app.bot_data["control_user_id"] = control_user_id
     if control_user_id:
         logger.info(f"Control user id set to {control_user_id}")
@@ -282,18 +287,25 @@ async def main():
     app.add_handler(CommandHandler("profile", cmd_profile))
     app.add_handler(CommandHandler("id", cmd_id))
     app.add_handler(CommandHandler("whoami", cmd_id))
+    app.add_handler(CommandHandler("channel", cmd_channel))
 
     async def sim_notifier(text):
-        await notify_all(app, chat_ids, text)
+        await enqueue_message(
+            broadcast_ids, f"sim:{time.time_ns()}", str(text), priority=PRIORITY_SIM, ttl_seconds=OUTBOX_SIM_TTL_SECONDS
+        )
 
-    sim = SimEngine(notifier=sim_notifier)
+    sim_digest = SimDigest(sim_notifier)
+    sim = SimEngine(notifier=TradeLifecycleNotifier(sim_digest.add))
+    signal_log = get_signal_log()
+    chart_service = get_chart_service()
+    chart_service.start()
 
     async def on_alert(payload: dict, market_data: dict):
         """Central signal gate called by scanner."""
         symbol = payload.get("symbol", "UNKNOWN")
         side = payload.get("side", "?")
         try:
-            success_rate = get_recent_success_rate()
+            success_rate = get_recent_success_rate()  # in-memory rolling window
             payload["success_rate"] = success_rate
             market_data["success_rate"] = success_rate
 
@@ -305,12 +317,27 @@ async def main():
                 logger.warning(f"[{symbol}] Rejected by throttle")
                 return False
 
+            # Mandatory: chart must exist for signal delivery. A signal that never
+            # gets its chart must not spend the symbol's throttle window.
+            chart_data = market_data.get("chart_data")
+            chart_png = None
+            try:
+                chart_png = await render_signal_chart(chart_data) if chart_data else None
+            finally:
+                if not chart_png:
+                    release_signal(symbol)
+            if not chart_png:
+                logger.error(f"[{symbol}] signal blocked: chart generation failed")
+                return False
+            payload["chart_png"] = chart_png
+            payload["chart_path"] = await store_chart(symbol, chart_png)
+
             price_mid = market_data.get("price") or 0.0
             score_val = payload.get("score") or 0.0
             volume_ratio = payload.get("volume_change_pct") or 0.0
             ts_iso = payload.get("created_at") or datetime.now(timezone.utc).isoformat()
             try:
-                save_signal(
+                await db_async.save_signal(
                     symbol=symbol,
                     price=float(price_mid),
                     volume=float(volume_ratio),
@@ -320,17 +347,20 @@ async def main():
                     macd_sig=None,
                     volume_spike=payload.get("volume_change_pct"),
                     ts_utc=ts_iso,
+                    trend=payload.get("trend_label"),
                 )
             except Exception as exc:
                 logger.warning(f"[{symbol}] save_signal failed: {exc}")
-            _append_signal_csv(payload)
 
+            ref = signal_message_key(payload)
             try:
-                await send_vip_signal(app, chat_ids, payload)
-                logger.success(f"[{symbol}] VIP signal sent ({side})")
+                queued = await enqueue_vip_signal(broadcast_ids, payload)
+                logger.success(f"[{symbol}] VIP signal queued ({side}) for {queued} chat(s)")
             except Exception as exc:
-                logger.error(f"[{symbol}] VIP signal send failed: {exc}")
+                logger.error(f"[{symbol}] VIP signal enqueue failed: {exc}")
+                signal_log.append(signal_record(payload, {"status": "failed", "error": str(exc)}, ref=ref))
                 return False
+            signal_log.append(signal_record(payload, {"status": "queued", "chats": queued}, ref=ref))
 
             try:
                 await sim.on_signal_open(payload)
@@ -351,11 +381,15 @@ async def main():
             timeframe,
             scan_interval,
             on_alert,
-            on_tick=sim.on_tick,
             user_id=control_user_id,
+            needs_tick=sim.has_open_position,
+            on_prices=sim.on_ticks,
         )
     )
-    task_report = asyncio.create_task(schedule_daily_report(app, chat_ids, hour=daily_hour, minute=daily_minute))
+    task_report = asyncio.create_task(schedule_daily_report(app, broadcast_ids, hour=daily_hour, minute=daily_minute))
+    task_chart_janitor = asyncio.create_task(get_chart_cache().run_janitor())
+    task_archiver = asyncio.create_task(run_archiver())
+    task_signal_log = asyncio.create_task(signal_log.run_flusher())
 
     task_scan.add_done_callback(lambda t: logger.error(f"scan_symbols stopped: {t.exception()}") if t.exception() else None)
     task_report.add_done_callback(
@@ -371,6 +405,10 @@ async def main():
     except Exception as exc:
         logger.warning(f"Bot command registration failed: {exc}")
     await app.start()
+    task_outbox = asyncio.create_task(OutboxDispatcher(app).run())
+    task_outbox.add_done_callback(
+        lambda t: logger.error(f"outbox dispatcher stopped: {t.exception()}") if not t.cancelled() and t.exception() else None
+    )
     if use_webhook:
         from urllib.parse import urlparse
 
@@ -410,6 +448,10 @@ async def main():
 
     task_scan.cancel()
     task_report.cancel()
+    task_chart_janitor.cancel()
+    task_archiver.cancel()
+    task_signal_log.cancel()
+    task_outbox.cancel()
     try:
         await task_scan
     except asyncio.CancelledError:
@@ -418,6 +460,24 @@ async def main():
         await task_report
     except asyncio.CancelledError:
         pass
+    try:
+        await task_chart_janitor
+    except asyncio.CancelledError:
+        pass
+    try:
+        await task_archiver
+    except asyncio.CancelledError:
+        pass
+    try:
+        await task_signal_log
+    except asyncio.CancelledError:
+        pass
+    signal_log.close()
+    await sim_digest.flush()
+    try:
+        await task_outbox
+    except asyncio.CancelledError:
+        pass
 
     await app.updater.stop()
 
@@ -427,9 +487,13 @@ async def main():
         except Exception as exc:
             logger.warning(f"Webhook delete failed: {exc}")
 
+    await chart_service.stop()
+    shutdown_heavy_pool()
     await app.stop()
     await app.shutdown()
     await client.close_connection()
+    db_async.shutdown_db_threads()
+    close_db()
     logger.info("Bot shutdown complete.")
 
 
@@ -0,0 +1,60 @@
+"""
+Channel broadcast delivery.
+
+With SIGNAL_DELIVERY_MODE=channel, broadcasts (signals, simulator digests,
+daily reports) are posted once to the private channel TELEGRAM_SIGNAL_CHANNEL
+instead of once per subscriber chat, so delivery cost no longer grows with
+the VIP list. VIP users join through a personal single-use invite link
+(/channel). Command replies stay in DMs.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from loguru import logger
+
+SIGNAL_DELIVERY_MODE = os.getenv("SIGNAL_DELIVERY_MODE", "dm").strip().lower()  # dm | channel | both
+CHANNEL_INVITE_TTL_HOURS = float(os.getenv("CHANNEL_INVITE_TTL_HOURS", "24"))
+
+
+def signal_channel(raw: str | None = None) -> Optional[int]:
+    """Channel id from TELEGRAM_SIGNAL_CHANNEL, or None when unset or invalid."""
+    raw = (raw if raw is not None else os.getenv("TELEGRAM_SIGNAL_CHANNEL", "")).strip()
+    if not raw:
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning(f"Invalid TELEGRAM_SIGNAL_CHANNEL ignored: {raw}")
+        return None
+
+
+def broadcast_targets(chat_ids_csv: str) -> str:
+    """Chat ids (CSV) that broadcasts should go to under the configured delivery mode."""
+    if SIGNAL_DELIVERY_MODE not in ("channel", "both"):
+        return chat_ids_csv
+    channel_id = signal_channel()
+    if channel_id is None:
+        logger.warning("SIGNAL_DELIVERY_MODE=channel but TELEGRAM_SIGNAL_CHANNEL is empty; using chat ids")
+        return chat_ids_csv
+    if SIGNAL_DELIVERY_MODE == "channel":
+        return str(channel_id)
+    dm_ids = [t.strip() for t in chat_ids_csv.split(",") if t.strip()]
+    return ",".join(dict.fromkeys([str(channel_id)] + dm_ids))
+
+
+async def create_invite_link(bot, user_id: int) -> Optional[str]:
+    """Single-use, expiring invite link to the signal channel for user_id (None without a channel)."""
+    channel_id = signal_channel()
+    if channel_id is None:
+        return None
+    link = await bot.create_chat_invite_link(
+        chat_id=channel_id,
+        name=f"vip-{user_id}"[:32],
+        expire_date=datetime.now(timezone.utc) + timedelta(hours=CHANNEL_INVITE_TTL_HOURS),
+        member_limit=1,
+    )
+    return link.invite_link
@@ -0,0 +1,171 @@
+"""
+Concurrent Telegram delivery with rate limiting.
+
+Broadcasts send to all chats at once; every request first takes a token from a
+global bucket (Bot API limit ~30 msg/s) and from the target chat's bucket
+(~1 msg/s for private chats, 20 msg/min for groups). Flood-control replies
+(RetryAfter) pause the engine for the requested time and the send is retried.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from loguru import logger
+from telegram.error import RetryAfter
+
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "30"))
+TELEGRAM_CHAT_RATE = float(os.getenv("TELEGRAM_CHAT_RATE", "1"))
+TELEGRAM_GROUP_RATE_PER_MIN = float(os.getenv("TELEGRAM_GROUP_RATE_PER_MIN", "20"))
+TELEGRAM_MAX_CONCURRENCY = int(os.getenv("TELEGRAM_MAX_CONCURRENCY", "32"))
+TELEGRAM_MAX_RETRIES = int(os.getenv("TELEGRAM_MAX_RETRIES", "3"))
+
+SendFn = Callable[[], Awaitable[Any]]
+
+
+class MessageExpired(Exception):
+    """Raised instead of sending when a message's deadline passed while it waited for a slot."""
+
+
+class TokenBucket:
+    """
+    Async token bucket. acquire() reserves a token immediately (the balance may
+    go negative) and sleeps until it is due, so waiters are served in order.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = max(rate, 1e-6)
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take one token; return how long the caller must wait before using it."""
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def try_acquire(self) -> bool:
+        """Take a token only if one is available right now."""
+        self._refill(time.monotonic())
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def drain(self, seconds: float) -> None:
+        """Push the bucket into debt so nothing is released for `seconds`."""
+        self._refill(time.monotonic())
+        self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+def _retry_after_seconds(exc: RetryAfter) -> float:
+    value = getattr(exc, "retry_after", 1)
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    return float(value or 1)
+
+
+class DeliveryEngine:
+    def __init__(
+        self,
+        global_rate: float = TELEGRAM_GLOBAL_RATE,
+        chat_rate: float = TELEGRAM_CHAT_RATE,
+        group_rate_per_min: float = TELEGRAM_GROUP_RATE_PER_MIN,
+        max_concurrency: int = TELEGRAM_MAX_CONCURRENCY,
+        max_retries: int = TELEGRAM_MAX_RETRIES,
+    ):
+        self.global_bucket = TokenBucket(global_rate)
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate_per_min / 60.0
+        self.max_retries = max(0, max_retries)
+        self._chat_buckets: Dict[int, TokenBucket] = {}
+        self._concurrency = max(1, max_concurrency)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._paused_until = 0.0  # monotonic time; set by flood control replies
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            # Negative ids are groups/channels, which Telegram limits per minute
+            rate = self.group_rate if chat_id < 0 else self.chat_rate
+            bucket = TokenBucket(rate, capacity=1.0)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _slots(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+        return self._semaphore
+
+    async def send(self, chat_id: int, send_fn: SendFn, deadline: Optional[float] = None) -> Any:
+        """
+        Run one Bot API call for chat_id within the rate limits, retrying on flood
+        control. deadline is a time.time() value; past it MessageExpired is raised
+        instead of sending late.
+        """
+        chat_bucket = self._chat_bucket(chat_id)
+        attempt = 0
+        while True:
+            await chat_bucket.acquire()
+            await self.global_bucket.acquire()
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                # Tokens reserved before a flood-control reply must not fire during the pause
+                await asyncio.sleep(pause)
+            if deadline is not None and time.time() > deadline:
+                raise MessageExpired(f"deadline passed before delivery to chat {chat_id}")
+            try:
+                async with self._slots():
+                    return await send_fn()
+            except RetryAfter as exc:
+                attempt += 1
+                wait = _retry_after_seconds(exc)
+                if attempt > self.max_retries:
+                    raise
+                logger.warning(f"Telegram flood control for chat {chat_id}: retry in {wait:.0f}s ({attempt}/{self.max_retries})")
+                chat_bucket.drain(wait)
+                self._paused_until = max(self._paused_until, time.monotonic() + wait)
+
+    async def fan_out(self, chat_ids: Iterable[int], send_for_chat: Callable[[int], Awaitable[Any]], label: str = "message") -> int:
+        """
+        Deliver to every chat concurrently. send_for_chat(chat_id) should route its
+        Bot API calls through send(). Returns the number of chats that succeeded.
+        """
+        chat_ids = list(chat_ids)
+        if not chat_ids:
+            return 0
+        started = time.monotonic()
+        results = await asyncio.gather(*(send_for_chat(cid) for cid in chat_ids), return_exceptions=True)
+        sent = 0
+        for cid, result in zip(chat_ids, results):
+            if isinstance(result, BaseException):
+                logger.error(f"{label} send failed for chat {cid}: {result}")
+            else:
+                sent += 1
+        logger.debug(f"{label} delivered to {sent}/{len(chat_ids)} chats in {time.monotonic() - started:.2f}s")
+        return sent
+
+
+_engine: Optional[DeliveryEngine] = None
+
+
+def get_delivery_engine() -> DeliveryEngine:
+    global _engine
+    if _engine is None:
+        _engine = DeliveryEngine()
+    return _engine
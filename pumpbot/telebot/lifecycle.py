@@ -0,0 +1,79 @@
+"""
+Trade lifecycle updates as in-place edits.
+
+When a signal is delivered, the outbox records (chat_id, message_id) for every
+copy in signal_messages. TP1/TP2/SL events for that symbol then edit those
+messages, appending a status line, instead of posting new ones. The mapping
+is deleted once the trade closes (TP2 or SL). Events that cannot be edited
+(no delivered copy, caption limit reached) fall back to the regular notifier.
+"""
+
+from __future__ import annotations
+
+import html
+import json
+import os
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+from loguru import logger
+
+from pumpbot.core.database import signal_messages_delete, signal_messages_latest, signal_messages_set_status
+from pumpbot.core.db_async import run_db
+from pumpbot.telebot.outbox import OUTBOX_SIM_TTL_SECONDS, PRIORITY_SIM, enqueue_edits
+
+SIGNAL_EDIT_UPDATES = os.getenv("SIGNAL_EDIT_UPDATES", "1") == "1"
+
+LIFECYCLE_EVENTS = {"TP1", "TP2", "SL"}
+FINAL_EVENTS = {"TP2", "SL"}
+CAPTION_LIMIT = 1024
+TEXT_LIMIT = 4096
+
+
+def _status_block(lines) -> str:
+    return "\n\n<b>Updates</b>\n" + "\n".join(html.escape(line) for line in lines)
+
+
+async def edit_signal_messages(symbol: str, event: str, text: str) -> bool:
+    """Append a status line to every delivered copy of symbol's latest signal; False if not possible."""
+    rows = await run_db(signal_messages_latest, symbol)
+    if not rows:
+        return False
+    signal_key = rows[0][0]
+    status = json.loads(rows[0][5] or "[]")
+    status.append(f"{datetime.now(timezone.utc).strftime('%H:%M')} UTC | {text}")
+    block = _status_block(status)
+
+    edits = []
+    for _key, chat_id, message_id, is_photo, body, _status in rows:
+        new_text = body + block
+        if len(new_text) > (CAPTION_LIMIT if is_photo else TEXT_LIMIT):
+            logger.debug(f"{symbol} signal message too long to edit; sending update as new message")
+            return False
+        edits.append((chat_id, message_id, is_photo, new_text))
+
+    await enqueue_edits(
+        f"edit:{signal_key}:{len(status)}", edits, priority=PRIORITY_SIM, ttl_seconds=OUTBOX_SIM_TTL_SECONDS
+    )
+    if event in FINAL_EVENTS:
+        await run_db(signal_messages_delete, signal_key)
+    else:
+        await run_db(signal_messages_set_status, signal_key, json.dumps(status))
+    return True
+
+
+class TradeLifecycleNotifier:
+    """SimEngine notifier: lifecycle events edit the signal message, everything else goes to `fallback`."""
+
+    def __init__(self, fallback: Callable[..., Awaitable[None]], enabled: bool = SIGNAL_EDIT_UPDATES):
+        self._fallback = fallback
+        self.enabled = enabled
+
+    async def __call__(self, text: str, event: str = "INFO", symbol: Optional[str] = None) -> None:
+        if self.enabled and symbol and event in LIFECYCLE_EVENTS:
+            try:
+                if await edit_signal_messages(symbol, event, text):
+                    return
+            except Exception as exc:
+                logger.warning(f"{symbol} lifecycle edit failed, sending new message: {exc}")
+        await self._fallback(text, event=event, symbol=symbol)
@@ -1,15 +1,25 @@
 from __future__ import annotations
 
+import hashlib
 import html
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable, List, Sequence
+from typing import Iterable, List, Optional, Sequence
 
 from loguru import logger
 from telegram.constants import ParseMode
+from telegram.error import BadRequest
 
+from pumpbot.telebot.delivery import get_delivery_engine
 
-def _parse_chat_ids(chat_ids_csv: str) -> List[int]:
+FILE_ID_CACHE_SIZE = 64
+
+# sha256(chart png) -> Telegram file_id of the first successful upload
+_file_ids: "OrderedDict[str, str]" = OrderedDict()
+
+
+def parse_chat_ids(chat_ids_csv: str) -> List[int]:
     chat_ids: List[int] = []
     for raw in chat_ids_csv.split(","):
         token = raw.strip()
@@ -128,28 +138,102 @@ def format_daily_report_caption(summary: str) -> str:
     return f"<b>PumpGPT Daily VIP Report</b>\n{safe_summary}\n\n<i>This is not financial advice.</i>"
 
 
+def load_chart_png(payload: dict) -> Optional[bytes]:
+    """In-memory chart bytes, falling back to a single read of chart_path."""
+    png = payload.get("chart_png")
+    if png:
+        return png
+    chart_path = payload.get("chart_path") or payload.get("chart")
+    if not chart_path or not Path(str(chart_path)).exists():
+        return None
+    try:
+        return Path(str(chart_path)).read_bytes()
+    except OSError as exc:
+        logger.warning(f"Chart could not be read from {chart_path}: {exc}")
+        return None
+
+
+def _remember_file_id(chart_key: str, message) -> None:
+    photos = getattr(message, "photo", None)
+    if not photos:
+        return
+    _file_ids[chart_key] = photos[-1].file_id
+    _file_ids.move_to_end(chart_key)
+    while len(_file_ids) > FILE_ID_CACHE_SIZE:
+        _file_ids.popitem(last=False)
+
+
+def chart_uploaded(chart_key: str) -> bool:
+    """Whether a chart with this key was uploaded already (later sends reuse its file_id)."""
+    return chart_key in _file_ids
+
+
+async def send_chart_photo(
+    app, chat_id: int, chart_png: bytes, chart_key: str, caption: str, deadline: Optional[float] = None
+):
+    """Send a chart, reusing the file_id of an earlier upload of the same image."""
+    engine = get_delivery_engine()
+    file_id = _file_ids.get(chart_key)
+    if file_id:
+        try:
+            message = await engine.send(
+                chat_id,
+                lambda: app.bot.send_photo(chat_id=chat_id, photo=file_id, caption=caption, parse_mode=ParseMode.HTML),
+                deadline=deadline,
+            )
+            if chart_key in _file_ids:
+                _file_ids.move_to_end(chart_key)
+            return message
+        except BadRequest as exc:
+            logger.warning(f"Cached chart file_id rejected, uploading again: {exc}")
+            _file_ids.pop(chart_key, None)
+    message = await engine.send(
+        chat_id,
+        lambda: app.bot.send_photo(chat_id=chat_id, photo=chart_png, caption=caption, parse_mode=ParseMode.HTML),
+        deadline=deadline,
+    )
+    _remember_file_id(chart_key, message)
+    return message
+
+
+async def broadcast_text(app, chat_ids: Sequence[int], text: str, label: str = "message") -> int:
+    """Send the same HTML text to every chat concurrently (rate limited)."""
+    engine = get_delivery_engine()
+
+    async def _send(cid: int):
+        return await engine.send(
+            cid,
+            lambda: app.bot.send_message(chat_id=cid, text=text, parse_mode=ParseMode.HTML, disable_web_page_preview=True),
+        )
+
+    return await engine.fan_out(chat_ids, _send, label=label)
+
+
+async def broadcast_chart(app, chat_ids: Sequence[int], chart_png: bytes, caption: str, label: str = "chart") -> int:
+    """
+    Send a chart with caption to every chat. The first chat gets the upload; the
+    rest reuse its file_id concurrently, so the image is uploaded once.
+    """
+    chat_ids = list(chat_ids)
+    engine = get_delivery_engine()
+    chart_key = hashlib.sha256(chart_png).hexdigest()
+
+    async def _send(cid: int):
+        return await send_chart_photo(app, cid, chart_png, chart_key, caption)
+
+    if chart_key in _file_ids:
+        return await engine.fan_out(chat_ids, _send, label=label)
+    sent = await engine.fan_out(chat_ids[:1], _send, label=label)
+    return sent + await engine.fan_out(chat_ids[1:], _send, label=label)
+
+
 async def send_vip_signal(app, chat_ids_csv: str, payload: dict) -> None:
-    chat_ids = _parse_chat_ids(chat_ids_csv)
+    chat_ids = parse_chat_ids(chat_ids_csv)
     caption = format_signal_message(payload)
-    chart_path = payload.get("chart_path") or payload.get("chart")
-    has_chart = bool(chart_path) and Path(str(chart_path)).exists()
+    chart_png = load_chart_png(payload)
+    symbol = payload.get("symbol", "?")
 
-    for cid in chat_ids:
-        try:
-            if has_chart:
-                with open(chart_path, "rb") as photo:
-                    await app.bot.send_photo(
-                        chat_id=cid,
-                        photo=photo,
-                        caption=caption,
-                        parse_mode=ParseMode.HTML,
-                    )
-            else:
-                await app.bot.send_message(
-                    chat_id=cid,
-                    text=caption,
-                    parse_mode=ParseMode.HTML,
-                    disable_web_page_preview=True,
-                )
-        except Exception as exc:
-            logger.error(f"VIP signal send failed for chat {cid}: {exc}")
+    if chart_png:
+        await broadcast_chart(app, chat_ids, chart_png, caption, label=f"{symbol} VIP signal")
+    else:
+        await broadcast_text(app, chat_ids, caption, label=f"{symbol} VIP signal")
@@ -0,0 +1,375 @@
+"""
+Durable outbound message queue.
+
+Messages are written to the SQLite outbox (one row per recipient chat) and the
+caller returns immediately. Rows are delivered by lane: VIP signals first, then
+simulator updates, then reports; a lower lane yields as soon as a more urgent
+row is due. Each row has an expiry deadline and is dropped (EXPIRED) rather
+than sent late, e.g. a signal whose entry zone is already stale.
+OutboxDispatcher drains due rows through the delivery engine, retries
+transient failures with exponential backoff and dead-letters rows that keep
+failing or can never succeed (blocked bot, unknown chat). Rows carry an
+idempotency key, so enqueueing the same signal twice (e.g. after a restart)
+does not duplicate it. Delivery is at-least-once: a crash between a send and
+its status update resends that one message.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+
+from loguru import logger
+from telegram.constants import ParseMode
+from telegram.error import BadRequest, Forbidden
+
+from pumpbot.core.database import (
+    outbox_due,
+    outbox_enqueue,
+    outbox_expire,
+    outbox_mark_dead,
+    outbox_mark_expired,
+    outbox_mark_retry,
+    outbox_mark_sent,
+    outbox_media,
+    outbox_next_due,
+    outbox_purge,
+    signal_message_save,
+    signal_messages_gc,
+)
+from pumpbot.core.db_async import run_db
+from pumpbot.core.signal_log import delivery_record, get_signal_log
+from pumpbot.telebot.delivery import TELEGRAM_GLOBAL_RATE, MessageExpired, get_delivery_engine
+from pumpbot.telebot.notifier import (
+    chart_uploaded,
+    format_signal_message,
+    load_chart_png,
+    parse_chat_ids,
+    send_chart_photo,
+)
+
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "5"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_BACKOFF_BASE = float(os.getenv("OUTBOX_BACKOFF_BASE", "2"))
+OUTBOX_BACKOFF_MAX = float(os.getenv("OUTBOX_BACKOFF_MAX", "600"))
+OUTBOX_RETENTION_HOURS = float(os.getenv("OUTBOX_RETENTION_HOURS", "48"))
+OUTBOX_SIGNAL_TTL_SECONDS = float(os.getenv("OUTBOX_SIGNAL_TTL_SECONDS", "900"))
+OUTBOX_SIM_TTL_SECONDS = float(os.getenv("OUTBOX_SIM_TTL_SECONDS", "3600"))
+OUTBOX_REPORT_TTL_SECONDS = float(os.getenv("OUTBOX_REPORT_TTL_SECONDS", "21600"))
+SIGNAL_MESSAGE_RETENTION_DAYS = float(os.getenv("SIGNAL_MESSAGE_RETENTION_DAYS", "7"))
+
+# Delivery lanes, most urgent first
+PRIORITY_SIGNAL = 0
+PRIORITY_SIM = 1
+PRIORITY_REPORT = 2
+
+KIND_TEXT = "text"
+KIND_PHOTO = "photo"
+KIND_EDIT = "edit"  # body carries message_id/is_photo of an already delivered message
+
+_wakeup: Optional[asyncio.Event] = None
+
+
+def _event() -> asyncio.Event:
+    global _wakeup
+    if _wakeup is None:
+        _wakeup = asyncio.Event()
+    return _wakeup
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _created_ts(created_at) -> float:
+    if isinstance(created_at, datetime):
+        return created_at.timestamp()
+    if isinstance(created_at, str):
+        try:
+            parsed = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+        except ValueError:
+            return time.time()
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    return time.time()
+
+
+def _enqueue(
+    message_key: str,
+    chat_ids: Iterable[int],
+    kind: str,
+    body: dict,
+    priority: int,
+    expires_at: Optional[float],
+    media: Optional[bytes] = None,
+) -> int:
+    media_key = hashlib.sha256(media).hexdigest() if media else None
+    body_json = json.dumps(body)
+    now, created_at = time.time(), _now_iso()
+    rows = [
+        (f"{message_key}:{cid}", cid, kind, body_json, media_key, priority, expires_at, now, created_at)
+        for cid in chat_ids
+    ]
+    return outbox_enqueue(rows, (media_key, media) if media else None)
+
+
+async def enqueue_message(
+    chat_ids_csv: str,
+    message_key: str,
+    text: str,
+    priority: int = PRIORITY_SIM,
+    ttl_seconds: Optional[float] = None,
+    media: Optional[bytes] = None,
+    created_ts: Optional[float] = None,
+    extra: Optional[dict] = None,
+) -> int:
+    """
+    Queue an HTML message (a photo caption when media is given) for every chat.
+    The deadline is created_ts + ttl_seconds. Returns the number of new outbox rows.
+    """
+    expires_at = (created_ts or time.time()) + ttl_seconds if ttl_seconds else None
+    kind = KIND_PHOTO if media else KIND_TEXT
+    body = {"text": text, **(extra or {})}
+    queued = await run_db(
+        _enqueue, message_key, parse_chat_ids(chat_ids_csv), kind, body, priority, expires_at, media
+    )
+    _event().set()
+    return queued
+
+
+def signal_message_key(payload: dict) -> str:
+    """Outbox key of a VIP signal; delivered copies and signal log records refer to it."""
+    return f"signal:{payload.get('symbol', '?')}:{payload.get('side', '')}:{payload.get('created_at', '')}"
+
+
+async def enqueue_vip_signal(chat_ids_csv: str, payload: dict) -> int:
+    """Queue a VIP signal for every chat; it expires OUTBOX_SIGNAL_TTL_SECONDS after the signal time."""
+    symbol = payload.get("symbol", "?")
+    created_at = payload.get("created_at", "")
+    message_key = signal_message_key(payload)
+    return await enqueue_message(
+        chat_ids_csv,
+        message_key,
+        format_signal_message(payload),
+        priority=PRIORITY_SIGNAL,
+        ttl_seconds=OUTBOX_SIGNAL_TTL_SECONDS,
+        media=load_chart_png(payload),
+        created_ts=_created_ts(created_at),
+        # delivered copies are recorded so lifecycle updates can edit them in place
+        extra={"ref": message_key, "symbol": symbol},
+    )
+
+
+def _enqueue_edits(message_key: str, edits: List[tuple], priority: int, expires_at: Optional[float]) -> int:
+    now, created_at = time.time(), _now_iso()
+    rows = [
+        (
+            f"{message_key}:{chat_id}",
+            chat_id,
+            KIND_EDIT,
+            json.dumps({"text": text, "message_id": message_id, "is_photo": bool(is_photo)}),
+            None,
+            priority,
+            expires_at,
+            now,
+            created_at,
+        )
+        for chat_id, message_id, is_photo, text in edits
+    ]
+    return outbox_enqueue(rows)
+
+
+async def enqueue_edits(
+    message_key: str, edits: List[tuple], priority: int = PRIORITY_SIM, ttl_seconds: Optional[float] = None
+) -> int:
+    """Queue edits of delivered messages; edits are (chat_id, message_id, is_photo, new_text)."""
+    expires_at = time.time() + ttl_seconds if ttl_seconds else None
+    queued = await run_db(_enqueue_edits, message_key, edits, priority, expires_at)
+    _event().set()
+    return queued
+
+
+def _log_delivery(body: dict, chat_id: int, status: str, **details) -> None:
+    """Record the final outcome of a signal copy in the signal log (only signal rows carry a ref)."""
+    if body.get("ref"):
+        get_signal_log().append(delivery_record(body["ref"], body.get("symbol", ""), chat_id, status, **details))
+
+
+def _backoff(attempts: int) -> float:
+    delay = min(OUTBOX_BACKOFF_BASE * (2 ** (attempts - 1)), OUTBOX_BACKOFF_MAX)
+    return delay * random.uniform(0.8, 1.2)
+
+
+class OutboxDispatcher:
+    def __init__(self, app, batch_size: int = OUTBOX_BATCH_SIZE, poll_seconds: float = OUTBOX_POLL_SECONDS):
+        self.app = app
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        # About one second of global send budget per chunk, so lanes can be preempted quickly
+        self.chunk_size = max(1, int(TELEGRAM_GLOBAL_RATE))
+        self._last_purge = 0.0
+
+    async def _send_row(self, row, body: dict):
+        _row_id, idem_key, chat_id, kind, _body, media_key, _attempts, _priority, expires_at = row
+        engine = get_delivery_engine()
+        text = body.get("text", "")
+        if kind == KIND_EDIT:
+            return await self._edit(chat_id, body, expires_at)
+        if kind == KIND_PHOTO and media_key:
+            png = await run_db(outbox_media, media_key)
+            if png:
+                return await send_chart_photo(self.app, chat_id, png, media_key, text, deadline=expires_at)
+            logger.warning(f"Outbox media {media_key[:12]} missing for {idem_key}; sending text only")
+        return await engine.send(
+            chat_id,
+            lambda: self.app.bot.send_message(
+                chat_id=chat_id, text=text, parse_mode=ParseMode.HTML, disable_web_page_preview=True
+            ),
+            deadline=expires_at,
+        )
+
+    async def _edit(self, chat_id: int, body: dict, expires_at: Optional[float]):
+        bot, message_id, text = self.app.bot, body["message_id"], body.get("text", "")
+
+        def call():
+            if body.get("is_photo"):
+                return bot.edit_message_caption(
+                    chat_id=chat_id, message_id=message_id, caption=text, parse_mode=ParseMode.HTML
+                )
+            return bot.edit_message_text(
+                chat_id=chat_id,
+                message_id=message_id,
+                text=text,
+                parse_mode=ParseMode.HTML,
+                disable_web_page_preview=True,
+            )
+
+        try:
+            return await get_delivery_engine().send(chat_id, call, deadline=expires_at)
+        except BadRequest as exc:
+            if "not modified" in str(exc).lower():
+                return None
+            raise
+
+    async def _deliver(self, row) -> None:
+        row_id, idem_key, chat_id, attempts = row[0], row[1], row[2], row[6]
+        body = json.loads(row[4])
+        try:
+            message = await self._send_row(row, body)
+        except MessageExpired:
+            await run_db(outbox_mark_expired, row_id)
+            _log_delivery(body, chat_id, "expired")
+            logger.info(f"Outbox {idem_key} expired before delivery; dropped")
+            return
+        except (Forbidden, BadRequest) as exc:
+            # Bot blocked, chat missing, malformed message: retrying cannot help
+            await run_db(outbox_mark_dead, row_id, attempts + 1, str(exc))
+            _log_delivery(body, chat_id, "dead", error=str(exc))
+            logger.error(f"Outbox dead-letter {idem_key}: {exc}")
+            return
+        except Exception as exc:
+            attempts += 1
+            if attempts >= OUTBOX_MAX_ATTEMPTS:
+                await run_db(outbox_mark_dead, row_id, attempts, str(exc))
+                _log_delivery(body, chat_id, "dead", error=str(exc), attempts=attempts)
+                logger.error(f"Outbox dead-letter {idem_key} after {attempts} attempts: {exc}")
+            else:
+                delay = _backoff(attempts)
+                await run_db(outbox_mark_retry, row_id, attempts, time.time() + delay, str(exc))
+                logger.warning(f"Outbox send failed for {idem_key} (attempt {attempts}), retry in {delay:.1f}s: {exc}")
+            return
+        await run_db(outbox_mark_sent, row_id, _now_iso())
+        _log_delivery(body, chat_id, "sent", message_id=getattr(message, "message_id", None))
+        if body.get("ref") and getattr(message, "message_id", None):
+            try:
+                await run_db(
+                    signal_message_save,
+                    body["ref"],
+                    body.get("symbol", ""),
+                    chat_id,
+                    message.message_id,
+                    bool(getattr(message, "photo", None)),
+                    body.get("text", ""),
+                    _now_iso(),
+                )
+            except Exception as exc:
+                logger.warning(f"Signal message mapping not saved for {idem_key}: {exc}")
+
+    async def _deliver_chunk(self, rows) -> None:
+        # Upload each chart once (first row), then the remaining rows reuse its file_id concurrently
+        first_uploads: List = []
+        seen_media = set()
+        rest: List = []
+        for row in rows:
+            media_key = row[5]
+            if media_key and not chart_uploaded(media_key) and media_key not in seen_media:
+                seen_media.add(media_key)
+                first_uploads.append(row)
+            else:
+                rest.append(row)
+        await asyncio.gather(*(self._deliver(row) for row in first_uploads))
+        await asyncio.gather(*(self._deliver(row) for row in rest))
+
+    async def drain_once(self) -> int:
+        """Deliver due rows lane by lane; returns the number of rows processed."""
+        now = time.time()
+        expired = await run_db(outbox_expire, now)
+        if expired:
+            logger.info(f"Outbox dropped {len(expired)} expired message(s)")
+            for chat_id, body in expired:
+                _log_delivery(json.loads(body), chat_id, "expired")
+        rows = await run_db(outbox_due, now, self.batch_size)
+        processed = 0
+        for start in range(0, len(rows), self.chunk_size):
+            chunk = rows[start:start + self.chunk_size]
+            lane = chunk[0][7]
+            if processed and lane > PRIORITY_SIGNAL:
+                # Yield to a more urgent lane that got work while this one was sending
+                if await run_db(outbox_due, time.time(), 1, lane - 1):
+                    break
+            await self._deliver_chunk(chunk)
+            processed += len(chunk)
+        return processed
+
+    async def _purge(self) -> None:
+        if time.time() - self._last_purge < 3600:
+            return
+        self._last_purge = time.time()
+        cutoff = (datetime.now(timezone.utc) - timedelta(hours=OUTBOX_RETENTION_HOURS)).isoformat()
+        mapping_cutoff = (datetime.now(timezone.utc) - timedelta(days=SIGNAL_MESSAGE_RETENTION_DAYS)).isoformat()
+        try:
+            await run_db(outbox_purge, cutoff)
+            await run_db(signal_messages_gc, mapping_cutoff)
+        except Exception as exc:
+            logger.warning(f"Outbox purge failed: {exc}")
+
+    async def run(self) -> None:
+        """Background task: drain the outbox whenever rows are queued or become due."""
+        wakeup = _event()
+        logger.info("Outbox dispatcher started")
+        while True:
+            wakeup.clear()
+            try:
+                processed = await self.drain_once()
+                await self._purge()
+                next_due = await run_db(outbox_next_due)
+            except Exception as exc:
+                logger.error(f"Outbox dispatcher error: {exc}")
+                processed, next_due = 0, None
+            if processed >= self.batch_size:
+                continue
+            timeout = self.poll_seconds
+            if next_due is not None:
+                timeout = min(timeout, max(0.0, next_due - time.time()))
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
@@ -11,6 +11,8 @@ from typing import Dict, Literal
 
 from loguru import logger
 
+from pumpbot.core import result_cache
+
 SETTINGS_FILE = Path("telebot/user_settings.json")
 SETTINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
 
@@ -43,6 +45,7 @@ def save_settings(data: Dict[int, Dict]) -> bool:
         _ensure_file()
         json_data = {str(k): v for k, v in data.items()}
         SETTINGS_FILE.write_text(json.dumps(json_data, indent=2))
+        result_cache.bump(result_cache.TOPIC_SETTINGS)
         return True
     except Exception as exc:
         logger.error(f"Failed to save settings: {exc}")
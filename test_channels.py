@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Channel broadcast: broadcast targets per delivery mode and the single-use
+invite link handed to VIP users.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from pumpbot.telebot import channels
+
+CHATS = "101,102"
+CHANNEL = "-1001234567890"
+
+
+@pytest.mark.parametrize(
+    "mode, channel, expected",
+    [
+        ("dm", CHANNEL, CHATS),
+        ("channel", CHANNEL, CHANNEL),
+        ("both", CHANNEL, f"{CHANNEL},101,102"),
+        ("channel", "", CHATS),  # no channel configured: fall back to DMs
+        ("channel", "not-a-number", CHATS),
+    ],
+)
+def test_broadcast_targets(monkeypatch, mode, channel, expected):
+    monkeypatch.setattr(channels, "SIGNAL_DELIVERY_MODE", mode)
+    monkeypatch.setenv("TELEGRAM_SIGNAL_CHANNEL", channel)
+    assert channels.broadcast_targets(CHATS) == expected
+
+
+def test_invite_link_is_single_use_for_the_channel(monkeypatch):
+    calls = []
+
+    class FakeBot:
+        async def create_chat_invite_link(self, **kwargs):
+            calls.append(kwargs)
+            return SimpleNamespace(invite_link="https://t.me/+abc")
+
+    monkeypatch.setenv("TELEGRAM_SIGNAL_CHANNEL", CHANNEL)
+    assert asyncio.run(channels.create_invite_link(FakeBot(), 42)) == "https://t.me/+abc"
+    assert calls[0]["chat_id"] == int(CHANNEL) and calls[0]["member_limit"] == 1
+
+    monkeypatch.setenv("TELEGRAM_SIGNAL_CHANNEL", "")
+    assert asyncio.run(channels.create_invite_link(FakeBot(), 42)) is None
+    assert len(calls) == 1
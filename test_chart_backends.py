@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Visual diff: raster chart backend vs matplotlib.
+
+Both backends render the same candles; candle bodies are located by their
+up/down colors and compared (count, color order and vertical position).
+"""
+
+import io
+import random
+
+import numpy as np
+import pytest
+
+from pumpbot.core import chart_generator
+from pumpbot.core.chart_generator import DOWN_COLOR, TP1_COLOR, UP_COLOR
+
+plt_image = pytest.importorskip("matplotlib.image")
+
+
+def _series(n: int = 60, seed: int = 3) -> dict:
+    rng = random.Random(seed)
+    opens, highs, lows, closes, volumes = [], [], [], [], []
+    price = 100.0
+    for _ in range(n):
+        move = rng.choice((-1, 1)) * rng.uniform(0.006, 0.015)  # bodies tall enough to see
+        o, c = price, price * (1 + move)
+        opens.append(o)
+        closes.append(c)
+        highs.append(max(o, c) * 1.003)
+        lows.append(min(o, c) * 0.997)
+        volumes.append(rng.uniform(500, 1500))
+        price = c
+    return dict(opens=opens, highs=highs, lows=lows, closes=closes, volumes=volumes)
+
+
+def _pixels(png: bytes) -> np.ndarray:
+    img = plt_image.imread(io.BytesIO(png), format="png")
+    return np.rint(img[..., :3] * 255).astype(int)
+
+
+def _color_mask(img: np.ndarray, color: str, tol: int = 12) -> np.ndarray:
+    rgb = np.array([int(color[i:i + 2], 16) for i in (1, 3, 5)])
+    return np.abs(img - rgb).max(axis=-1) <= tol
+
+
+def _candles(img: np.ndarray) -> list:
+    """Left-to-right (is_up, vertical center) of each candle body."""
+    up, down = _color_mask(img, UP_COLOR), _color_mask(img, DOWN_COLOR)
+    any_mask = up | down
+    rows = np.arange(img.shape[0])
+    cols = any_mask.sum(axis=0) >= 3  # ignore stray antialiased pixels
+    # matplotlib's hairline wick splits a body by a column or two; bridge such gaps
+    for x in range(1, len(cols) - 2):
+        if not cols[x] and cols[x - 1] and (cols[x + 1] or cols[x + 2]):
+            cols[x] = True
+    candles, start = [], None
+    for x, on in enumerate(list(cols) + [False]):
+        if on and start is None:
+            start = x
+        elif not on and start is not None:
+            run = any_mask[:, start:x]
+            is_up = up[:, start:x].sum() > down[:, start:x].sum()
+            center = float((rows[:, None] * run).sum() / run.sum())
+            candles.append((is_up, center))
+            start = None
+    return candles
+
+
+def _render(backend: str, **levels) -> bytes:
+    png = chart_generator.render_chart_png(symbol="DIFFUSDT", backend=backend, **_series(), **levels)
+    assert png is not None and png.startswith(b"\x89PNG")
+    return png
+
+
+def test_raster_matches_matplotlib():
+    raster = _candles(_pixels(_render("raster")))
+    reference = _candles(_pixels(_render("matplotlib")))
+
+    assert len(raster) == len(reference) == chart_generator.LOOKBACK
+    assert [up for up, _ in raster] == [up for up, _ in reference]
+
+    # Same shape: body centers move together (image scales differ, so compare correlation)
+    corr = np.corrcoef([c for _, c in raster], [c for _, c in reference])[0, 1]
+    assert corr > 0.98, f"body position correlation {corr:.3f}"
+
+
+def test_raster_draws_levels_and_is_compact():
+    base = _series()
+    entry = base["closes"][-1]
+    png = _render("raster", entry_price=entry, tp1=entry * 1.02, sl=entry * 0.985, signal_side="SHORT")
+    img = _pixels(png)
+    assert _color_mask(img, TP1_COLOR, tol=0).any()
+    assert len(png) < 64 * 1024
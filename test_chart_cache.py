@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Bounded on-disk chart cache: least recently used eviction under the size
+budget, age-based expiry, reindexing files from a previous run and a single
+janitor pass.
+"""
+
+import asyncio
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from pumpbot.core import chart_cache
+from pumpbot.core.chart_cache import ChartCache
+
+PNG = b"x" * 100
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ChartCache(directory=tmp_path, max_bytes=300, max_age_seconds=3600)
+
+
+def _files(directory):
+    return sorted(p.name for p in Path(directory).glob("chart_*.png"))
+
+
+def test_least_recently_used_chart_is_evicted_first(cache):
+    a = cache.put("AAA", PNG)
+    b = cache.put("BBB", PNG)
+    c = cache.put("CCC", PNG)
+    assert cache.get(a) == PNG  # a is now the most recently used
+    d = cache.put("DDD", PNG)
+    assert cache.get(b) is None and not Path(b).exists()
+    assert all(cache.get(p) == PNG for p in (a, c, d))
+    assert len(_files(cache.directory)) == 3
+
+
+def test_chart_larger_than_the_budget_is_not_kept(cache):
+    assert cache.put("BIG", b"x" * 400) is None
+    assert _files(cache.directory) == []
+
+
+def test_expired_charts_are_dropped(cache):
+    old = cache.put("OLD", PNG)
+    new = cache.put("NEW", PNG)
+    cache._index[old] = (len(PNG), time.time() - 7200)
+    assert cache.evict() == 1
+    assert not Path(old).exists() and cache.get(new) == PNG
+
+
+def test_files_from_a_previous_run_are_indexed_oldest_first(tmp_path):
+    for i, name in enumerate(("chart_A_1.png", "chart_B_2.png", "chart_C_3.png")):
+        path = tmp_path / name
+        path.write_bytes(PNG)
+        stamp = time.time() - 100 + i
+        os.utime(path, (stamp, stamp))
+    cache = ChartCache(directory=tmp_path, max_bytes=250, max_age_seconds=0)
+    assert cache.evict() == 1
+    assert _files(tmp_path) == ["chart_B_2.png", "chart_C_3.png"]
+
+
+def test_janitor_pass_enforces_the_budget(cache):
+    for symbol in ("AAA", "BBB"):
+        cache.put(symbol, PNG)
+    cache.max_bytes = 100  # e.g. the budget was lowered; the janitor catches up
+
+    async def one_pass():
+        task = asyncio.create_task(cache.run_janitor(interval_seconds=60))
+        while len(_files(cache.directory)) > 1:
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(asyncio.wait_for(one_pass(), timeout=5))
+    assert len(_files(cache.directory)) == 1
+
+
+def test_store_chart_respects_the_switch(tmp_path, monkeypatch):
+    monkeypatch.setattr(chart_cache, "_cache", ChartCache(directory=tmp_path, max_bytes=1000))
+    monkeypatch.setattr(chart_cache, "CHART_CACHE_ENABLED", False)
+    assert asyncio.run(chart_cache.store_chart("AAA", PNG)) is None
+    monkeypatch.setattr(chart_cache, "CHART_CACHE_ENABLED", True)
+    assert Path(asyncio.run(chart_cache.store_chart("AAA", PNG))).read_bytes() == PNG
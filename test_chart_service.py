@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Chart service: bounded queue drops, render timeouts, cancelled jobs that are
+never rendered, and a single pool restart when the worker pool breaks.
+Renders run on a thread pool with a stub job so no chart backend is needed.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from pumpbot.core import chart_service
+from pumpbot.core.chart_service import ChartService
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    """Stub render job that blocks until `release` is set; records the symbols it rendered."""
+    state = {"release": threading.Event(), "started": threading.Event(), "rendered": []}
+
+    def render_job(chart_kwargs):
+        state["started"].set()
+        state["release"].wait(5)
+        state["rendered"].append(chart_kwargs["symbol"])
+        return chart_kwargs["symbol"].encode()
+
+    monkeypatch.setattr(chart_service, "_render_job", render_job)
+    monkeypatch.setattr(ChartService, "_create_pool", lambda self: ThreadPoolExecutor(max_workers=self.workers))
+    yield state
+    state["release"].set()
+
+
+async def _wait(event):
+    while not event.is_set():
+        await asyncio.sleep(0.005)
+
+
+def test_render_returns_the_worker_result(jobs):
+    jobs["release"].set()
+
+    async def scenario():
+        service = ChartService(workers=2, queue_size=4, timeout=5)
+        try:
+            return await asyncio.gather(service.render(symbol="AAA"), service.render(symbol="BBB"))
+        finally:
+            await service.stop()
+
+    assert asyncio.run(scenario()) == [b"AAA", b"BBB"]
+
+
+def test_full_queue_drops_the_render(jobs):
+    async def scenario():
+        service = ChartService(workers=1, queue_size=1, timeout=5)
+        busy = asyncio.ensure_future(service.render(symbol="AAA"))
+        await _wait(jobs["started"])  # the worker holds AAA
+        queued = asyncio.ensure_future(service.render(symbol="BBB"))
+        await asyncio.sleep(0)
+        assert await service.render(symbol="CCC") is None  # queue full
+        jobs["release"].set()
+        results = await asyncio.gather(busy, queued)
+        await service.stop()
+        return results
+
+    assert asyncio.run(scenario()) == [b"AAA", b"BBB"]
+    assert jobs["rendered"] == ["AAA", "BBB"]
+
+
+def test_timed_out_job_is_cancelled_before_it_renders(jobs):
+    async def scenario():
+        service = ChartService(workers=1, queue_size=4, timeout=5)
+        busy = asyncio.ensure_future(service.render(symbol="AAA"))
+        await _wait(jobs["started"])
+        assert await service.render(timeout=0.05, symbol="BBB") is None  # still queued behind AAA
+        jobs["release"].set()
+        await busy
+        await service._queue.join()
+        await service.stop()
+
+    asyncio.run(scenario())
+    assert jobs["rendered"] == ["AAA"]
+
+
+def test_stop_cancels_queued_jobs(jobs):
+    async def scenario():
+        service = ChartService(workers=1, queue_size=4, timeout=5)
+        service.submit(symbol="AAA")
+        await _wait(jobs["started"])
+        queued = service.submit(symbol="BBB")
+        jobs["release"].set()
+        await service.stop()
+        return queued
+
+    assert asyncio.run(scenario()).cancelled()
+    assert "BBB" not in jobs["rendered"]
+
+
+class BrokenPool(Executor):
+    def __init__(self):
+        self.shutdowns = 0
+
+    def submit(self, fn, *args, **kwargs):
+        fut = Future()
+        fut.set_exception(BrokenProcessPool("worker died"))
+        return fut
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.shutdowns += 1
+
+
+def test_broken_pool_is_restarted_once(jobs, monkeypatch):
+    jobs["release"].set()
+    broken = BrokenPool()
+    pools = []
+
+    def create_pool(self):
+        pool = broken if not pools else ThreadPoolExecutor(max_workers=self.workers)
+        pools.append(pool)
+        return pool
+
+    monkeypatch.setattr(ChartService, "_create_pool", create_pool)
+
+    async def scenario():
+        service = ChartService(workers=3, queue_size=8, timeout=5)
+        failed = [service.submit(symbol=s) for s in ("AAA", "BBB", "CCC")]
+        outcomes = await asyncio.gather(*failed, return_exceptions=True)
+        after = await service.render(symbol="DDD")
+        await service.stop()
+        return outcomes, after
+
+    outcomes, after = asyncio.run(scenario())
+    assert all(isinstance(o, BrokenProcessPool) for o in outcomes)
+    assert after == b"DDD"
+    assert len(pools) == 2  # one replacement pool for three failing workers
+    assert broken.shutdowns == 1
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Command limits: per-user rate limit buckets (bounded to the most recently
+active users), one heavy run per user, HEAVY_COMMAND_SLOTS overall, and a
+busy reply that says which limit was hit.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from telegram.ext import ApplicationHandlerStop
+
+from pumpbot.bot import concurrency
+
+
+@pytest.fixture(autouse=True)
+def _fresh_limits(monkeypatch):
+    monkeypatch.setattr(concurrency, "HEAVY_COMMAND_SLOTS", 2)
+    monkeypatch.setattr(concurrency, "_heavy_slots", None)
+    monkeypatch.setattr(concurrency, "_heavy_inflight", set())
+    monkeypatch.setattr(concurrency, "_user_buckets", concurrency.OrderedDict())
+
+
+class Message:
+    def __init__(self):
+        self.replies = []
+
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+
+
+def _update(user_id):
+    return SimpleNamespace(effective_user=SimpleNamespace(id=user_id), effective_message=Message())
+
+
+def _command(user_id, text="/status"):
+    update = _update(user_id)
+    update.effective_message.text = text
+    return update
+
+
+def test_rate_limit_stops_commands_beyond_the_burst(monkeypatch):
+    monkeypatch.setattr(concurrency, "COMMAND_BURST", 2)
+    monkeypatch.setattr(concurrency, "COMMAND_RATE_PER_MIN", 1)
+
+    async def scenario():
+        for _ in range(2):
+            await concurrency.rate_limit_commands(_command(1), None)
+        blocked = _command(1)
+        with pytest.raises(ApplicationHandlerStop):
+            await concurrency.rate_limit_commands(blocked, None)
+        await concurrency.rate_limit_commands(_command(2), None)  # other users keep their own budget
+        await concurrency.rate_limit_commands(_command(1, text="hello"), None)  # plain text is not limited
+        return blocked
+
+    blocked = asyncio.run(scenario())
+    assert blocked.effective_message.replies == [concurrency.RATE_LIMIT_MESSAGE]
+
+
+def test_idle_user_buckets_are_evicted(monkeypatch):
+    monkeypatch.setattr(concurrency, "COMMAND_BUCKETS_MAX", 3)
+
+    async def scenario():
+        for user_id in (1, 2, 3):
+            await concurrency.rate_limit_commands(_command(user_id), None)
+        await concurrency.rate_limit_commands(_command(1), None)  # user 1 is active again
+        await concurrency.rate_limit_commands(_command(4), None)
+
+    asyncio.run(scenario())
+    assert list(concurrency._user_buckets) == [3, 1, 4]
+
+
+def test_busy_replies_name_the_limit_that_was_hit():
+    release = asyncio.Event()
+    started = []
+
+    @concurrency.heavy_command
+    async def report(update, context):
+        started.append(update.effective_user.id)
+        await release.wait()
+
+    async def scenario():
+        first, second = _update(1), _update(2)
+        running = [asyncio.create_task(report(first, None)), asyncio.create_task(report(second, None))]
+        await asyncio.sleep(0)
+
+        again = _update(1)
+        await report(again, None)  # user 1 already has a run in flight
+        other = _update(3)
+        await report(other, None)  # both global slots held by other users
+
+        release.set()
+        await asyncio.gather(*running)
+        after = _update(3)
+        await report(after, None)
+        return again, other, after
+
+    again, other, after = asyncio.run(scenario())
+    assert again.effective_message.replies == [concurrency.BUSY_MESSAGE]
+    assert other.effective_message.replies == [concurrency.SERVER_BUSY_MESSAGE]
+    assert after.effective_message.replies == []
+    assert started == [1, 2, 3]
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+SQLite single-writer thread: queued operations commit in one batch with a
+savepoint each, so a failing operation rolls back alone; exclusive work runs
+between batches with no transaction open.
+"""
+
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from pumpbot.core import database
+
+Writer = database._Writer
+
+
+@pytest.fixture
+def writer(tmp_path, monkeypatch):
+    path = tmp_path / "writer.db"
+    with closing(sqlite3.connect(path)) as con:
+        con.execute("CREATE TABLE t (v INTEGER)")
+    batches = []
+    commit = Writer._commit
+
+    def recording_commit(con, batch):
+        batches.append(len(batch))
+        commit(con, batch)
+
+    monkeypatch.setattr(Writer, "_commit", staticmethod(recording_commit))
+    # Not started yet: operations queued before start() are picked up together
+    writer = Writer(path)
+    writer.batches = batches
+    yield writer
+    if writer.is_alive():
+        writer.stop()
+
+
+def _insert(value, fail=False):
+    def op(con):
+        con.execute("INSERT INTO t (v) VALUES (?)", (value,))
+        if fail:
+            raise ValueError(f"op {value} failed")
+        return value
+
+    return op
+
+
+def _values(writer):
+    with closing(sqlite3.connect(writer.path)) as con:
+        return [v for (v,) in con.execute("SELECT v FROM t ORDER BY v")]
+
+
+def test_failing_op_rolls_back_only_its_savepoint(writer):
+    futures = [writer.submit(_insert(1)), writer.submit(_insert(2, fail=True)), writer.submit(_insert(3))]
+    writer.start()
+    assert futures[0].result(5) == 1 and futures[2].result(5) == 3
+    with pytest.raises(ValueError, match="op 2 failed"):
+        futures[1].result(5)
+    assert writer.batches == [3]
+    assert _values(writer) == [1, 3]
+
+
+def test_batch_size_is_capped(writer, monkeypatch):
+    monkeypatch.setattr(database, "DB_WRITE_BATCH", 2)
+    futures = [writer.submit(_insert(i)) for i in range(5)]
+    writer.start()
+    assert [f.result(5) for f in futures] == list(range(5))
+    assert writer.batches == [2, 2, 1]
+
+
+def test_exclusive_op_runs_alone_between_batches(writer):
+    events = []
+
+    def op(value):
+        def run(con):
+            events.append(("op", value, con.in_transaction))
+            con.execute("INSERT INTO t (v) VALUES (?)", (value,))
+
+        return run
+
+    def exclusive(con):
+        events.append(("exclusive", con.in_transaction))
+        con.execute("INSERT INTO t (v) VALUES (100)")  # autocommit: no batch transaction around it
+        return "done"
+
+    futures = [writer.submit(op(1)), writer.submit(exclusive, exclusive=True), writer.submit(op(2)), writer.submit(op(3))]
+    writer.start()
+    assert futures[1].result(5) == "done"
+    for f in futures:
+        f.result(5)
+    assert events == [("op", 1, True), ("exclusive", False), ("op", 2, True), ("op", 3, True)]
+    assert writer.batches == [1, 2]
+    assert _values(writer) == [1, 2, 3, 100]
+
+
+def test_failed_exclusive_op_leaves_no_transaction_open(writer):
+    def exclusive(con):
+        con.execute("BEGIN")
+        con.execute("INSERT INTO t (v) VALUES (7)")
+        raise RuntimeError("attach failed")
+
+    failed = writer.submit(exclusive, exclusive=True)
+    after = writer.submit(_insert(8))
+    writer.start()
+    with pytest.raises(RuntimeError):
+        failed.result(5)
+    assert after.result(5) == 8
+    assert _values(writer) == [8]
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Async database facade: calls run on the dedicated "db" threads rather than
+the event-loop thread, exceptions reach the awaiting coroutine, and the
+wrappers round-trip through the real database.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from pumpbot.core import database, db_async
+
+
+@pytest.fixture(autouse=True)
+def _fresh_pool():
+    yield
+    db_async.shutdown_db_threads()
+
+
+def test_calls_run_off_the_event_loop_thread():
+    async def scenario():
+        loop_thread = threading.current_thread()
+        worker = await db_async.run_db(threading.current_thread)
+        return loop_thread, worker
+
+    loop_thread, worker = asyncio.run(scenario())
+    assert worker is not loop_thread
+    assert worker.name.startswith("db")
+
+
+def test_blocking_call_does_not_stall_the_loop():
+    gate = threading.Event()
+    ticks = []
+
+    async def ticker():
+        while not gate.is_set():
+            ticks.append(1)
+            await asyncio.sleep(0.005)
+
+    async def scenario():
+        task = asyncio.create_task(ticker())
+        await db_async.run_db(gate.wait, 0.1)  # blocks a db thread, not the loop
+        gate.set()
+        await task
+
+    asyncio.run(scenario())
+    assert len(ticks) > 3
+
+
+def test_exceptions_propagate_to_the_caller():
+    def boom(value, *, reason):
+        raise ValueError(f"{value}: {reason}")
+
+    with pytest.raises(ValueError, match="1: bad row"):
+        asyncio.run(db_async.run_db(boom, 1, reason="bad row"))
+
+
+def test_wrappers_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "async.db")
+    database.init_db()
+
+    async def scenario():
+        trade_id = await db_async.trade_open(
+            symbol="AAA", side="LONG", entry=1.0, size=10.0, qty=10.0, tp1=1.1, tp2=1.2, sl=0.9,
+            opened_at="2026-07-01 10:00:00",
+        )
+        return trade_id, await db_async.get_open_trades()
+
+    try:
+        trade_id, open_trades = asyncio.run(scenario())
+    finally:
+        database.close_db()
+    assert trade_id is not None
+    assert [row[0] for row in open_trades] == [trade_id]
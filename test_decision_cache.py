@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Per-candle decision cache: the gates read the forming candle, so only an
+"ATR too high" rejection is cached (the candle's range can only widen), and
+only until the candle closes or the wider adaptive band would apply. Trend,
+low-ATR and volume rejections are re-evaluated on every scan.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from pumpbot.core import analyzer, decision_cache, state
+
+SYMBOL = "TESTUSDT"
+
+
+def _klines(closes, volumes, minutes, spreads=None):
+    """Raw Binance rows ending with a candle that opened a minute ago and is still forming."""
+    spreads = spreads or [0.5] * len(closes)
+    start = datetime.now(timezone.utc) - timedelta(minutes=minutes * (len(closes) - 1) + 1)
+    rows = []
+    for i, (close, vol, spread) in enumerate(zip(closes, volumes, spreads)):
+        opened = start + timedelta(minutes=minutes * i)
+        close_time = opened + timedelta(minutes=minutes) - timedelta(milliseconds=1)
+        rows.append(
+            [int(opened.timestamp() * 1000), close, close + spread, close - spread, close, vol, int(close_time.timestamp() * 1000)]
+        )
+    return rows
+
+
+def _close_time(rows):
+    return datetime.fromtimestamp(rows[-1][6] / 1000, tz=timezone.utc)
+
+
+class FakeClient:
+    def __init__(self, base, htf):
+        self.klines = {"15m": base, "1h": htf}
+
+    async def get_klines(self, symbol, interval, limit):
+        return self.klines[interval]
+
+
+@pytest.fixture(autouse=True)
+def _clean_state():
+    decision_cache.clear_rejections()
+    state._last_signal.pop(SYMBOL, None)
+    yield
+    decision_cache.clear_rejections()
+    state._last_signal.pop(SYMBOL, None)
+
+
+def _analyze(client):
+    return asyncio.run(analyzer.analyze_symbol_midterm(client, SYMBOL, "15m", "1h"))
+
+
+def _uptrend(n=150):
+    return [100.0 + 0.1 * i for i in range(n)]
+
+
+def _htf_up():
+    return _klines(_uptrend(), [100.0] * 150, 60)
+
+
+def _wide_last_candle():
+    return _klines(_uptrend(), [100.0] * 150, 15, spreads=[0.5] * 149 + [50.0])
+
+
+def test_forming_candle_volume_rejection_is_not_cached(monkeypatch):
+    passed_volume_gate = []
+    monkeypatch.setattr(analyzer, "find_last_swing", lambda *a, **k: passed_volume_gate.append(1) or (None, None))
+
+    volumes = [100.0] * 149 + [5.0]  # early in the candle: a fraction of a full bar
+    client = FakeClient(_klines(_uptrend(), volumes, 15), _htf_up())
+    assert _analyze(client)[0] is None
+    assert not passed_volume_gate
+    assert decision_cache.cached_rejection(SYMBOL, "15m", "1h") is None
+
+    # Later in the same candle the spike shows up and the next scan sees it
+    client.klines["15m"][-1][5] = 600.0
+    _analyze(client)
+    assert passed_volume_gate
+
+
+def test_htf_trend_rejection_is_not_cached():
+    flat = [100.0 + (0.3 if i % 2 else -0.3) for i in range(150)]
+    client = FakeClient(_klines(_uptrend(), [100.0] * 150, 15), _klines(flat, [100.0] * 150, 60))
+    assert _analyze(client)[0] is None
+    assert decision_cache.cached_rejection(SYMBOL, "15m", "1h") is None
+
+
+def test_low_atr_rejection_is_not_cached():
+    flat = [100.0] * 150
+    spreads = [2.0] * 100 + [0.01] * 50
+    client = FakeClient(_klines(flat, [100.0] * 150, 15, spreads=spreads), _htf_up())
+    assert _analyze(client)[0] is None
+    assert decision_cache.cached_rejection(SYMBOL, "15m", "1h") is None
+
+
+def test_high_atr_rejection_is_cached_until_candle_close():
+    base = _wide_last_candle()
+    assert _analyze(FakeClient(base, _htf_up()))[0] is None
+
+    close = _close_time(base)
+    entry = decision_cache.cached_rejection(SYMBOL, "15m", "1h", now=close - timedelta(minutes=1))
+    assert entry is not None and entry.gate == decision_cache.GATE_ATR
+    assert entry.valid_until == close
+    assert decision_cache.cached_rejection(SYMBOL, "15m", "1h", now=close) is None
+
+
+def test_high_atr_rejection_expires_when_the_adaptive_band_applies():
+    # Four hours after the last signal the band widens, so the rejection may no longer hold
+    switch = datetime.now(timezone.utc) + timedelta(minutes=5)
+    state.record_signal(SYMBOL, switch - timedelta(hours=4))
+    base = _wide_last_candle()
+    assert _analyze(FakeClient(base, _htf_up()))[0] is None
+
+    entry = decision_cache.cached_rejection(SYMBOL, "15m", "1h")
+    assert entry is not None and entry.valid_until == switch < _close_time(base)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Rate-limited Telegram delivery: token bucket arithmetic, per-chat limits,
+flood-control retries, deadlines and concurrent fan-out.
+"""
+
+import asyncio
+import time
+
+import pytest
+from telegram.error import RetryAfter
+
+from pumpbot.telebot import delivery
+from pumpbot.telebot.delivery import DeliveryEngine, MessageExpired, TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(delivery.time, "monotonic", clock)
+    return clock
+
+
+def test_bucket_serves_burst_then_spaces_reservations(clock):
+    bucket = TokenBucket(rate=2.0)  # capacity defaults to the rate
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    clock.now += 1.0  # two tokens refilled; the debt of two is paid off
+    assert bucket.reserve() == 0.5
+
+
+def test_bucket_refill_is_capped_at_capacity(clock):
+    bucket = TokenBucket(rate=1.0, capacity=1.0)
+    clock.now += 60
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    clock.now += 1
+    assert bucket.try_acquire()
+
+
+def test_bucket_drain_blocks_for_the_requested_time(clock):
+    bucket = TokenBucket(rate=1.0, capacity=1.0)
+    bucket.drain(5)
+    assert not bucket.try_acquire()
+    assert bucket.reserve() == pytest.approx(6.0)  # the 5s pause plus this token
+
+
+def test_per_chat_limit_does_not_delay_other_chats():
+    engine = DeliveryEngine(global_rate=1000, chat_rate=10, group_rate_per_min=60)
+    finished = {}
+
+    async def send(chat_id):
+        await engine.send(chat_id, lambda: asyncio.sleep(0))
+        finished.setdefault(chat_id, []).append(time.monotonic())
+
+    async def scenario():
+        start = time.monotonic()
+        await asyncio.gather(*(send(1) for _ in range(3)), send(2), send(3))
+        return start
+
+    start = asyncio.run(scenario())
+    assert finished[2][0] - start < 0.1 and finished[3][0] - start < 0.1
+    assert max(finished[1]) - start >= 0.18  # 3 sends at 10/s
+    assert engine._chat_bucket(-100).rate == pytest.approx(1.0)  # groups use the per-minute rate
+
+
+def test_flood_control_is_retried_then_raised():
+    engine = DeliveryEngine(global_rate=1000, chat_rate=1000, max_retries=2)
+    attempts = []
+
+    def flaky(fail_times):
+        async def call():
+            attempts.append(1)
+            if len(attempts) <= fail_times:
+                raise RetryAfter(0.01)
+            return "ok"
+
+        return call
+
+    assert asyncio.run(engine.send(1, flaky(2))) == "ok"
+    assert len(attempts) == 3
+
+    attempts.clear()
+    with pytest.raises(RetryAfter):
+        asyncio.run(engine.send(2, flaky(5)))
+    assert len(attempts) == 3  # first try + max_retries
+
+
+def test_deadline_passed_raises_without_sending():
+    engine = DeliveryEngine(global_rate=1000, chat_rate=1000)
+    sent = []
+
+    async def call():
+        sent.append(1)
+
+    with pytest.raises(MessageExpired):
+        asyncio.run(engine.send(1, call, deadline=time.time() - 1))
+    assert sent == []
+    asyncio.run(engine.send(1, call, deadline=time.time() + 60))
+    assert sent == [1]
+
+
+def test_fan_out_caps_concurrency_and_counts_successes():
+    engine = DeliveryEngine(global_rate=1000, chat_rate=1000, max_concurrency=2)
+    active, peak = [0], [0]
+
+    async def call():
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+
+    async def send_for_chat(chat_id):
+        if chat_id == 3:
+            raise RuntimeError("chat not found")
+        return await engine.send(chat_id, call)
+
+    sent = asyncio.run(engine.fan_out(range(1, 7), send_for_chat))
+    assert sent == 5
+    assert peak[0] == 2
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Chart file_id reuse: one upload per chart across chats, a re-upload when
+Telegram rejects a cached file_id, and least recently used eviction of the
+file_id cache.
+"""
+
+import asyncio
+import hashlib
+from types import SimpleNamespace
+
+import pytest
+from telegram.error import BadRequest
+
+from pumpbot.telebot import delivery, notifier
+from test_outbox import FakeBot
+
+PNG = b"png-bytes"
+KEY = hashlib.sha256(PNG).hexdigest()
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(delivery, "_engine", delivery.DeliveryEngine(1000, 1000, 60000))
+    monkeypatch.setattr(notifier, "_file_ids", notifier.OrderedDict())
+    return SimpleNamespace(bot=FakeBot())
+
+
+def _photos(app):
+    return [photo for method, _chat, photo, _fields in app.bot.calls if method == "send_photo"]
+
+
+def test_broadcast_uploads_once_then_reuses_the_file_id(app):
+    sent = asyncio.run(notifier.broadcast_chart(app, [1, 2, 3, 4], PNG, "caption"))
+    assert sent == 4
+    photos = _photos(app)
+    assert photos[0] == PNG and len(set(photos[1:])) == 1 and photos[1].startswith("file-")
+    assert notifier.chart_uploaded(KEY)
+
+    # A later send of the same image skips the upload entirely
+    asyncio.run(notifier.send_chart_photo(app, 5, PNG, KEY, "caption"))
+    assert _photos(app)[-1] == photos[1]
+
+
+def test_rejected_file_id_falls_back_to_an_upload(app):
+    asyncio.run(notifier.send_chart_photo(app, 1, PNG, KEY, "caption"))
+    stale = notifier._file_ids[KEY]
+    app.bot.failures[2] = [BadRequest("Wrong file identifier/http url specified")]
+    asyncio.run(notifier.send_chart_photo(app, 2, PNG, KEY, "caption"))
+    assert _photos(app) == [PNG, PNG]
+    assert notifier._file_ids[KEY] != stale  # the new upload's file_id replaces the rejected one
+
+
+def test_file_id_cache_evicts_least_recently_used(app, monkeypatch):
+    monkeypatch.setattr(notifier, "FILE_ID_CACHE_SIZE", 64)
+    keys = [f"chart-{i}" for i in range(64)]
+
+    async def fill():
+        for key in keys:
+            await notifier.send_chart_photo(app, 1, key.encode(), key, "caption")
+        await notifier.send_chart_photo(app, 2, keys[0].encode(), keys[0], "caption")  # reuse refreshes chart-0
+        await notifier.send_chart_photo(app, 1, b"new", "chart-new", "caption")
+
+    asyncio.run(fill())
+    assert len(notifier._file_ids) == 64
+    assert notifier.chart_uploaded(keys[0]) and notifier.chart_uploaded("chart-new")
+    assert not notifier.chart_uploaded(keys[1])
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Durable outbox: idempotent enqueueing, retries with backoff,
+dead-lettering, priority lanes, expiry deadlines and the signal_messages
+bookkeeping behind in-place lifecycle edits, exercised against a temporary
+SQLite database and a fake bot.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from telegram.error import Forbidden, NetworkError
+
+from pumpbot.core import database, signal_log
+from pumpbot.telebot import delivery, notifier, outbox
+
+CHATS = "101,102,103"
+
+
+class FakeBot:
+    """Records Bot API calls; failures[chat_id] is a list of exceptions raised by the next calls."""
+
+    def __init__(self):
+        self.calls = []
+        self.failures = {}
+        self.on_send = None
+        self._next_id = 1000
+
+    async def _call(self, method, chat_id, photo=None, **fields):
+        pending = self.failures.get(chat_id)
+        if pending:
+            raise pending.pop(0)
+        self.calls.append((method, chat_id, photo, fields))
+        if self.on_send:
+            await self.on_send(method, chat_id, fields)
+        self._next_id += 1
+        sizes = [SimpleNamespace(file_id=f"file-{self._next_id}")] if method == "send_photo" else None
+        return SimpleNamespace(message_id=self._next_id, photo=sizes)
+
+    async def send_message(self, chat_id, text, **kwargs):
+        return await self._call("send_message", chat_id, text=text)
+
+    async def send_photo(self, chat_id, photo, caption=None, **kwargs):
+        return await self._call("send_photo", chat_id, photo=photo, caption=caption)
+
+    async def edit_message_text(self, chat_id, message_id, text, **kwargs):
+        return await self._call("edit_message_text", chat_id, message_id=message_id, text=text)
+
+    async def edit_message_caption(self, chat_id, message_id, caption, **kwargs):
+        return await self._call("edit_message_caption", chat_id, message_id=message_id, caption=caption)
+
+
+@pytest.fixture
+def bot(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "outbox.db")
+    database.init_db()
+    # Rate limits far above what the tests send, so nothing waits on a bucket
+    monkeypatch.setattr(delivery, "_engine", delivery.DeliveryEngine(1000, 1000, 60000))
+    monkeypatch.setattr(outbox, "_wakeup", None)
+    monkeypatch.setattr(notifier, "_file_ids", notifier.OrderedDict())
+    monkeypatch.setattr(signal_log, "_log", signal_log.SignalLog(tmp_path / "signal_log"))
+    yield FakeBot()
+    database.close_db()
+
+
+def _dispatcher(bot, **kwargs):
+    return outbox.OutboxDispatcher(SimpleNamespace(bot=bot), **kwargs)
+
+
+def _rows():
+    return database._query("SELECT idem_key, chat_id, status, attempts, next_attempt_at, priority FROM outbox ORDER BY id")
+
+
+def _payload(symbol="AAA", chart=None):
+    payload = {
+        "symbol": symbol,
+        "side": "LONG",
+        "entry": [1.0, 1.1],
+        "tp_levels": [1.2, 1.3],
+        "sl": 0.9,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    if chart:
+        payload["chart_png"] = chart
+    return payload
+
+
+def test_enqueueing_the_same_signal_twice_delivers_once(bot):
+    payload = _payload(chart=b"png-bytes")
+
+    async def scenario():
+        assert await outbox.enqueue_vip_signal(CHATS, payload) == 3
+        assert await outbox.enqueue_vip_signal(CHATS, payload) == 0  # e.g. re-sent after a restart
+        assert await _dispatcher(bot).drain_once() == 3
+        assert await outbox.enqueue_vip_signal(CHATS, payload) == 0  # delivered rows still dedupe
+        assert await _dispatcher(bot).drain_once() == 0
+
+    asyncio.run(scenario())
+    assert sorted(chat for _m, chat, _p, _f in bot.calls) == [101, 102, 103]
+    # The chart is uploaded once; the other chats reuse its file_id
+    photos = [photo for _m, _c, photo, _f in bot.calls]
+    assert photos.count(b"png-bytes") == 1 and all(str(p).startswith("file-") for p in photos if p != b"png-bytes")
+    assert {status for _k, _c, status, *_ in _rows()} == {"SENT"}
+
+
+def test_transient_failure_is_retried_with_backoff(bot):
+    bot.failures[102] = [NetworkError("timeout")]
+
+    async def scenario():
+        await outbox.enqueue_message(CHATS, "m1", "hello")
+        dispatcher = _dispatcher(bot)
+        before = time.time()
+        assert await dispatcher.drain_once() == 3
+        row = [r for r in _rows() if r[1] == 102][0]
+        assert row[2] == "PENDING" and row[3] == 1
+        base = outbox.OUTBOX_BACKOFF_BASE
+        assert before + 0.8 * base <= row[4] <= time.time() + 1.2 * base
+        assert await dispatcher.drain_once() == 0  # not due yet
+        database._execute("UPDATE outbox SET next_attempt_at=0 WHERE chat_id=102")
+        assert await dispatcher.drain_once() == 1
+
+    asyncio.run(scenario())
+    assert [status for _k, _c, status, *_ in _rows()] == ["SENT"] * 3
+    assert sorted(chat for _m, chat, _p, _f in bot.calls) == [101, 102, 103]
+
+
+def test_backoff_doubles_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(outbox.random, "uniform", lambda a, b: 1.0)
+    monkeypatch.setattr(outbox, "OUTBOX_BACKOFF_BASE", 2.0)
+    monkeypatch.setattr(outbox, "OUTBOX_BACKOFF_MAX", 30.0)
+    assert [outbox._backoff(n) for n in range(1, 7)] == [2.0, 4.0, 8.0, 16.0, 30.0, 30.0]
+
+
+def test_permanent_and_repeated_failures_are_dead_lettered(bot, monkeypatch):
+    monkeypatch.setattr(outbox, "OUTBOX_MAX_ATTEMPTS", 2)
+    bot.failures[101] = [Forbidden("bot was blocked by the user")]
+    bot.failures[102] = [NetworkError("timeout"), NetworkError("timeout")]
+
+    async def scenario():
+        await outbox.enqueue_message(CHATS, "m1", "hello")
+        dispatcher = _dispatcher(bot)
+        await dispatcher.drain_once()
+        database._execute("UPDATE outbox SET next_attempt_at=0 WHERE status='PENDING'")
+        await dispatcher.drain_once()
+
+    asyncio.run(scenario())
+    statuses = {chat: (status, attempts) for _k, chat, status, attempts, *_ in _rows()}
+    assert statuses == {101: ("DEAD", 1), 102: ("DEAD", 2), 103: ("SENT", 0)}
+
+
+def test_lanes_deliver_signals_before_sim_updates_before_reports(bot):
+    async def scenario():
+        await outbox.enqueue_message("101", "report", "report", priority=outbox.PRIORITY_REPORT)
+        await outbox.enqueue_message("101", "sim", "sim update", priority=outbox.PRIORITY_SIM)
+        await outbox.enqueue_message("101", "signal", "signal", priority=outbox.PRIORITY_SIGNAL)
+        await _dispatcher(bot).drain_once()
+
+    asyncio.run(scenario())
+    assert [fields["text"] for _m, _c, _p, fields in bot.calls] == ["signal", "sim update", "report"]
+
+
+def test_lower_lane_yields_to_a_signal_queued_mid_drain(bot):
+    async def queue_signal(method, chat_id, fields):
+        if fields["text"] == "report":
+            bot.on_send = None
+            await outbox.enqueue_message("102", "signal", "signal", priority=outbox.PRIORITY_SIGNAL)
+
+    bot.on_send = queue_signal
+
+    async def scenario():
+        await outbox.enqueue_message("101,103", "report", "report", priority=outbox.PRIORITY_REPORT)
+        dispatcher = _dispatcher(bot)
+        dispatcher.chunk_size = 1
+        assert await dispatcher.drain_once() == 1  # stops after the first report chunk
+        await dispatcher.drain_once()
+
+    asyncio.run(scenario())
+    assert [(chat, fields["text"]) for _m, chat, _p, fields in bot.calls] == [
+        (101, "report"),
+        (102, "signal"),
+        (103, "report"),
+    ]
+
+
+def test_rows_past_their_deadline_are_dropped(bot):
+    async def scenario():
+        stale = time.time() - 120
+        await outbox.enqueue_message("101", "stale", "stale", priority=outbox.PRIORITY_SIGNAL, ttl_seconds=60, created_ts=stale)
+        await outbox.enqueue_message("101", "fresh", "fresh", priority=outbox.PRIORITY_SIGNAL, ttl_seconds=60)
+        await outbox.enqueue_message("101", "no-ttl", "no ttl")
+        await _dispatcher(bot).drain_once()
+
+    asyncio.run(scenario())
+    assert [fields["text"] for _m, _c, _p, fields in bot.calls] == ["fresh", "no ttl"]
+    assert {key: status for key, _c, status, *_ in _rows()} == {
+        "stale:101": "EXPIRED",
+        "fresh:101": "SENT",
+        "no-ttl:101": "SENT",
+    }
+
+
+def test_deadline_passing_while_waiting_for_a_slot_expires_the_row(bot, monkeypatch):
+    async def scenario():
+        await outbox.enqueue_message("101", "late", "late", ttl_seconds=60)
+        real_send = delivery.DeliveryEngine.send
+
+        async def late_send(self, chat_id, send_fn, deadline=None):
+            return await real_send(self, chat_id, send_fn, deadline=time.time() - 1)
+
+        monkeypatch.setattr(delivery.DeliveryEngine, "send", late_send)
+        await _dispatcher(bot).drain_once()
+
+    asyncio.run(scenario())
+    assert bot.calls == []
+    assert [status for _k, _c, status, *_ in _rows()] == ["EXPIRED"]
+
+
+def test_lifecycle_updates_edit_the_delivered_signal(bot):
+    from pumpbot.telebot.lifecycle import TradeLifecycleNotifier
+
+    fallback_calls = []
+
+    async def fallback(text, event="INFO", symbol=None):
+        fallback_calls.append((event, symbol))
+
+    lifecycle = TradeLifecycleNotifier(fallback, enabled=True)
+
+    async def scenario():
+        await outbox.enqueue_vip_signal("101,102", _payload(chart=b"png-bytes"))
+        dispatcher = _dispatcher(bot)
+        await dispatcher.drain_once()
+        delivered = {chat: message_id for _k, chat, message_id, *_ in database.signal_messages_latest("AAA")}
+        assert set(delivered) == {101, 102}
+
+        await lifecycle("TP1 HIT", event="TP1", symbol="AAA")
+        await dispatcher.drain_once()
+        (status,) = {row[5] for row in database.signal_messages_latest("AAA")}
+        assert "TP1 HIT" in status
+
+        await lifecycle("AAA SL", event="SL", symbol="AAA")
+        await dispatcher.drain_once()
+        assert database.signal_messages_latest("AAA") == []  # mapping dropped once the trade closed
+
+        await lifecycle("AAA TP2", event="TP2", symbol="AAA")  # nothing left to edit
+        await lifecycle("digest", event="INFO", symbol="AAA")
+        return delivered
+
+    delivered = asyncio.run(scenario())
+    edits = [(chat, fields) for method, chat, _p, fields in bot.calls if method == "edit_message_caption"]
+    assert len(edits) == 4
+    assert {(chat, fields["message_id"]) for chat, fields in edits} == set(delivered.items())
+    final = [fields["caption"] for _chat, fields in edits[2:]]
+    assert all("TP1 HIT" in caption and "AAA SL" in caption for caption in final)
+    assert fallback_calls == [("TP2", "AAA"), ("INFO", "AAA")]
+
+
+def test_signal_message_mappings_are_garbage_collected(bot):
+    asyncio.run(outbox.enqueue_vip_signal("101", _payload()))
+    asyncio.run(_dispatcher(bot).drain_once())
+    assert len(database.signal_messages_latest("AAA")) == 1
+    assert database.signal_messages_gc("2000-01-01T00:00:00+00:00") == 0
+    assert database.signal_messages_gc(datetime.now(timezone.utc).isoformat()) == 1
+    assert database.signal_messages_latest("AAA") == []
+
+
+def test_final_delivery_outcomes_are_appended_to_the_signal_log(bot):
+    bot.failures[102] = [Forbidden("bot was blocked by the user")]
+    fresh, stale = _payload("AAA"), _payload("BBB")
+    stale["created_at"] = datetime.fromtimestamp(time.time() - 2 * outbox.OUTBOX_SIGNAL_TTL_SECONDS, timezone.utc).isoformat()
+
+    async def scenario():
+        await outbox.enqueue_vip_signal("101,102", fresh)
+        await outbox.enqueue_vip_signal("101", stale)
+        await outbox.enqueue_message("101", "sim", "sim update")  # not a signal: not logged
+        await _dispatcher(bot).drain_once()
+
+    asyncio.run(scenario())
+    log = signal_log.get_signal_log()
+    log.close()
+    records = [json.loads(line) for path in log.directory.glob("*.jsonl") for line in path.read_text().splitlines()]
+    outcomes = {(r["ref"], r["chat_id"]): r["status"] for r in records if r["event"] == "delivery"}
+    assert outcomes == {
+        (outbox.signal_message_key(fresh), 101): "sent",
+        (outbox.signal_message_key(fresh), 102): "dead",
+        (outbox.signal_message_key(stale), 101): "expired",
+    }
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Query-plan checks: the hot signal/trade queries must be served by the indexes
+created in the schema migrations, not by full table scans, so they stay
+O(log n) as trade history grows.
+"""
+
+import sqlite3
+
+import pytest
+
+from pumpbot.core import database, migrations
+from pumpbot.core.win_rate import RECENT_CLOSED_SQL
+
+
+@pytest.fixture
+def con(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "plans.db")
+    database.init_db()
+    con = sqlite3.connect(database.DB_PATH)
+    rows = []
+    for i in range(5000):
+        closed = i < 4990
+        day = f"2026-01-{1 + i % 28:02d}"
+        rows.append(
+            (f"SYM{i % 200}", "CLOSED" if closed else "OPEN", f"{day} 00:00:00", f"{day} 06:00:00" if closed else None)
+        )
+    con.executemany(
+        "INSERT INTO trades (symbol, side, entry, size, qty, tp1, tp2, sl, status, opened_at, closed_at)"
+        " VALUES (?, 'LONG', 1, 1, 1, 1.1, 1.2, 0.9, ?, ?, ?)",
+        rows,
+    )
+    con.commit()
+    yield con
+    con.close()
+    database.close_db()
+
+
+def _plan(con, sql, params):
+    return [row[3] for row in con.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+@pytest.mark.parametrize(
+    "sql, params, index",
+    [
+        (database.OPEN_TRADES_SQL, (), "idx_trades_open_status"),
+        (database.TRADE_PARTIAL_SQL, (0.5, 0.5, 1.0, "t", "SYM1"), "idx_trades_open_symbol"),
+        (database.TRADE_CLOSE_SQL, ("t", 1.0, "t", 1.0, 1.0, "SYM1"), "idx_trades_open_symbol"),
+    ],
+)
+def test_hot_queries_use_indexes(con, sql, params, index):
+    plan = _plan(con, sql, params)
+    assert any(f"USING INDEX {index}" in step for step in plan), plan
+    assert not any(step == "SCAN trades" for step in plan), plan
+
+
+def test_recent_closed_trades_are_not_sorted(con):
+    # Newest-first walk that stops after LIMIT rows; a sort would read every closed trade
+    plan = _plan(con, RECENT_CLOSED_SQL, (30,))
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+def test_migrations_are_recorded_and_idempotent(con):
+    latest = migrations.MIGRATIONS[-1][0]
+    assert migrations.schema_version(con) == latest
+    assert migrations.apply_migrations(con) == latest
+    versions = [row[0] for row in con.execute("SELECT version FROM schema_version ORDER BY version")]
+    assert versions == [version for version, _name, _steps in migrations.MIGRATIONS]
+
+
+def test_legacy_database_is_upgraded(tmp_path):
+    # Database from before priority lanes and migrations: outbox without priority/expires_at
+    con = sqlite3.connect(tmp_path / "legacy.db", isolation_level=None)
+    con.execute(
+        "CREATE TABLE outbox (id INTEGER PRIMARY KEY AUTOINCREMENT, idem_key TEXT NOT NULL UNIQUE,"
+        " chat_id INTEGER NOT NULL, kind TEXT NOT NULL, body TEXT NOT NULL, media_key TEXT,"
+        " status TEXT NOT NULL DEFAULT 'PENDING', attempts INTEGER NOT NULL DEFAULT 0,"
+        " next_attempt_at REAL NOT NULL, last_error TEXT, created_at TEXT NOT NULL, sent_at TEXT)"
+    )
+    assert migrations.apply_migrations(con) == migrations.MIGRATIONS[-1][0]
+    columns = {row[1] for row in con.execute("PRAGMA table_info(outbox)")}
+    assert {"priority", "expires_at"} <= columns
+    con.close()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Write-invalidated result cache: hits until a topic is bumped, no fresh entry
+from a computation a write overtook, and shared in-flight computations that
+fail or are cancelled.
+"""
+
+import asyncio
+
+import pytest
+
+from pumpbot.core import result_cache
+from pumpbot.core.result_cache import TOPIC_SETTINGS, TOPIC_SIGNALS, TOPIC_TRADES
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache(monkeypatch):
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", True)
+    monkeypatch.setattr(result_cache, "_versions", {})
+    monkeypatch.setattr(result_cache, "_results", {})
+    monkeypatch.setattr(result_cache, "_inflight", {})
+
+
+class Counter:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.calls
+
+
+def test_hit_until_a_topic_is_bumped():
+    compute = Counter()
+
+    async def scenario():
+        topics = (TOPIC_SIGNALS, TOPIC_TRADES)
+        assert await result_cache.cached("k", topics, compute) == 1
+        assert await result_cache.cached("k", topics, compute) == 1
+        result_cache.bump(TOPIC_SETTINGS)  # unrelated topic
+        assert await result_cache.cached("k", topics, compute) == 1
+        result_cache.bump(TOPIC_TRADES)
+        assert await result_cache.cached("k", topics, compute) == 2
+        assert await result_cache.cached("k", topics, compute) == 2
+        result_cache.clear()
+        assert await result_cache.cached("k", topics, compute) == 3
+
+    asyncio.run(scenario())
+
+
+def test_write_during_compute_is_not_served_as_fresh():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        if len(calls) == 1:
+            result_cache.bump(TOPIC_SIGNALS)  # a save lands while the reply is being built
+        return len(calls)
+
+    async def scenario():
+        assert await result_cache.cached("k", (TOPIC_SIGNALS,), compute) == 1
+        assert await result_cache.cached("k", (TOPIC_SIGNALS,), compute) == 2
+        assert await result_cache.cached("k", (TOPIC_SIGNALS,), compute) == 2
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_misses_share_one_computation():
+    compute = Counter(delay=0.01)
+
+    async def scenario():
+        return await asyncio.gather(*(result_cache.cached("k", (TOPIC_SIGNALS,), compute) for _ in range(20)))
+
+    assert asyncio.run(scenario()) == [1] * 20
+    assert compute.calls == 1
+
+
+def test_shared_failure_reaches_every_waiter_and_is_not_cached():
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db locked")
+
+    async def scenario():
+        results = await asyncio.gather(
+            *(result_cache.cached("k", (TOPIC_SIGNALS,), failing) for _ in range(5)), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert len(calls) == 1
+        assert result_cache._inflight == {}
+        assert await result_cache.cached("k", (TOPIC_SIGNALS,), Counter()) == 1
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_computation_is_taken_over_by_a_waiter():
+    compute = Counter(delay=0.05)
+
+    async def scenario():
+        owner = asyncio.create_task(result_cache.cached("k", (TOPIC_SIGNALS,), compute))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(result_cache.cached("k", (TOPIC_SIGNALS,), compute)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        assert await asyncio.gather(*waiters) == [2, 2, 2]
+
+    asyncio.run(scenario())
+    assert compute.calls == 2
+
+
+def test_cancelled_waiter_does_not_cancel_the_computation():
+    compute = Counter(delay=0.05)
+
+    async def scenario():
+        owner = asyncio.create_task(result_cache.cached("k", (TOPIC_SIGNALS,), compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(result_cache.cached("k", (TOPIC_SIGNALS,), compute))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert await owner == 1
+
+    asyncio.run(scenario())
+    assert compute.calls == 1
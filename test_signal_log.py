@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Structured signal log: records are buffered until flush, partitioned into
+one JSONL file per UTC day (a signal at 23:59 UTC and its deliveries after
+midnight land in different files), and delivery records carry the signal ref.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+from pumpbot.core.signal_log import SignalLog, delivery_record, signal_record
+
+BEFORE_MIDNIGHT = datetime(2026, 7, 1, 23, 59, 30, tzinfo=timezone.utc)
+
+
+def _payload(**extra):
+    return {
+        "symbol": "AAA",
+        "side": "LONG",
+        "entry": [1.0, 1.2],
+        "tp_levels": [1.3, 1.4],
+        "sl": 0.9,
+        "chart_png": b"\x89PNG",
+        "created_at": BEFORE_MIDNIGHT,
+        **extra,
+    }
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def _delivery(chat_id, status, at):
+    record = delivery_record("sig:AAA:1", "AAA", chat_id, status, attempts=1)
+    record["ts"] = at.isoformat()
+    return record
+
+
+def test_records_across_midnight_utc_go_to_their_day_files(tmp_path):
+    log = SignalLog(tmp_path)
+    log.append(signal_record(_payload(), {"queued": 2}, ref="sig:AAA:1"))
+    log.append(_delivery(101, "sent", BEFORE_MIDNIGHT + timedelta(seconds=10)))
+    log.append(_delivery(102, "dead", BEFORE_MIDNIGHT + timedelta(seconds=45)))
+    assert list(tmp_path.iterdir()) == []  # append only buffers
+
+    assert log.flush() == 3
+    first, second = log.path_for("2026-07-01"), log.path_for("2026-07-02")
+    signal, sent = _lines(first)
+    (dead,) = _lines(second)
+    assert signal["ref"] == sent["ref"] == dead["ref"] == "sig:AAA:1"
+    assert signal["entry_mid"] == 1.1 and signal["delivery"] == {"queued": 2}
+    assert "chart_png" not in signal and signal["ts"] == BEFORE_MIDNIGHT.isoformat()
+    assert (sent["event"], sent["chat_id"], sent["status"]) == ("delivery", 101, "sent")
+    assert (dead["chat_id"], dead["status"], dead["attempts"]) == (102, "dead", 1)
+
+    # A late record for the earlier day is appended to its file, not the current one
+    log.append(_delivery(103, "expired", BEFORE_MIDNIGHT))
+    assert log.flush() == 1
+    log.close()
+    assert [r["chat_id"] for r in _lines(first)[1:]] == [101, 103]
+    assert len(_lines(second)) == 1
+
+
+def test_offset_timestamps_are_partitioned_by_utc_day(tmp_path):
+    log = SignalLog(tmp_path)
+    local = datetime(2026, 7, 2, 1, 30, tzinfo=timezone(timedelta(hours=3)))  # 22:30 UTC on July 1st
+    log.append(signal_record(_payload(created_at=local)))
+    log.close()
+    assert [p.name for p in tmp_path.iterdir()] == ["signals-2026-07-01.jsonl"]
+
+
+def test_flush_with_nothing_buffered_writes_nothing(tmp_path):
+    log = SignalLog(tmp_path / "log")
+    assert log.flush() == 0
+    log.close()
+    assert not (tmp_path / "log").exists()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Simulator digest: events inside one window are coalesced into a single
+message, urgent events (SL, TP2) and a full buffer flush at once, and
+format_digest renders one escaped line per event.
+"""
+
+import asyncio
+
+from pumpbot.core.sim_digest import SimDigest, format_digest
+
+
+class Sent(list):
+    async def __call__(self, text):
+        self.append(text)
+
+
+def test_events_in_one_window_are_sent_as_one_digest():
+    sent = Sent()
+
+    async def scenario():
+        digest = SimDigest(sent, window_seconds=0.05, urgent_events={"SL", "TP2"})
+        for symbol in ("AAA", "BBB", "CCC"):
+            await digest.add(f"{symbol} opened", event="OPEN", symbol=symbol)
+        assert sent == []  # still buffered
+        await asyncio.sleep(0.15)
+        await digest.add("DDD opened", event="OPEN")
+        await asyncio.sleep(0.15)
+
+    asyncio.run(scenario())
+    assert len(sent) == 2
+    assert "3 events" in sent[0] and all(s in sent[0] for s in ("AAA", "BBB", "CCC"))
+    assert sent[1] == "DDD opened"
+
+
+def test_urgent_events_flush_immediately_with_the_buffer():
+    sent = Sent()
+
+    async def scenario():
+        digest = SimDigest(sent, window_seconds=60, urgent_events={"SL", "TP2"})
+        await digest.add("AAA TP1", event="TP1")
+        await digest.add("AAA SL hit", event="SL")
+        assert len(sent) == 1 and "AAA TP1" in sent[0] and "AAA SL hit" in sent[0]
+        await digest.add("BBB TP2 hit", event="tp2")
+        assert sent[-1] == "BBB TP2 hit"
+        assert digest._timer is None  # the pending window timer was cancelled
+
+    asyncio.run(scenario())
+    assert len(sent) == 2
+
+
+def test_full_buffer_flushes_early():
+    sent = Sent()
+
+    async def scenario():
+        digest = SimDigest(sent, window_seconds=60, max_events=3, urgent_events=set())
+        for i in range(4):
+            await digest.add(f"event {i}")
+        await digest.flush()
+
+    asyncio.run(scenario())
+    assert len(sent) == 2 and "3 events" in sent[0] and sent[1] == "event 3"
+
+
+def test_zero_window_sends_every_event():
+    sent = Sent()
+
+    async def scenario():
+        digest = SimDigest(sent, window_seconds=0)
+        await digest.add("a <b>")
+        await digest.add("b", event="SL")
+
+    asyncio.run(scenario())
+    assert sent == ["a <b>", "b"]
+
+
+def test_format_digest_escapes_and_joins_lines():
+    assert format_digest(["AAA <x>"]) == "AAA &lt;x&gt;"
+    text = format_digest(["AAA TP1\nPnL +1%", "BBB & co"])
+    header, *lines = text.split("\n")
+    assert header.startswith("<b>Simulator update</b> | 2 events")
+    assert lines == ["- AAA TP1 | PnL +1%", "- BBB &amp; co"]
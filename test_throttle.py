@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Signal throttle: one signal per symbol per window, and a released slot (a
+signal that was never built) does not spend the window.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from pumpbot.core import throttle
+
+
+@pytest.fixture(autouse=True)
+def _fresh_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(throttle, "STATE_PATH", tmp_path / "throttle.json")
+    monkeypatch.setattr(throttle, "_last_seen", {})
+    monkeypatch.setattr(throttle, "_previous", {})
+
+
+def test_window_blocks_repeat_signals():
+    assert throttle.allow_signal("AAA", minutes=5)
+    assert not throttle.allow_signal("AAA", minutes=5)
+    assert throttle.allow_signal("BBB", minutes=5)
+
+
+def test_released_slot_restores_the_previous_window():
+    assert throttle.allow_signal("AAA", minutes=5)
+    throttle.release_signal("AAA")
+    assert throttle.allow_signal("AAA", minutes=5)
+
+    earlier = datetime.now(timezone.utc) - timedelta(minutes=10)
+    throttle._last_seen["AAA"] = earlier
+    assert throttle.allow_signal("AAA", minutes=5)
+    throttle.release_signal("AAA")
+    assert throttle._last_seen["AAA"] == earlier
+
+    throttle.release_signal("AAA")  # nothing left to release
+    assert throttle._last_seen["AAA"] == earlier
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+In-memory trade book: after every open, partial fill and close, the book must
+hold exactly the open/partial trades stored in SQLite, and a reload must
+rebuild the same book.
+"""
+
+import asyncio
+
+import pytest
+
+from pumpbot.core import database
+from pumpbot.core.trade_book import OpenTrade, TradeBook
+
+TS = "2026-04-01 12:00:00"
+
+
+@pytest.fixture
+def book(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "book.db")
+    database.init_db()
+    book = TradeBook()
+    book.load()
+    yield book
+    database.close_db()
+
+
+def _state(trades):
+    return sorted((t.id, t.symbol, t.side, t.qty, t.filled_tp1_qty, t.status) for t in trades)
+
+
+def _assert_in_sync(book):
+    stored = [OpenTrade.from_row(row) for row in database.get_open_trades()]
+    assert _state(book) == _state(stored)
+    reloaded = TradeBook()
+    reloaded.load()
+    assert _state(reloaded) == _state(book)
+
+
+def _open(book, symbol, side="LONG", qty=2.0):
+    return asyncio.run(book.open(symbol, side, 100.0, 100.0 * qty, qty, 110.0, 120.0, 90.0, TS))
+
+
+def test_open_partial_close_stay_in_sync(book):
+    a1 = _open(book, "AAA")
+    a2 = _open(book, "AAA", qty=4.0)
+    b1 = _open(book, "BBB", side="SHORT")
+    assert len(book) == 3 and book.has_symbol("AAA")
+    _assert_in_sync(book)
+
+    # A TP1 fill applies to every open trade of the symbol; a2 stays partial, a1 is filled
+    filled = asyncio.run(book.mark_partial("AAA", 2.0, 110.0, TS))
+    assert [t.id for t in filled] == [a1.id]
+    assert book.get(a2.id).status == "PARTIAL" and book.get(a1.id) is None
+    _assert_in_sync(book)
+    (status,) = database._query_one("SELECT status FROM trades WHERE id=?", (a1.id,))
+    assert status == "CLOSED"
+
+    closed = asyncio.run(book.close_symbol("AAA", 120.0, TS, realized_pnl_usd=5.0, realized_pnl_pct=1.0))
+    assert [t.id for t in closed] == [a2.id]
+    assert not book.has_symbol("AAA") and book.symbols() == ["BBB"]
+    _assert_in_sync(book)
+
+    asyncio.run(book.close_symbol("BBB", 90.0, TS, realized_pnl_usd=-1.0, realized_pnl_pct=-0.5))
+    assert len(book) == 0 and book.get(b1.id) is None
+    _assert_in_sync(book)
+
+
+def test_changes_to_unknown_symbols_are_noops(book):
+    _open(book, "AAA")
+    assert asyncio.run(book.mark_partial("ZZZ", 1.0, 1.0, TS)) == []
+    assert asyncio.run(book.close_symbol("ZZZ", 1.0, TS, 0.0, 0.0)) == []
+    _assert_in_sync(book)
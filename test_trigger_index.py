@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Price-level trigger index: which TP/SL levels a price has reached, for long
+and short trades, and the TP2 > SL > TP1 precedence the simulator applies.
+"""
+
+import asyncio
+
+import pytest
+
+from pumpbot.core import database
+from pumpbot.core.sim import SimEngine
+from pumpbot.core.trade_book import TradeBook
+from pumpbot.core.trigger_index import DOWN, UP, TriggerIndex
+from pumpbot.core.win_rate import WinRateTracker
+
+
+def _long(index, trade_id, tp1, tp2, sl):
+    index.add((trade_id, "TP1"), tp1, UP)
+    index.add((trade_id, "TP2"), tp2, UP)
+    index.add((trade_id, "SL"), sl, DOWN)
+
+
+def _short(index, trade_id, tp1, tp2, sl):
+    index.add((trade_id, "TP1"), tp1, DOWN)
+    index.add((trade_id, "TP2"), tp2, DOWN)
+    index.add((trade_id, "SL"), sl, UP)
+
+
+def test_long_levels_fire_at_or_beyond_the_level():
+    index = TriggerIndex()
+    _long(index, 1, tp1=110, tp2=120, sl=90)
+    assert index.crossed(100) == []
+    assert index.crossed(110) == [(1, "TP1")]
+    assert index.crossed(90) == [(1, "SL")]
+    assert index.crossed(85) == [(1, "SL")]
+
+
+def test_short_levels_fire_at_or_beyond_the_level():
+    index = TriggerIndex()
+    _short(index, 1, tp1=90, tp2=80, sl=110)
+    assert index.crossed(100) == []
+    assert index.crossed(90) == [(1, "TP1")]
+    assert index.crossed(110) == [(1, "SL")]
+
+
+def test_price_moving_past_several_levels_returns_all_of_them():
+    index = TriggerIndex()
+    _long(index, 1, tp1=110, tp2=120, sl=90)
+    _long(index, 2, tp1=105, tp2=115, sl=95)
+    _short(index, 3, tp1=95, tp2=90, sl=118)
+    assert sorted(index.crossed(125)) == [(1, "TP1"), (1, "TP2"), (2, "TP1"), (2, "TP2"), (3, "SL")]
+    assert sorted(index.crossed(88)) == [(1, "SL"), (2, "SL"), (3, "TP1"), (3, "TP2")]
+    # Crossing does not consume: the levels stay until discarded
+    assert len(index) == 9
+
+
+def test_discard_then_readd():
+    index = TriggerIndex()
+    _long(index, 1, tp1=110, tp2=120, sl=90)
+    index.add((2, "TP1"), 110, UP)  # same level, other key
+    assert index.discard((1, "TP1"), 110, UP)
+    assert not index.discard((1, "TP1"), 110, UP)
+    assert not index.discard((1, "TP2"), 121, UP)
+    assert index.crossed(112) == [(2, "TP1")]
+    index.add((1, "TP1"), 110, UP)
+    assert sorted(index.crossed(112)) == [(1, "TP1"), (2, "TP1")]
+    assert len(index) == 4
+
+
+def test_non_finite_levels_are_ignored():
+    index = TriggerIndex()
+    index.add((1, "TP1"), float("nan"), UP)
+    index.add((1, "SL"), float("inf"), DOWN)
+    assert len(index) == 0 and index.crossed(100) == []
+
+
+@pytest.fixture
+def sim(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "sim.db")
+    database.init_db()
+    book = TradeBook()
+    book.load()
+    engine = SimEngine(book=book, win_rate=WinRateTracker(windows=(30,)))
+    engine.cfg.notify = False
+    yield engine
+    database.close_db()
+
+
+def _open(engine, symbol, tp1, tp2, sl, side="LONG", entry=100.0):
+    payload = {"symbol": symbol, "side": side, "entry": [entry], "tp_levels": [tp1, tp2], "sl": sl}
+    asyncio.run(engine.on_signal_open(payload))
+    (trade,) = engine.book.for_symbol(symbol)
+    return trade
+
+
+@pytest.mark.parametrize(
+    "tp1, tp2, sl, price, reason",
+    [
+        (110, 120, 90, 125, "TP2"),  # TP1 and TP2 crossed at once: TP2 wins
+        (110, 120, 130, 125, "TP2"),  # TP2 and SL both fire: TP2 wins
+        (110, 120, 115, 112, "SL"),  # SL and TP1 both fire: SL wins
+    ],
+)
+def test_simulator_precedence(sim, tp1, tp2, sl, price, reason):
+    trade = _open(sim, "AAA", tp1, tp2, sl)
+    asyncio.run(sim.on_tick("AAA", price))
+    assert not sim.book.has_symbol("AAA")
+    (row,) = database._query("SELECT status, last_price FROM trades WHERE id=?", (trade.id,))
+    assert row == ("CLOSED", {"TP2": tp2, "SL": sl}[reason])
+    assert "AAA" not in sim._triggers
+
+
+def test_simulator_tp1_only_partially_fills(sim):
+    trade = _open(sim, "BBB", 90, 80, 110, side="SHORT")
+    asyncio.run(sim.on_tick("BBB", 89))
+    assert trade.status == "PARTIAL"
+    # TP1 is unindexed after the fill; TP2 and SL stay registered
+    assert sorted(sim._triggers["BBB"].crossed(75)) == [(trade.id, "TP2")]
+    assert sorted(sim._triggers["BBB"].crossed(111)) == [(trade.id, "SL")]
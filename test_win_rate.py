@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Rolling win-rate tracker: incremental updates must agree with the SQL answer
+over the same closed trades, overall and per symbol, and after a reload.
+"""
+
+import random
+
+import pytest
+
+from pumpbot.core import database
+from pumpbot.core.win_rate import WinRateTracker
+
+
+def _sql_rate(window, symbol=None):
+    where = "status='CLOSED'" + (" AND symbol=?" if symbol else "")
+    params = ((symbol,) if symbol else ()) + (window,)
+    rows = database._query(f"SELECT pnl_usd FROM trades WHERE {where} ORDER BY id DESC LIMIT ?", params)
+    return sum(1 for (pnl,) in rows if pnl > 0) / len(rows) * 100.0 if rows else 0.0
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "winrate.db")
+    database.init_db()
+    yield
+    database.close_db()
+
+
+def test_incremental_rate_matches_sql(db):
+    rng = random.Random(7)
+    tracker = WinRateTracker(windows=(5, 30))
+    tracker.load()
+    assert tracker.rate() == 0.0
+    symbols = [f"S{i}" for i in range(6)]
+    open_ids = {}
+    for _ in range(200):
+        symbol = rng.choice(symbols)
+        if symbol not in open_ids:
+            open_ids[symbol] = database.trade_open(symbol, "LONG", 1, 1, 1, 1.1, 1.2, 0.9, "t")
+            continue
+        # Trades of other symbols opened earlier may still be open: closes arrive out of id order
+        pnl = rng.choice([-10.0, 0.0, 12.5])
+        database.trade_close_all(symbol, last_price=1.0, now_ts="t", realized_pnl_usd=pnl, realized_pnl_pct=0)
+        tracker.record(symbol, pnl, open_ids.pop(symbol))
+
+    reloaded = WinRateTracker(windows=(5, 30))
+    reloaded.load()
+    for window in (5, 30):
+        assert tracker.rate(window) == pytest.approx(_sql_rate(window))
+        assert reloaded.rate(window) == pytest.approx(_sql_rate(window))
+        for symbol in symbols:
+            assert tracker.rate(window, symbol) == pytest.approx(_sql_rate(window, symbol))
+            assert reloaded.rate(window, symbol) == pytest.approx(_sql_rate(window, symbol))
+    assert reloaded.breakdown(5) == pytest.approx(tracker.breakdown(5))
+    with pytest.raises(ValueError):
+        tracker.rate(7)